@@ -1,5 +1,8 @@
 """Allow running as python -m app."""
+import multiprocessing
+
 from app.main import main
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
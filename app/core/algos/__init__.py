@@ -1,11 +1,17 @@
-from app.core.algos.fd import closure, minimal_cover
+from app.core.algos.fd import FDIndex, closure, minimal_cover
+from app.core.algos.canonical import FDSet, equivalent, fd_diff, fd_set, fd_set_hash
 from app.core.algos.keys import candidate_keys, is_superkey
 from app.core.algos.normal_forms import check_2nf, check_3nf
-from app.core.algos.decomposition import coverage_check, lossless_join_basic, dependency_preservation_approx
+from app.core.algos.decomposition import (
+    ChaseResult, coverage_check, lossless_join_basic, lossless_join_chase,
+    dependency_preservation, dependency_preservation_approx, lost_dependencies,
+)
 
 __all__ = [
-    "closure", "minimal_cover",
+    "FDIndex", "closure", "minimal_cover",
+    "FDSet", "equivalent", "fd_diff", "fd_set", "fd_set_hash",
     "candidate_keys", "is_superkey",
     "check_2nf", "check_3nf",
-    "coverage_check", "lossless_join_basic", "dependency_preservation_approx",
+    "ChaseResult", "coverage_check", "lossless_join_basic", "lossless_join_chase",
+    "dependency_preservation", "dependency_preservation_approx", "lost_dependencies",
 ]
@@ -0,0 +1,166 @@
+"""
+Canonical form of an FD set: equivalence by hash, cached implication diff.
+
+Минимальные покрытия не единственны: эквивалентные F могут дать разные покрытия.
+Каноническая форма — базис Дюкенна–Гига: P -> P+ для всех псевдозамкнутых P. Он
+определяется только F+ (и не зависит от атрибутов, не входящих в ФЗ), поэтому
+F ≡ G ⇔ одинаковые базисы ⇔ одинаковые sha256. Строится из любого покрытия за
+полиномиальное время: правые части насыщаются до замыканий, затем каждая левая
+часть замыкается по остальным импликациям, совпавшие с правой — удаляются.
+
+FDSet кэшируется по нормализованному ключу F, так что эталон одного варианта и
+одинаковые ответы студентов в процессе пакетной проверки обрабатываются один раз;
+fd_diff (какие ФЗ одной стороны не выводятся из другой) кэшируется по паре ключей.
+"""
+import hashlib
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from app.core.algos.fd import FDIndex, _single_rhs
+from app.core.trace import count, span
+
+FD = tuple[list[str], str]
+FDKey = tuple[tuple[str, ...], str]
+
+
+def fd_key(lhs: list[str], rhs: str) -> FDKey:
+    """ФЗ в сравнимом виде: LHS отсортирована, без повторов."""
+    return tuple(sorted(set(lhs))), rhs
+
+
+def fd_set_key(F: list[FD]) -> tuple[FDKey, ...]:
+    """Ключ набора ФЗ: одиночные RHS, без тривиальных и повторов, отсортирован."""
+    return tuple(sorted({fd_key(lhs, rhs) for lhs, rhs in _single_rhs(F) if rhs not in lhs}))
+
+
+def _digest(fds: tuple[FDKey, ...]) -> str:
+    text = "\n".join(f"{','.join(lhs)}->{rhs}" for lhs, rhs in fds)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _closure(x: int, basis: list[Optional[tuple[int, int]]], skip: int) -> int:
+    changed = True
+    while changed:
+        changed = False
+        for j, imp in enumerate(basis):
+            if imp is not None and j != skip and not imp[0] & ~x and imp[1] & ~x:
+                x |= imp[1]
+                changed = True
+    return x
+
+
+def _canonical_basis(index: FDIndex, fds: list[FD]) -> list[tuple[int, int]]:
+    """Базис Дюкенна–Гига из покрытия fds: список (P, P+) на битовых масках index."""
+    by_lhs: dict[int, int] = {}
+    for lhs, rhs in fds:
+        m = index.mask(lhs)
+        by_lhs[m] = by_lhs.get(m, m) | index.mask([rhs])
+    basis: list[Optional[tuple[int, int]]] = list(by_lhs.items())
+    for i, (a, b) in enumerate(basis):
+        basis[i] = (a, _closure(a | b, basis, i))
+    for i, imp in enumerate(basis):
+        a = _closure(imp[0], basis, i)
+        basis[i] = (a, imp[1]) if a != imp[1] else None
+    return [imp for imp in basis if imp is not None]
+
+
+@dataclass(frozen=True)
+class CanonicalFDs:
+    fds: tuple[FDKey, ...]  # базис Дюкенна–Гига, по одной ФЗ на атрибут P+ \ P
+    digest: str
+
+
+class FDSet:
+    """Набор ФЗ с канонической формой (по требованию) и кэшем замыканий по LHS."""
+
+    def __init__(self, key: tuple[FDKey, ...]) -> None:
+        self.key = key
+        self.fds: list[FD] = [(list(lhs), rhs) for lhs, rhs in key]
+        self.index = FDIndex(self.fds)
+        self._closures: dict[tuple[str, ...], set[str]] = {}
+        self._canonical: Optional[CanonicalFDs] = None
+
+    @property
+    def canonical(self) -> CanonicalFDs:
+        if self._canonical is None:
+            with span("canonical_fds", fds=len(self.key)):
+                attrs = self.index.attrs
+                fds = tuple(sorted(
+                    (tuple(sorted(attrs(p))), a)
+                    for p, c in _canonical_basis(self.index, self.fds)
+                    for a in attrs(c & ~p)
+                ))
+            self._canonical = CanonicalFDs(fds, _digest(fds))
+        return self._canonical
+
+    @property
+    def digest(self) -> str:
+        return self.canonical.digest
+
+    def closure(self, lhs: tuple[str, ...]) -> set[str]:
+        c = self._closures.get(lhs)
+        if c is None:
+            c = self._closures[lhs] = self.index.closure(lhs)
+        else:
+            count("implication_closure_hit")
+        return c
+
+    def implies(self, lhs: list[str], rhs: str) -> bool:
+        return rhs in self.closure(fd_key(lhs, rhs)[0])
+
+    def implies_all(self, fds: Iterable[FD]) -> list[bool]:
+        """
+        Выводится ли каждая из fds (одиночные RHS): запросы группируются по LHS, замыкание каждой
+        различной LHS считается один раз (и остаётся в кэше для следующих запросов).
+        """
+        fds = [(fd_key(lhs, rhs)[0], rhs) for lhs, rhs in fds]
+        closures = {lhs: self.closure(lhs) for lhs in dict.fromkeys(lhs for lhs, _ in fds)}
+        return [rhs in closures[lhs] for lhs, rhs in fds]
+
+    def not_implied(self, other: "FDSet") -> tuple[FDKey, ...]:
+        """ФЗ other (по ключу), которые не выводятся из этого набора."""
+        return tuple(fd for fd, ok in zip(other.key, self.implies_all(other.fds)) if not ok)
+
+    def equivalent(self, other: "FDSet") -> bool:
+        return self.key == other.key or self.digest == other.digest
+
+
+@lru_cache(maxsize=256)
+def _fd_set(key: tuple[FDKey, ...]) -> FDSet:
+    return FDSet(key)
+
+
+def fd_set(F: list[FD]) -> FDSet:
+    """FDSet для F; один и тот же набор (с точностью до порядка и записи) — один объект."""
+    return _fd_set(fd_set_key(F))
+
+
+def fd_set_hash(F: list[FD]) -> str:
+    """sha256 канонической формы F: одинаков ровно для эквивалентных F."""
+    return fd_set(F).digest
+
+
+def equivalent(F: list[FD], G: list[FD]) -> bool:
+    return fd_set(F).equivalent(fd_set(G))
+
+
+@lru_cache(maxsize=1024)
+def _diff(ref_key: tuple[FDKey, ...], stu_key: tuple[FDKey, ...]) -> tuple[frozenset[FDKey], frozenset[FDKey]]:
+    ref, stu = _fd_set(ref_key), _fd_set(stu_key)
+    if ref.equivalent(stu):
+        count("fd_diff_equivalent")
+        return frozenset(), frozenset()
+    return frozenset(stu.not_implied(ref)), frozenset(ref.not_implied(stu))
+
+
+def fd_diff(F_ref: list[FD], F_stu: list[FD]) -> tuple[list[FD], list[FD]]:
+    """
+    (ФЗ F_ref, не выводимые из F_stu; ФЗ F_stu, не выводимые из F_ref) — в исходном
+    порядке и записи. Повторный ответ с тем же набором ФЗ — один поиск в кэше.
+    """
+    missing, extra = _diff(fd_set_key(F_ref), fd_set_key(F_stu))
+    return (
+        [fd for fd in _single_rhs(F_ref) if fd_key(*fd) in missing],
+        [fd for fd in _single_rhs(F_stu) if fd_key(*fd) in extra],
+    )
@@ -1,6 +1,18 @@
-"""Decomposition: coverage, lossless join, dependency preservation."""
-from app.core.algos.fd import minimal_cover
+"""
+Decomposition: coverage, lossless join, dependency preservation; 2NF/3NF/BCNF construction.
+
+CLI для преподавателя: ``python -m app.core.algos.decomposition reference.xlsx`` —
+схемы 2НФ, 3НФ (синтез) и НФБК по ФЗ задания №4 против отношений заданий №11 и №13.
+"""
+import sys
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Any, Optional
+
+from app.core.algos.fd import FDIndex, _single_rhs, minimal_cover
 from app.core.algos.keys import candidate_keys, is_superkey
+from app.core.algos.projection import FDProjector
+from app.core.trace import count, span
 
 
 def coverage_check(U_attrs: set[str], relations: list[tuple[str, set[str]]]) -> tuple[bool, set[str], set[str]]:
@@ -24,6 +36,7 @@ def lossless_join_basic(
 ) -> bool:
     """
     PASS if some relation contains a candidate key of (U_attrs, F).
+    Not a lossless-join test by itself (R1 ⊇ key, R1 ∩ R2 = ∅ passes); see lossless_join_chase.
     """
     keys = candidate_keys(U_attrs, F)
     for _, attrs in relations:
@@ -33,6 +46,108 @@ def lossless_join_basic(
     return False
 
 
+@dataclass
+class ChaseResult:
+    """Итог chase: lossless — появилась строка из одних различающих символов; fired — сработавшие ФЗ по порядку."""
+    lossless: bool
+    fired: list[tuple[list[str], str]] = field(default_factory=list)
+    steps: int = 0  # применений ФЗ к таблице
+
+
+def lossless_join_chase(
+    U_attrs: set[str],
+    F: list[tuple[list[str], str]],
+    relations: list[tuple[str, set[str]]],
+) -> ChaseResult:
+    """
+    Chase по таблице «отношения × атрибуты U». Символы — целые: различающий символ
+    столбца j — j, остальные — уникальные id; приравнивание — union-find (корень —
+    меньший id, поэтому различающий символ побеждает). ФЗ X -> A: строки с равными
+    символами X получают общий символ A. ФЗ применяется повторно, только если в
+    столбцах X что-то склеилось (очередь). Остановка — как только какая-то строка
+    состоит из одних различающих символов (lossless) или очередь пуста.
+    Ключи универсального отношения не перебираются.
+    """
+    cols = sorted(U_attrs)
+    col = {a: j for j, a in enumerate(cols)}
+    n = len(cols)
+    parent = list(range(n))
+    members: dict[int, list[int]] = {}  # корень неразличающего символа -> строки, где он стоит
+    undistinguished: list[int] = []  # число неразличающих символов в строке
+    rows: list[list[int]] = []
+    for i, (_, attrs) in enumerate(relations):
+        row = []
+        for j, a in enumerate(cols):
+            if a in attrs:
+                row.append(j)
+            else:
+                members[len(parent)] = [i]
+                row.append(len(parent))
+                parent.append(len(parent))
+        rows.append(row)
+        undistinguished.append(n - sum(1 for a in cols if a in attrs))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    fds = [
+        ([col[a] for a in lhs], col[rhs], (list(lhs), rhs))
+        for lhs, rhs in _single_rhs(F)
+        if rhs in col and rhs not in lhs and all(a in col for a in lhs)
+    ]
+    by_col: dict[int, list[int]] = {}  # столбец -> ФЗ, где он в LHS
+    for i, (lhs, _, _) in enumerate(fds):
+        for j in lhs:
+            by_col.setdefault(j, []).append(i)
+    result = ChaseResult(lossless=0 in undistinguished)
+    if result.lossless:
+        return result
+    with span("lossless_chase", relations=len(rows), attrs=n, fds=len(fds)):
+        stack = list(reversed(range(len(fds))))  # LIFO: новые символы сразу продвигаются дальше по цепочке ФЗ
+        queued = [True] * len(fds)
+        while stack:
+            i = stack.pop()
+            queued[i] = False
+            lhs, a, fd = fds[i]
+            result.steps += 1
+            groups: dict[Any, int] = {}  # символы X -> корень символа A
+            merged = False
+            single = lhs[0] if len(lhs) == 1 else -1
+            for row in rows:
+                key = find(row[single]) if single >= 0 else tuple(find(row[j]) for j in lhs)
+                s = find(row[a])
+                t = find(groups.setdefault(key, s))
+                if t == s:
+                    continue
+                lo, hi = (s, t) if s < t else (t, s)
+                parent[hi] = lo
+                groups[key] = lo
+                merged = True
+                moved = members.pop(hi)
+                if lo >= n:
+                    members[lo].extend(moved)
+                    continue
+                for r in moved:  # символ стал различающим во всех строках класса
+                    undistinguished[r] -= 1
+                    if not undistinguished[r]:
+                        result.lossless = True
+            if not merged:
+                continue
+            count("chase_merge")
+            if fd not in result.fired:
+                result.fired.append(fd)
+            if result.lossless:
+                return result
+            for k in by_col.get(a, ()):
+                if not queued[k]:
+                    queued[k] = True
+                    stack.append(k)
+    return result
+
+
 def dependency_preservation_approx(
     F: list[tuple[list[str], str]],
     relations: list[tuple[str, set[str]]],
@@ -51,3 +166,199 @@ def dependency_preservation_approx(
         if not found:
             return False
     return True
+
+
+def lost_dependencies(
+    F: list[tuple[list[str], str]],
+    relations: list[tuple[str, set[str]]],
+) -> list[tuple[list[str], str]]:
+    """
+    ФЗ из F, которые не следуют из объединения проекций F на отношения.
+    Для X -> A: Z := X; Z := Z ∪ ((Z ∩ Ri)+ ∩ Ri) по всем Ri до неподвижной точки
+    (проекции F+ не строятся); A ∈ Z — зависимость сохранена (выход сразу).
+    """
+    index = FDIndex(F)
+    rel_masks = [index.mask(attrs) for _, attrs in relations]
+    lost: list[tuple[list[str], str]] = []
+    with span("dependency_preservation", fds=len(F), relations=len(relations)):
+        for lhs, rhs in _single_rhs(F):
+            target = index.mask([rhs])
+            z = index.mask(lhs)
+            if any((z | target) & ~r == 0 for r in rel_masks):  # ФЗ целиком в одном отношении
+                continue
+            seen = [-1] * len(rel_masks)  # Z ∩ Ri при последнем замыкании: без изменений — не повторять
+            changed = True
+            while changed and not z & target:
+                changed = False
+                for i, r in enumerate(rel_masks):
+                    zr = z & r
+                    if zr == seen[i]:
+                        continue
+                    seen[i] = zr
+                    new = index.closure_mask(zr) & r & ~z
+                    if new:
+                        z |= new
+                        changed = True
+                        if z & target:
+                            break
+            if not z & target:
+                lost.append((list(lhs), rhs))
+    return lost
+
+
+def dependency_preservation(
+    F: list[tuple[list[str], str]],
+    relations: list[tuple[str, set[str]]],
+) -> bool:
+    """True if F follows from the union of its projections onto the relations (exact test)."""
+    return not lost_dependencies(F, relations)
+
+
+# --- построение декомпозиций (эталоны заданий №11 и №13) ---
+
+Relation = tuple[str, set[str]]
+
+
+def _sorted_fds(U_attrs: set[str], F: list[tuple[list[str], str]]) -> list[tuple[list[str], str]]:
+    """ФЗ внутри U с одним атрибутом справа, LHS и список отсортированы — результат не зависит от порядка F."""
+    return sorted({(tuple(sorted(lhs)), rhs) for lhs, rhs in _single_rhs(F) if set(lhs) <= U_attrs and rhs in U_attrs})
+
+
+def _named(attr_sets: list[set[str]]) -> list[Relation]:
+    return [(f"R{i}", attrs) for i, attrs in enumerate(attr_sets, start=1)]
+
+
+def _drop_subsumed(attr_sets: list[set[str]]) -> list[set[str]]:
+    """Убрать отношения, атрибуты которых содержатся в другом (из равных — оставить первое)."""
+    out: list[set[str]] = []
+    for i, a in enumerate(attr_sets):
+        if any(a < b or (a == b and j < i) for j, b in enumerate(attr_sets) if j != i):
+            continue
+        out.append(a)
+    return out
+
+
+def _some_key(U_attrs: set[str], index: FDIndex) -> set[str]:
+    """Один ключ U: удаление атрибутов по алфавиту, пока остаётся суперключом."""
+    u_mask = index.mask(U_attrs)
+    key = u_mask
+    for a in sorted(U_attrs):
+        b = index.mask([a])
+        if index.closure_mask(key & ~b) & u_mask == u_mask:
+            key &= ~b
+    return index.attrs(key)
+
+
+def synthesize_3nf(U_attrs: set[str], F: list[tuple[list[str], str]]) -> list[Relation]:
+    """
+    Синтез 3НФ: минимальное покрытие -> отношение на каждую LHS (LHS и все её RHS) ->
+    отношение с ключом U, если ни одно отношение ключ не содержит -> удаление
+    поглощённых. Без потерь и с сохранением зависимостей; порядок отношений — по
+    отсортированным LHS, имена R1, R2, …
+    """
+    G = sorted(minimal_cover([(list(lhs), rhs) for lhs, rhs in _sorted_fds(U_attrs, F)]))
+    groups: dict[tuple[str, ...], set[str]] = {}
+    for lhs, rhs in G:
+        groups.setdefault(tuple(lhs), set(lhs)).add(rhs)
+    attr_sets = list(groups.values())
+    index = FDIndex(G)
+    u_mask = index.mask(U_attrs)
+    if not any(index.closure_mask(index.mask(a)) & u_mask == u_mask for a in attr_sets):
+        attr_sets.append(_some_key(U_attrs, index))
+    return _named(_drop_subsumed(attr_sets))
+
+
+def decompose_bcnf(U_attrs: set[str], F: list[tuple[list[str], str]]) -> list[Relation]:
+    """
+    Декомпозиция в НФБК: пока в отношении R есть X с X+ ∩ R ⊋ X, X не суперключ R —
+    R заменяется на X+ ∩ R и X ∪ (R \\ X+). Без потерь; зависимости могут теряться.
+    Нарушение — наименьший такой X (FDProjector.bcnf_violation), без полной проекции.
+    Строит эталон, поэтому без бюджета времени: по таймауту отношение приняли бы за НФБК.
+    """
+    projector = FDProjector([(list(lhs), rhs) for lhs, rhs in _sorted_fds(U_attrs, F)], time_budget=None)
+    done: list[set[str]] = []
+    todo = [set(U_attrs)]
+    while todo:
+        R = todo.pop(0)
+        check = projector.bcnf_violation(R)
+        if check.violation is None:
+            done.append(R)
+            continue
+        count("bcnf_split")
+        lhs, x_plus = check.violation
+        todo[:0] = [x_plus, set(lhs) | (R - x_plus)]
+    return _named(_drop_subsumed(done))
+
+
+def decompose_2nf(U_attrs: set[str], F: list[tuple[list[str], str]]) -> list[Relation]:
+    """
+    Декомпозиция во 2НФ по частичным зависимостям: каждый неключевой атрибут, зависящий
+    от части ключа, уходит в отношение с наименьшей такой частью X (X и все атрибуты,
+    для которых X — наименьшая часть ключа); основное отношение — остальные атрибуты.
+    """
+    F_u = [(list(lhs), rhs) for lhs, rhs in _sorted_fds(U_attrs, F)]
+    index = FDIndex(F_u)
+    keys = sorted((sorted(k) for k in candidate_keys(U_attrs, F_u)), key=lambda k: (len(k), k))
+    prime = set().union(*keys) if keys else set()
+    parts: list[list[str]] = []  # собственные подмножества ключей, по размеру и алфавиту
+    for k in keys:
+        for size in range(1, len(k)):
+            for sub in combinations(k, size):
+                if list(sub) not in parts:
+                    parts.append(list(sub))
+    parts.sort(key=lambda p: (len(p), p))
+    moved: dict[str, tuple[str, ...]] = {}  # неключевой атрибут -> наименьшая определяющая часть ключа
+    for part in parts:
+        for a in sorted(index.attrs(index.closure_mask(index.mask(part)))):
+            if a in U_attrs and a not in prime and a not in moved:
+                moved[a] = tuple(part)
+    groups: dict[tuple[str, ...], set[str]] = {}
+    for a, part in moved.items():
+        groups.setdefault(part, set(part)).add(a)
+    main = set(U_attrs) - set(moved)
+    return _named(_drop_subsumed([main] + [groups[p] for p in sorted(groups, key=lambda p: (len(p), p))]))
+
+
+def _format(relations: list[Relation], order: list[str]) -> list[str]:
+    pos = {a: i for i, a in enumerate(order)}
+    return [f"{name}({', '.join(sorted(attrs, key=lambda a: pos.get(a, len(pos))))})" for name, attrs in relations]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Построенные декомпозиции против заданий №11 и №13 эталона."""
+    from app.core.checks import task1, task4, task11
+    from app.core.checks.common import canon_attr_for_compare
+    from app.core.excel.importer import parse_workbook
+
+    args = sys.argv[1:] if argv is None else argv
+    if not args:
+        print("usage: python -m app.core.algos.decomposition <workbook.xlsx>", file=sys.stderr)
+        return 2
+    parsed = parse_workbook(args[0])
+    attrs = [canon_attr_for_compare(a) for a in task1.extract_headers_ref(parsed)]
+    if not attrs:
+        print("В книге нет атрибутов задания №1.", file=sys.stderr)
+        return 1
+    dict_ref = {a: a for a in attrs}
+    U = set(attrs)
+    F = task4.extract_fds_ref(parsed, dict_ref)
+    for title, built, task_num in (
+        ("2НФ", decompose_2nf(U, F), 11),
+        ("3НФ (синтез)", synthesize_3nf(U, F), 13),
+        ("НФБК", decompose_bcnf(U, F), None),
+    ):
+        print(f"{title}:")
+        for line in _format(built, attrs):
+            print(f"  {line}")
+        if task_num is None:
+            continue
+        given = {frozenset(a) for _, a in task11.extract_relations(parsed, task_num, dict_ref)}
+        if given == {frozenset(a) for _, a in built}:
+            print(f"  = задание №{task_num} эталона")
+        else:
+            print(f"  ! задание №{task_num} эталона: {'; '.join(_format(task11.extract_relations(parsed, task_num, dict_ref), attrs))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+FD discovery from table data (TANE): level-wise search over attribute sets.
+
+Уровень ℓ — наборы из ℓ атрибутов (битовые маски), для каждого хранится урезанное
+разбиение только текущего и предыдущего уровня. X\\{A} -> A выполняется, если
+e(X\\{A}) == e(X), где e(π) = Σ|класс| − число классов. Отсечения: множества-кандидаты
+правых частей C+(X), ключи (e(X) = 0) не расширяются. Поиск ограничен размером LHS,
+числом наборов на уровне (память) и бюджетом времени; при исчерпании лимита результат
+помечается неполным (найденные ФЗ верны и минимальны, но не все).
+
+CLI для преподавателя: ``python -m app.core.algos.discovery reference.xlsx`` — ФЗ,
+выполняющиеся в таблице 1НФ (задание №3), против ФЗ задания №4.
+"""
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional, Sequence
+
+from app.core.algos.partitions import Partition, column_partition, partition_product
+from app.core.excel.columnar import table_columns
+from app.core.settings import DISCOVERY_MAX_LEVEL_SETS, DISCOVERY_MAX_LHS, DISCOVERY_TIME_BUDGET_SEC
+from app.core.trace import count, span
+
+
+@dataclass
+class DiscoveryResult:
+    """Минимальные нетривиальные ФЗ, выполняющиеся на данных (LHS в порядке заголовков)."""
+    fds: list[tuple[list[str], str]] = field(default_factory=list)
+    complete: bool = True  # False — поиск остановлен по бюджету времени или памяти
+    max_lhs: int = 0
+    elapsed_sec: float = 0.0
+
+    def determinants(self, rhs: str) -> list[list[str]]:
+        """Минимальные LHS, определяющие rhs в данных."""
+        return [lhs for lhs, r in self.fds if r == rhs]
+
+
+def _error(p: Partition) -> int:
+    return sum(len(c) for c in p) - len(p)
+
+
+def discover_fds(
+    headers: Sequence[str],
+    rows: Sequence[Sequence[Any]],
+    max_lhs: int = DISCOVERY_MAX_LHS,
+    time_budget: Optional[float] = DISCOVERY_TIME_BUDGET_SEC,
+    max_level_sets: int = DISCOVERY_MAX_LEVEL_SETS,
+) -> DiscoveryResult:
+    """Все минимальные ФЗ X -> A с |X| <= max_lhs, выполняющиеся в rows (пустые X — константы)."""
+    t0 = time.perf_counter()
+    deadline = t0 + time_budget if time_budget else None
+    names: list[str] = []
+    for h in headers:
+        if h not in names:
+            names.append(h)
+    col_index = [list(headers).index(h) for h in names]
+    n_rows = len(rows)
+    n = len(names)
+    full = (1 << n) - 1
+    columns = table_columns(rows, col_index)
+    result = DiscoveryResult(max_lhs=max_lhs)
+
+    def bits(mask: int) -> list[int]:
+        return [i for i in range(n) if mask >> i & 1]
+
+    def emit(lhs_mask: int, a: int) -> None:
+        result.fds.append(([names[i] for i in bits(lhs_mask)], names[a]))
+
+    def holds_by_scan(p: Partition, a: int) -> bool:
+        col = columns[a]
+        return all(all(col[r] == col[c[0]] for r in c[1:]) for c in p)
+
+    with span("discover_fds", attrs=n, rows=n_rows):
+        # Уровень 0: пустое множество — один класс из всех строк
+        prev_part: dict[int, Partition] = {0: [list(range(n_rows))] if n_rows > 1 else []}
+        prev_err: dict[int, int] = {0: _error(prev_part[0])}
+        prev_cplus: dict[int, int] = {0: full}
+        level: dict[int, Partition] = {1 << i: column_partition(columns[i]) for i in range(n)}
+        size = 1
+        while level and size <= max_lhs + 1:
+            err = {x: _error(p) for x, p in level.items()}
+            cplus: dict[int, int] = {}
+            # compute_dependencies
+            for x in level:
+                if deadline and time.perf_counter() > deadline:
+                    result.complete = False
+                    break
+                c = full
+                for b in bits(x):
+                    c &= prev_cplus.get(x & ~(1 << b), 0)
+                for a in bits(x & c):
+                    sub = x & ~(1 << a)
+                    count("discovery_test")
+                    if prev_err[sub] == err[x]:
+                        emit(sub, a)
+                        c &= ~(1 << a)
+                        c &= x  # B ∈ R \\ X больше не кандидаты
+                cplus[x] = c
+            if not result.complete:
+                break
+            # prune: пустые C+ и ключи
+            survivors: dict[int, Partition] = {}
+            for x, p in level.items():
+                c = cplus[x]
+                if not c:
+                    continue
+                if err[x] == 0:  # ключ: X -> A для всех A; минимальность — по подмножествам X\{B}
+                    if size <= max_lhs:
+                        for a in bits(full & ~x):
+                            if not any(holds_by_scan(prev_part[x & ~(1 << b)], a) for b in bits(x)):
+                                emit(x, a)
+                    continue
+                survivors[x] = p
+            if size > max_lhs:
+                break
+            # generate_next_level: объединения наборов с общим префиксом, все подмножества живы
+            nxt: dict[int, Partition] = {}
+            keys = sorted(survivors, key=lambda m: bits(m))
+            by_prefix: dict[int, list[int]] = {}
+            for x in keys:
+                top = x.bit_length() - 1
+                by_prefix.setdefault(x & ~(1 << top), []).append(x)
+            for group in by_prefix.values():
+                for i, x in enumerate(group):
+                    for z in group[i + 1:]:
+                        y = x | z
+                        if any((y & ~(1 << b)) not in survivors for b in bits(y)):
+                            continue
+                        nxt[y] = partition_product(survivors[x], survivors[z], n_rows)
+                if len(nxt) > max_level_sets or (deadline and time.perf_counter() > deadline):
+                    result.complete = False
+                    break
+            if not result.complete:
+                break
+            prev_part, prev_err, prev_cplus = survivors, err, cplus
+            level = nxt
+            size += 1
+
+    order = {h: i for i, h in enumerate(names)}
+    result.fds.sort(key=lambda fd: (len(fd[0]), order[fd[1]], [order[a] for a in fd[0]]))
+    result.elapsed_sec = time.perf_counter() - t0
+    return result
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Сверка эталона: ФЗ из данных таблицы №3 против ФЗ задания №4."""
+    from app.core.algos.fd import closure
+    from app.core.checks import task1, task3, task4
+    from app.core.checks.common import canon_attr_for_compare
+    from app.core.excel.importer import parse_workbook
+
+    args = sys.argv[1:] if argv is None else argv
+    if not args:
+        print("usage: python -m app.core.algos.discovery <workbook.xlsx> [max_lhs]", file=sys.stderr)
+        return 2
+    parsed = parse_workbook(args[0])
+    max_lhs = int(args[1]) if len(args) > 1 else DISCOVERY_MAX_LHS
+    table = task3._get_table_1nf(parsed)
+    if not table:
+        print("В книге нет таблицы 1НФ (задание №3).", file=sys.stderr)
+        return 1
+    headers = [canon_attr_for_compare(h) for h in table[0]]
+    res = discover_fds(headers, table[1], max_lhs=max_lhs, time_budget=None)
+    dict_ref = {canon_attr_for_compare(a): canon_attr_for_compare(a) for a in task1.extract_headers_ref(parsed)}
+    declared = task4.extract_fds_ref(parsed, dict_ref)
+    print(f"Строк: {len(table[1])}, атрибутов: {len(headers)}, ФЗ в данных (|LHS| <= {max_lhs}): {len(res.fds)}")
+    for lhs, rhs in res.fds:
+        mark = "" if rhs in closure(lhs, declared) else "   (не следует из задания №4)"
+        print(f"  {', '.join(lhs) or '∅'} -> {rhs}{mark}")
+    found = res.fds
+    for lhs, rhs in declared:
+        if rhs not in closure(lhs, found) and len(lhs) <= max_lhs:
+            print(f"  ! задание №4: {', '.join(lhs)} -> {rhs} не выполняется в таблице №3")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
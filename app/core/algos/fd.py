@@ -1,5 +1,7 @@
 """Closure and minimal cover for FDs."""
-from typing import Iterable
+from typing import Iterable, Sequence
+
+from app.core.trace import count
 
 
 def closure(X: Iterable[str], F: list[tuple[list[str], str]]) -> set[str]:
@@ -7,6 +9,7 @@ def closure(X: Iterable[str], F: list[tuple[list[str], str]]) -> set[str]:
     Вычисление замыкания X+ по F.
     F: список (lhs_list, rhs), rhs — один атрибут.
     """
+    count("closure")
     Xset = set(X)
     result = set(Xset)
     F_single = [(list(lhs), r) for lhs, r in F]
@@ -22,6 +25,68 @@ def closure(X: Iterable[str], F: list[tuple[list[str], str]]) -> set[str]:
     return result
 
 
+class FDIndex:
+    """
+    F над битовыми масками атрибутов для многократных замыканий (линейный алгоритм
+    со счётчиками: каждая ФЗ срабатывает один раз, когда покрыта вся её LHS).
+    Атрибуты вне F получают биты по мере появления в mask().
+    """
+
+    def __init__(self, F: Sequence[tuple[Sequence[str], str]]) -> None:
+        self.bit: dict[str, int] = {}
+        self._lhs: list[int] = []
+        self._lhs_size: list[int] = []
+        self._rhs: list[int] = []
+        self._by_attr: dict[int, list[int]] = {}  # бит атрибута -> ФЗ, где он в LHS
+        self._empty_lhs = 0  # правые части ФЗ с пустой LHS
+        for lhs, rhs in _single_rhs(list(F)):
+            lhs_mask = self.mask(lhs)
+            r = self.mask([rhs])
+            if not lhs_mask:
+                self._empty_lhs |= r
+                continue
+            i = len(self._lhs)
+            self._lhs.append(lhs_mask)
+            self._lhs_size.append(bin(lhs_mask).count("1"))
+            self._rhs.append(r)
+            m = lhs_mask
+            while m:
+                b = m & -m
+                self._by_attr.setdefault(b, []).append(i)
+                m ^= b
+
+    def mask(self, attrs: Iterable[str]) -> int:
+        m = 0
+        for a in attrs:
+            b = self.bit.get(a)
+            if b is None:
+                b = self.bit[a] = 1 << len(self.bit)
+            m |= b
+        return m
+
+    def attrs(self, mask: int) -> set[str]:
+        return {a for a, b in self.bit.items() if mask & b}
+
+    def closure_mask(self, mask: int) -> int:
+        count("closure")
+        result = mask | self._empty_lhs
+        missing = list(self._lhs_size)
+        queue = result
+        while queue:
+            b = queue & -queue
+            queue ^= b
+            for i in self._by_attr.get(b, ()):
+                missing[i] -= 1
+                if not missing[i]:
+                    new = self._rhs[i] & ~result
+                    result |= new
+                    queue |= new
+        return result
+
+    def closure(self, X: Iterable[str]) -> set[str]:
+        return self.attrs(self.closure_mask(self.mask(X)))
+
+
 def _single_rhs(F: list[tuple[list[str], str]]) -> list[tuple[list[str], str]]:
     """Split RHS so each FD has single attribute on RHS."""
     out = []
@@ -47,14 +112,21 @@ def minimal_cover(F: list[tuple[list[str], str]]) -> list[tuple[list[str], str]]
     """
     Compute minimal cover: RHS single attr, no redundant LHS attributes, no redundant FDs.
     """
+    count("minimal_cover")
     G = _single_rhs(F)
     # Minimize LHS for each FD
     G = [(_minimize_lhs(lhs, rhs, G), rhs) for lhs, rhs in G]
     G = [(sorted(lhs), rhs) for lhs, rhs in G]
-    # Remove redundant FDs: FD is redundant if closure without it still gives same result
-    result = []
-    for i, (lhs, rhs) in enumerate(G):
-        rest = [g for j, g in enumerate(G) if j != i]
-        if rhs not in closure(lhs, rest):
-            result.append((lhs, rhs))
+    # Дубликаты (в т.ч. появившиеся после минимизации LHS) оставляем в одном экземпляре
+    unique = []
+    for fd in G:
+        if fd not in unique:
+            unique.append(fd)
+    # Remove redundant FDs one at a time: check against FDs still kept, not the original set,
+    # otherwise two FDs that imply each other are both dropped
+    result = list(unique)
+    for fd in unique:
+        rest = [g for g in result if g != fd]
+        if fd[1] in closure(fd[0], rest):
+            result = rest
     return result
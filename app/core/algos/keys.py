@@ -1,6 +1,7 @@
 """Candidate keys and superkey check. Uses closure cache for performance."""
 from app.core.algos.fd import closure
 from app.core.settings import KEYS_MAX_OPTIONAL
+from app.core.trace import count
 
 
 def _closure_cached(
@@ -32,6 +33,7 @@ def candidate_keys(
     Перебор подмножеств optional с отсечением по уже найденным ключам.
     max_optional: ограничение размера optional для перебора (защита от взрыва при 30+ атрибутах).
     """
+    count("candidate_keys")
     rhs_attrs = set()
     for lhs, rhs in F:
         rhs_attrs.add(rhs)
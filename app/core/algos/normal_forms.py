@@ -1,11 +1,12 @@
 """2NF and 3NF checks for a relation."""
 from app.core.algos.fd import closure
 from app.core.algos.keys import candidate_keys, is_superkey
+from app.core.algos.projection import project_fds
 
 
 def _F_local(attrs: set[str], F: list[tuple[list[str], str]]) -> list[tuple[list[str], str]]:
-    """Project F onto relation: only FDs with both sides in attrs."""
-    return [(lhs, rhs) for lhs, rhs in F if set(lhs) <= attrs and rhs in attrs]
+    """Project F onto relation: minimal cover of π_attrs(F+) (see projection.py)."""
+    return project_fds(attrs, F).fds
 
 
 def check_2nf(
@@ -0,0 +1,174 @@
+"""
+Stripped partitions over table columns and data-driven FD validation.
+
+Плюс однопроходная проверка ключа на данных: пустые значения и дубликаты.
+
+Разбиение π_X: строки таблицы, группированные по значениям X; «урезанное» — без
+классов из одной строки (они не могут нарушить X -> A). X -> A выполняется на данных,
+если внутри каждого класса π_X значение A одно и то же. Разбиение по набору атрибутов
+строится произведением разбиений (TANE) за линейное время и кэшируется.
+"""
+from dataclasses import dataclass
+from typing import Any, Hashable, Iterable, Optional, Sequence
+
+from app.core.excel.columnar import ColumnarTable, table_columns
+
+Partition = list[list[int]]  # классы (номера строк с 0, по возрастанию), только размера >= 2
+
+
+@dataclass(frozen=True)
+class FDCounterexample:
+    """ФЗ lhs -> rhs не выполняется: в каждой паре строк (0-based) lhs совпадает, rhs — нет."""
+    lhs: tuple[str, ...]
+    rhs: str
+    pairs: tuple[tuple[int, int], ...]
+
+
+@dataclass(frozen=True)
+class KeyViolation:
+    """Ключ не выполняется на данных: пустая ячейка (rows = (i,)) или дубликат (rows = (i, j))."""
+    key: tuple[str, ...]
+    reason: str  # "empty_cell" | "duplicate"
+    rows: tuple[int, ...]  # 0-based
+    values: tuple[Any, ...]
+
+
+def _is_empty(v: Any) -> bool:
+    return v is None or (isinstance(v, str) and not v.strip())
+
+
+def column_partition(values: Sequence[Hashable]) -> Partition:
+    groups: dict[Hashable, list[int]] = {}
+    for i, v in enumerate(values):
+        groups.setdefault(v, []).append(i)
+    return [g for g in groups.values() if len(g) > 1]
+
+
+def partition_product(p: Partition, q: Partition, n_rows: int) -> Partition:
+    """π_p · π_q за O(n_rows): пересечение классов через таблицу «строка -> класс p»."""
+    owner = [-1] * n_rows
+    for ci, cls in enumerate(p):
+        for r in cls:
+            owner[r] = ci
+    out: Partition = []
+    for cls in q:
+        buckets: dict[int, list[int]] = {}
+        for r in cls:
+            c = owner[r]
+            if c >= 0:
+                buckets.setdefault(c, []).append(r)
+        out.extend(b for b in buckets.values() if len(b) > 1)
+    return out
+
+
+class PartitionIndex:
+    """
+    Разбиения одной таблицы: по столбцу — один проход, по набору — произведение
+    разбиения подмножества (из кэша) и столбца. Атрибуты — канонические заголовки.
+    """
+
+    def __init__(self, headers: Sequence[str], rows: Sequence[Sequence[Any]]) -> None:
+        self.headers = list(headers)
+        self.rows = rows
+        self.n_rows = len(rows)
+        self._col: dict[str, int] = {}
+        for i, h in enumerate(self.headers):
+            self._col.setdefault(h, i)
+        self._columns: dict[str, list[Any]] = {}
+        self._cache: dict[frozenset[str], Partition] = {}
+
+    def has(self, attrs: Iterable[str]) -> bool:
+        return all(a in self._col for a in attrs)
+
+    def column(self, attr: str) -> Sequence[Any]:
+        """Значения столбца; у ColumnarTable — массив id строк пула (без копирования)."""
+        col = self._columns.get(attr)
+        if col is None:
+            col = self._columns[attr] = table_columns(self.rows, [self._col[attr]])[0]
+        return col
+
+    def partition(self, attrs: Iterable[str]) -> Partition:
+        key = frozenset(attrs)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        if not key:
+            result = [list(range(self.n_rows))] if self.n_rows > 1 else []
+        elif len(key) == 1:
+            (a,) = key
+            result = column_partition(self.column(a))
+        else:
+            # Предпочитаем уже посчитанное подмножество (типично: LHS, растущие по одному атрибуту)
+            order = sorted(key)
+            a = next((x for x in order if key - {x} in self._cache), order[-1])
+            result = partition_product(self.partition(key - {a}), self.partition([a]), self.n_rows)
+        self._cache[key] = result
+        return result
+
+    def counterexamples(self, lhs: Iterable[str], rhs: str, limit: int = 3) -> list[tuple[int, int]]:
+        """До limit пар строк, совпадающих по lhs и различающихся по rhs (по одной на класс)."""
+        values = self.column(rhs)
+        pairs: list[tuple[int, int]] = []
+        for cls in self.partition(lhs):
+            first = cls[0]
+            v0 = values[first]
+            for r in cls[1:]:
+                if values[r] != v0:
+                    pairs.append((first, r))
+                    break
+            if len(pairs) >= limit:
+                break
+        return pairs
+
+    def holds(self, lhs: Iterable[str], rhs: str) -> bool:
+        return not self.counterexamples(lhs, rhs, limit=1)
+
+    def validate(self, F: list[tuple[list[str], str]], limit: int = 3) -> list[FDCounterexample]:
+        """
+        Нарушенные на данных ФЗ из F с контрпримерами. ФЗ с атрибутами,
+        которых нет в заголовках таблицы, пропускаются.
+        """
+        out = []
+        for lhs, rhs in F:
+            if not self.has(lhs) or not self.has([rhs]) or rhs in lhs:
+                continue
+            pairs = self.counterexamples(lhs, rhs, limit=limit)
+            if pairs:
+                out.append(FDCounterexample(lhs=tuple(lhs), rhs=rhs, pairs=tuple(pairs)))
+        return out
+
+    def scan_key(self, key: Sequence[str]) -> Optional[KeyViolation]:
+        """
+        Один проход по строкам: первая строка с пустым значением ключа или первый
+        дубликат (хэш кортежа значений -> номер первой строки). Атрибуты ключа,
+        которых нет в таблице, игнорируются; без известных атрибутов — None.
+        """
+        key_t = tuple(a for a in key if a in self._col)
+        if not key_t:
+            return None
+        if isinstance(self.rows, ColumnarTable):
+            strings = self.rows.pool.strings
+            blank = {i for i, s in enumerate(strings) if not s.strip()}
+            is_empty = blank.__contains__
+
+            def decode(values: tuple[Any, ...]) -> tuple[Any, ...]:
+                return tuple(strings[i] for i in values)
+        else:
+            is_empty, decode = _is_empty, tuple
+        seen: dict[tuple[Any, ...], int] = {}
+        for r, values in enumerate(zip(*(self.column(a) for a in key_t))):
+            if any(map(is_empty, values)):
+                return KeyViolation(key=key_t, reason="empty_cell", rows=(r,), values=decode(values))
+            first = seen.setdefault(values, r)
+            if first != r:
+                return KeyViolation(key=key_t, reason="duplicate", rows=(first, r), values=decode(values))
+        return None
+
+
+def validate_fds(
+    headers: Sequence[str],
+    rows: Sequence[Sequence[Any]],
+    F: list[tuple[list[str], str]],
+    limit: int = 3,
+) -> list[FDCounterexample]:
+    return PartitionIndex(headers, rows).validate(F, limit=limit)
@@ -0,0 +1,168 @@
+"""
+Projection of FDs onto a relation: a minimal cover of π_R(F+).
+
+Подмножества X ⊆ R перебираются по уровням (|X| = 0, 1, 2, …) над битовыми масками;
+X -> A выписывается для A ∈ (X+ ∩ R) \\ X, если ни одно уже найденное Y ⊂ X не
+определяет A. Отсечения: суперключи R не расширяются; X, в котором атрибут B
+выводится из X \\ {B}, не рассматривается (и его надмножества тоже) — он не даёт
+минимальных LHS. Замыкания кэшируются в FDProjector на всё F, поэтому отношения
+одной схемы (задания №11 и №13) переиспользуют их. При превышении числа атрибутов
+или бюджета времени — найденное плюс ФЗ из F внутри R, ``complete=False``.
+"""
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional
+
+from app.core.algos.fd import FDIndex, _single_rhs, minimal_cover
+from app.core.settings import PROJECTION_MAX_ATTRS, PROJECTION_TIME_BUDGET_SEC
+from app.core.trace import count, span
+
+FD = tuple[list[str], str]
+
+
+@dataclass
+class Projection:
+    """Минимальное покрытие проекции F+ на R (LHS отсортированы)."""
+    fds: list[FD] = field(default_factory=list)
+    complete: bool = True  # False — лимит атрибутов или времени, в fds может не хватать следствий
+
+
+@dataclass
+class BCNFCheck:
+    """Итог поиска нарушения НФБК в R: violation — (X, X+ ∩ R) или None."""
+    violation: Optional[tuple[list[str], set[str]]] = None
+    complete: bool = True  # False — бюджет времени исчерпан: None не значит, что R в НФБК
+
+
+class FDProjector:
+    """Проекции одного F на разные отношения; кэш замыканий и готовых проекций."""
+
+    def __init__(
+        self,
+        F: list[FD],
+        max_attrs: int = PROJECTION_MAX_ATTRS,
+        time_budget: Optional[float] = PROJECTION_TIME_BUDGET_SEC,
+    ) -> None:
+        self.F = _single_rhs(F)
+        self.index = FDIndex(self.F)
+        self.max_attrs = max_attrs
+        self.time_budget = time_budget
+        self._closures: dict[int, int] = {}
+        self._projections: dict[frozenset[str], Projection] = {}
+
+    def _closure(self, mask: int) -> int:
+        c = self._closures.get(mask)
+        if c is None:
+            c = self._closures[mask] = self.index.closure_mask(mask)
+        else:
+            count("projection_closure_hit")
+        return c
+
+    def project(self, R: Iterable[str]) -> Projection:
+        key = frozenset(R)
+        cached = self._projections.get(key)
+        if cached is None:
+            with span("project_fds", attrs=len(key)):
+                cached = self._projections[key] = self._project(key)
+        return Projection(list(cached.fds), cached.complete)
+
+    def _free_sets(self, R: frozenset[str], deadline: Optional[float]) -> Iterator[tuple[Optional[int], int]]:
+        """
+        Свободные X ⊆ R по уровням (от пустого) с их замыканиями; надмножества суперключей
+        и несвободных наборов пропускаются. По истечении времени — (None, 0) и конец.
+        """
+        bits = [self.index.mask([a]) for a in sorted(R)]
+        r_mask = self.index.mask(R)
+        c0 = self._closure(0)
+        yield 0, c0
+        # уровень: маска X -> (замыкание, номер последнего бита X в bits)
+        level: dict[int, tuple[int, int]] = {} if c0 & r_mask == r_mask else {0: (c0, -1)}
+        while level:
+            nxt: dict[int, tuple[int, int]] = {}
+            for x, (_, last) in level.items():
+                for k in range(last + 1, len(bits)):
+                    y = x | bits[k]
+                    # все подмножества X ∪ {B} \ {C} должны пройти отсечения на прошлом уровне;
+                    # C ∈ (X ∪ {B} \ {C})+ — X ∪ {B} не свободно
+                    sub, ok = y, True
+                    while sub:
+                        b = sub & -sub
+                        sub ^= b
+                        prev = level.get(y ^ b)
+                        if prev is None or prev[0] & b:
+                            ok = False
+                            break
+                    if not ok:
+                        continue
+                    c = self._closure(y)
+                    yield y, c
+                    if c & r_mask != r_mask:
+                        nxt[y] = (c, k)
+                if deadline and time.perf_counter() > deadline:
+                    count("projection_timeout")
+                    yield None, 0
+                    return
+            level = nxt
+
+    def _deadline(self) -> Optional[float]:
+        return time.perf_counter() + self.time_budget if self.time_budget else None
+
+    def _project(self, R: frozenset[str]) -> Projection:
+        inside = [(sorted(lhs), rhs) for lhs, rhs in self.F if rhs in R and set(lhs) <= R and rhs not in lhs]
+        if len(inside) == len(self.F):  # R содержит все атрибуты F: проекция — само F
+            return Projection(minimal_cover(inside))
+        if len(R) > self.max_attrs:
+            count("projection_over_limit")
+            return Projection(minimal_cover(inside), complete=False)
+        r_mask = self.index.mask(R)
+        found: dict[int, list[int]] = {}  # бит A -> минимальные LHS, уже определяющие A
+        out: list[tuple[int, int]] = []
+        complete = True
+        for x, closure in self._free_sets(R, self._deadline()):
+            if x is None:
+                complete = False
+                break
+            new = closure & r_mask & ~x
+            while new:
+                a = new & -new
+                new ^= a
+                lhs_list = found.setdefault(a, [])
+                if not any(y & x == y for y in lhs_list):
+                    lhs_list.append(x)
+                    out.append((x, a))
+        attrs = self.index.attrs
+        fds = [(sorted(attrs(x)), next(iter(attrs(a)))) for x, a in out]
+        if not complete:
+            fds += [fd for fd in inside if fd not in fds]
+        return Projection(minimal_cover(fds), complete)
+
+    def bcnf_violation(self, R: Iterable[str]) -> BCNFCheck:
+        """
+        Наименьший (по уровням) X ⊆ R, не суперключ R, с X+ ∩ R ⊋ X: (X, X+ ∩ R).
+        Полная проекция не строится — перебор останавливается на первом нарушении.
+        Нарушения нет: R в НФБК, если complete; иначе перебор не уложился в бюджет времени.
+        """
+        key = frozenset(R)
+        r_mask = self.index.mask(key)
+        for x, closure in self._free_sets(key, self._deadline()):
+            if x is None:
+                return BCNFCheck(complete=False)
+            c = closure & r_mask
+            if c != r_mask and c & ~x:
+                return BCNFCheck((sorted(self.index.attrs(x)), self.index.attrs(c)))
+        return BCNFCheck()
+
+
+def _fd_key(F: list[FD]) -> tuple[tuple[tuple[str, ...], str], ...]:
+    return tuple((tuple(lhs), rhs) for lhs, rhs in _single_rhs(F))
+
+
+@lru_cache(maxsize=8)
+def _projector(key: tuple[tuple[tuple[str, ...], str], ...]) -> FDProjector:
+    return FDProjector([(list(lhs), rhs) for lhs, rhs in key])
+
+
+def project_fds(R: Iterable[str], F: list[FD]) -> Projection:
+    """Проекция F на R; проекторы (с кэшем замыканий) переиспользуются для одного и того же F."""
+    return _projector(_fd_key(F)).project(R)
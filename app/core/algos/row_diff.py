@@ -0,0 +1,125 @@
+"""
+Multiset diff of table rows by 64-bit fingerprints.
+
+Отпечаток строки — 64-битный хэш кортежа ячеек (в пределах процесса, не сохраняется).
+Строки сопоставляются по равным отпечаткам, совпадение проверяется сравнением ячеек
+(коллизия не даёт ложного «совпало»); в словаре — только int и номера строк, без
+копий строк. Для несопоставленных строк по каждому столбцу c строится индекс
+«отпечаток строки без ячейки c»: за O((M + E) · столбцы) находятся пары
+«отсутствует / лишняя», различающиеся ровно в одной ячейке.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Sequence
+
+from app.core.excel.columnar import ColumnarTable
+from app.core.trace import count
+
+
+@dataclass(frozen=True)
+class NearMatch:
+    """Строка эталона ref_row и строка ответа stu_row (0-based) различаются только в столбце column."""
+    ref_row: int
+    stu_row: int
+    column: int
+
+
+@dataclass
+class RowDiff:
+    matched: int = 0
+    missing: list[int] = field(default_factory=list)  # строки эталона без пары, по порядку
+    extra: list[int] = field(default_factory=list)  # строки ответа без пары, по порядку
+    near: list[NearMatch] = field(default_factory=list)  # подмножество missing × extra
+
+
+def _fingerprint(cells: tuple[Any, ...]) -> int:
+    """64-битный отпечаток строки: hash кортежа (в пределах процесса)."""
+    return hash(cells)
+
+
+def _tuples(rows: Sequence[Sequence[Any]], n_cols: int) -> list[tuple[Any, ...]]:
+    """Ровно n_cols ячеек: лишние отбрасываются, недостающие — пустая строка."""
+    if isinstance(rows, ColumnarTable) and rows.n_cols == n_cols:
+        return list(zip(*(rows.column(c) for c in range(n_cols)))) if n_cols else [()] * len(rows)
+    return [
+        tuple(r) if len(r) == n_cols else tuple(r[:n_cols]) + ("",) * (n_cols - len(r))
+        for r in rows
+    ]
+
+
+def diff_rows(ref_rows: Sequence[Sequence[Any]], stu_rows: Sequence[Sequence[Any]], n_cols: int) -> RowDiff:
+    """Разность мультимножеств строк (первые n_cols ячеек) с поиском пар, отличающихся одной ячейкой."""
+    if (
+        isinstance(ref_rows, ColumnarTable)
+        and isinstance(stu_rows, ColumnarTable)
+        and ref_rows.pool is stu_rows.pool
+        and ref_rows.n_cols == stu_rows.n_cols == n_cols
+    ):
+        ref_rows, stu_rows = list(ref_rows.row_ids()), list(stu_rows.row_ids())  # общий пул: id вместо строк
+    else:
+        ref_rows, stu_rows = _tuples(ref_rows, n_cols), _tuples(stu_rows, n_cols)
+    buckets: dict[int, deque[int]] = {}
+    for i, fp in enumerate(map(_fingerprint, ref_rows)):
+        bucket = buckets.get(fp)
+        if bucket is None:
+            buckets[fp] = deque((i,))
+        else:
+            bucket.append(i)
+    out = RowDiff()
+    for j, fp in enumerate(map(_fingerprint, stu_rows)):
+        row = stu_rows[j]
+        bucket = buckets.get(fp)
+        if bucket:
+            if ref_rows[bucket[0]] == row:
+                bucket.popleft()
+                out.matched += 1
+                continue
+            # Коллизия отпечатков: ищем равную строку в остатке корзины
+            count("row_hash_collision")
+            k = next((k for k, i in enumerate(bucket) if ref_rows[i] == row), None)
+            if k is not None:
+                del bucket[k]
+                out.matched += 1
+                continue
+        out.extra.append(j)
+    out.missing = sorted(i for bucket in buckets.values() for i in bucket)
+    if out.missing and out.extra:
+        out.near = _near_matches(ref_rows, stu_rows, out.missing, out.extra, n_cols)
+    return out
+
+
+def _near_matches(
+    ref_rows: list[tuple[Any, ...]],
+    stu_rows: list[tuple[Any, ...]],
+    missing: list[int],
+    extra: list[int],
+    n_cols: int,
+) -> list[NearMatch]:
+    """
+    Индекс по столбцу c: отпечаток строки без ячейки c -> лишние строки ответа.
+    Жадно, по столбцам слева направо; каждая строка — не более чем в одной паре.
+    """
+    paired_ref: set[int] = set()
+    paired_stu: set[int] = set()
+    out: list[NearMatch] = []
+    for c in range(n_cols):
+        index: dict[int, list[int]] = {}
+        for j in extra:
+            if j not in paired_stu:
+                row = stu_rows[j]
+                index.setdefault(_fingerprint(row[:c] + row[c + 1:]), []).append(j)
+        if not index:
+            break
+        for i in missing:
+            if i in paired_ref:
+                continue
+            a = ref_rows[i]
+            for j in index.get(_fingerprint(a[:c] + a[c + 1:]), ()):
+                b = stu_rows[j]
+                if j not in paired_stu and a[:c] == b[:c] and a[c + 1:] == b[c + 1:]:
+                    out.append(NearMatch(ref_row=i, stu_row=j, column=c))
+                    paired_ref.add(i)
+                    paired_stu.add(j)
+                    break
+    out.sort(key=lambda m: m.ref_row)
+    return out
@@ -0,0 +1,182 @@
+"""Batch grading: one parsed reference, many student files, graded in a process pool."""
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Iterator, Optional, Union
+
+from app.core.compare import compare_parsed, compare_variants
+from app.core.dedup import Cluster, TaskResultCache, file_digest, find_clusters
+from app.core.excel.importer import ParsedSolution, parse_workbook
+from app.core.report import build_html_report
+from app.core.settings import BATCH_MAX_WORKERS
+from app.core.similarity import SimilarityIndex, SimilarPair
+from app.core.trace import collect, span
+from app.core.variants import VariantSource, load_reference
+
+EXCEL_SUFFIXES = (".xlsx", ".xlsm")
+
+# Эталон (все варианты), разобранный один раз и переданный в каждый процесс пула через initializer
+_worker_ref: Optional[VariantSource] = None
+_worker_ref_path = ""
+# Результаты проверок одинаковых ответов в этом процессе пула (app.core.dedup)
+_worker_cache: Optional[TaskResultCache] = None
+
+
+def list_student_files(folder: Union[str, Path]) -> list[Path]:
+    """Excel-файлы папки (без вложенных), без временных файлов Excel (~$...) и скрытых."""
+    out = []
+    for p in sorted(Path(folder).iterdir()):
+        if not p.is_file() or p.suffix.lower() not in EXCEL_SUFFIXES:
+            continue
+        if p.name.startswith(("~$", ".")):
+            continue
+        out.append(p)
+    return out
+
+
+def _init_worker(ref: VariantSource, ref_path: str) -> None:
+    global _worker_ref, _worker_ref_path, _worker_cache
+    _worker_ref = ref
+    _worker_ref_path = ref_path
+    _worker_cache = TaskResultCache()
+
+
+def grade_student(
+    ref: Union[ParsedSolution, VariantSource],
+    ref_path: str,
+    stu_path: Union[str, Path],
+    cache: Optional[TaskResultCache] = None,
+) -> dict[str, Any]:
+    """
+    Parse one student file and run all checks against the parsed reference
+    (variants of a workbook or a reference library — against the one matching the student's task 1).
+    With cache, answers seen before are not re-checked and the result carries answer digests.
+    Never raises: on error returns {"stu_path", "error"}.
+    """
+    try:
+        with collect("grade_student", file=Path(stu_path).name) as tr:
+            stu = parse_workbook(stu_path)
+            if isinstance(ref, ParsedSolution):
+                result = compare_parsed(ref, stu, ref_path, stu_path, cache=cache)
+            else:
+                result = compare_variants(ref, stu, ref_path, stu_path, cache=cache)
+            with span("report"):
+                result["report_html"] = build_html_report(result)
+        if tr is not None:
+            result["trace"] = tr.to_dict()
+        return result
+    except Exception as e:  # один битый файл не должен останавливать пакет
+        return {"ref_path": ref_path, "stu_path": str(stu_path), "error": f"{e!s}"}
+
+
+def _grade_in_worker(stu_path: str) -> dict[str, Any]:
+    assert _worker_ref is not None, "worker not initialized"
+    result = grade_student(_worker_ref, _worker_ref_path, stu_path, _worker_cache)
+    # Эталон уже есть у вызывающего процесса — не гоняем его обратно через pickle
+    result.pop("ref_parsed", None)
+    return result
+
+
+class BatchGrader:
+    """
+    Reference is parsed once in the calling process and shipped to each worker once;
+    students are graded in parallel, results are yielded as they complete.
+    Every reference sheet is a variant; self.ref is the active one. ref_path may be
+    a folder of references (app.core.library): workers then read variants from its index.
+    Byte-identical files are graded once; identical task answers reuse one TaskResult
+    per process; after grade() self.clusters lists groups of identical work and
+    self.similar — pairs of similar works (MinHash/LSH over shingles, app.core.similarity).
+    """
+
+    def __init__(self, ref_path: Union[str, Path], max_workers: Optional[int] = BATCH_MAX_WORKERS) -> None:
+        self.ref_path = str(ref_path)
+        self.variants = load_reference(ref_path)
+        self.ref = self.variants.default
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.clusters: list[Cluster] = []
+        self.similar: list[SimilarPair] = []  # a, b — индексы в stu_paths
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def grade(self, stu_paths: list[Union[str, Path]]) -> Iterator[tuple[int, dict[str, Any]]]:
+        """Yield (index in stu_paths, result dict) in completion order."""
+        self.clusters = []
+        self.similar = []
+        if not stu_paths:
+            return
+        with span("dedup_files", files=len(stu_paths)):
+            file_digests = {i: file_digest(p) for i, p in enumerate(stu_paths)}
+        first: dict[str, int] = {}
+        copies: dict[int, list[int]] = {}  # первый файл -> его побайтные копии
+        for i, d in file_digests.items():
+            if d and d in first:
+                copies.setdefault(first[d], []).append(i)
+            else:
+                first.setdefault(d, i)
+        skipped = {j for c in copies.values() for j in c}
+        unique = [i for i in range(len(stu_paths)) if i not in skipped]
+        answers: dict[int, str] = {}
+        index = SimilarityIndex()
+        graded = self._grade_unique(stu_paths, unique)
+        try:
+            for i, result in graded:
+                answers[i] = result.get("answer_digest", "")
+                shingles = result.get("shingles", frozenset())
+                index.add(i, shingles)
+                yield i, result
+                for j in copies.get(i, []):
+                    answers[j] = answers[i]
+                    index.add(j, shingles)
+                    yield j, _copy_result(result, stu_paths[j], stu_paths[i])
+        finally:
+            graded.close()
+        self.clusters = find_clusters(answers, file_digests)
+        self.similar = sorted(
+            (SimilarPair(min(p.a, p.b), max(p.a, p.b), p.similarity) for p in index.pairs()),
+            key=lambda p: (-p.similarity, p.a, p.b),
+        )
+
+    def _grade_unique(self, stu_paths: list[Union[str, Path]], indices: list[int]) -> Iterator[tuple[int, dict[str, Any]]]:
+        workers = max(1, min(self.max_workers, len(indices)))
+        if workers == 1:
+            cache = TaskResultCache()
+            for i in indices:
+                yield i, grade_student(self.variants, self.ref_path, stu_paths[i], cache)
+            return
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.variants, self.ref_path),
+        )
+        try:
+            futures: dict[Future, int] = {
+                self._executor.submit(_grade_in_worker, str(stu_paths[i])): i for i in indices
+            }
+            for fut in as_completed(futures):
+                i = futures[fut]
+                try:
+                    result = fut.result()
+                except Exception as e:  # упавший процесс пула
+                    result = {"ref_path": self.ref_path, "stu_path": str(stu_paths[i]), "error": f"{e!s}"}
+                if "error" not in result:
+                    result["ref_parsed"] = self.variants.by_name(result.get("ref_sheet", ""), result.get("ref_path", "")) or self.ref
+                yield i, result
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        """Stop the pool; pending (not started) students are cancelled."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _copy_result(result: dict[str, Any], stu_path: Union[str, Path], original: Union[str, Path]) -> dict[str, Any]:
+    """Результат побайтной копии файла: те же проверки, свой путь и отчёт."""
+    copy = {k: v for k, v in result.items() if k != "trace"}
+    copy["stu_path"] = str(stu_path)
+    if "error" in copy:
+        return copy
+    copy["duplicate_of"] = str(original)
+    if "report_html" in copy:
+        copy["report_html"] = build_html_report(copy)
+    return copy
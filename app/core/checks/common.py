@@ -72,6 +72,8 @@ def extract_attrs_via_dictionary(
         return [], []
     normalized = text.replace(NBSP, " ").strip()
     normalized = re.sub(r"\s+", " ", normalized)
+    # Канон словаря хранит «е» вместо «ё» — текст приводим так же (длина строки не меняется)
+    haystack = normalized.casefold().replace("ё", "е")
     found: list[str] = []
     found_set: set[str] = set()
     used_positions: list[tuple[int, int]] = []
@@ -88,7 +90,7 @@ def extract_attrs_via_dictionary(
                 continue
             pos = 0
             while True:
-                idx = normalized.casefold().find(pattern.casefold(), pos)
+                idx = haystack.find(pattern.casefold().replace("ё", "е"), pos)
                 if idx == -1:
                     break
                 end = idx + len(pattern)
@@ -238,7 +240,7 @@ def _normalize_date_like(s: str) -> str:
             ymd = _excel_serial_to_ymd(f)
             if ymd:
                 return ymd
-    except ValueError:
+    except (ValueError, OverflowError):
         pass
     return s
 
@@ -257,7 +259,7 @@ def normalize_cell_value(val: Any) -> str:
                 if ymd:
                     return ymd
             return str(int(f))
-    except ValueError:
+    except (ValueError, OverflowError):  # не число; «inf» — тоже текст
         pass
     return _normalize_date_like(s)
 
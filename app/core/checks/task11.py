@@ -4,18 +4,15 @@ from typing import Optional
 
 from app.core.checks.common import canon_attr_for_compare
 from app.core.algos.keys import candidate_keys
+from app.core.algos.projection import project_fds
 from app.core.algos.normal_forms import check_2nf
-from app.core.algos.decomposition import coverage_check, lossless_join_basic, dependency_preservation_approx
+from app.core.algos.decomposition import coverage_check, lossless_join_chase
 from app.core.excel.importer import ParsedSolution
 from app.core.result import TaskResult
 from app.core.semantic.query import get_relations
 from app.core.semantic.triples import TripleStore
 
 
-def _F_local(attrs: set[str], F: list[tuple[list[str], str]]) -> list[tuple[list[str], str]]:
-    return [(lhs, rhs) for lhs, rhs in F if set(lhs) <= attrs and rhs in attrs]
-
-
 def _row_looks_like_data(row: list, dict_ref: dict[str, str]) -> bool:
     """True if row cells look like values (numbers, dates), not attribute names."""
     if not row or len(row) < 2:
@@ -116,18 +113,31 @@ def check(
             extra=list(extra),
         )
     empty_f_local: list[str] = []
+    partial: list[str] = []
     for name, attrs in relations:
-        F_local = _F_local(attrs, F_ref)
+        projection = project_fds(attrs, F_ref)
+        F_local = projection.fds
+        if not projection.complete:
+            partial.append(name)
         if not F_local and len(attrs) > 1:
             empty_f_local.append(name)
         keys = candidate_keys(attrs, F_local) if F_local else []
         nf_ok, violations = check_2nf(attrs, F_local, keys)
         if not nf_ok:
             return TaskResult(status="FAIL", details={"relation": name, "violations": violations})
+    if not lossless_join_chase(U, F_ref, relations).lossless:
+        return TaskResult(
+            status="WARN",
+            actual=relations,
+            details={"coverage": True, "lossless": False, "lossless_warn": True, "reason": "lossy_join"},
+        )
     if empty_f_local:
         return TaskResult(
             status="WARN",
             actual=relations,
             details={"coverage": True, "empty_f_local": empty_f_local, "reason": "нет проецируемых ФЗ для части отношений"},
         )
-    return TaskResult(status="PASS", actual=relations, details={"coverage": True})
+    details = {"coverage": True}
+    if partial:
+        details["projection_partial"] = partial
+    return TaskResult(status="PASS", actual=relations, details=details)
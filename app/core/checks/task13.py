@@ -3,18 +3,15 @@ import re
 
 from app.core.checks.common import canon_attr_for_compare
 from app.core.algos.keys import candidate_keys
+from app.core.algos.projection import project_fds
 from app.core.algos.normal_forms import check_3nf
-from app.core.algos.decomposition import coverage_check, lossless_join_basic, dependency_preservation_approx
+from app.core.algos.decomposition import coverage_check, lossless_join_chase, lost_dependencies
 from app.core.excel.importer import ParsedSolution
 from app.core.result import TaskResult
 from app.core.semantic.query import get_relations
 from app.core.semantic.triples import TripleStore
 
 
-def _F_local(attrs: set[str], F: list[tuple[list[str], str]]) -> list[tuple[list[str], str]]:
-    return [(lhs, rhs) for lhs, rhs in F if set(lhs) <= attrs and rhs in attrs]
-
-
 def _row_looks_like_data(row: list, dict_ref: dict) -> bool:
     """True if row cells look like values (numbers, dates), not attribute names."""
     if not row or len(row) < 2:
@@ -106,17 +103,25 @@ def check(
             missing=list(missing),
             extra=list(extra),
         )
+    partial: list[str] = []
     for name, attrs in relations:
-        F_local = _F_local(attrs, F_ref)
+        projection = project_fds(attrs, F_ref)
+        F_local = projection.fds
+        if not projection.complete:
+            partial.append(name)
         keys = candidate_keys(attrs, F_local) if F_local else []
         nf_ok, violations = check_3nf(attrs, F_local, keys)
         if not nf_ok:
             return TaskResult(status="FAIL", details={"relation": name, "violations": violations})
-    lossless = lossless_join_basic(U, F_ref, relations)
-    dep_pres = dependency_preservation_approx(F_ref, relations)
-    details = {"coverage": True, "lossless": lossless, "dep_pres": dep_pres}
+    lossless = lossless_join_chase(U, F_ref, relations).lossless
+    lost = lost_dependencies(F_ref, relations)
+    details = {"coverage": True, "lossless": lossless, "dep_pres": not lost}
     if not lossless:
         details["lossless_warn"] = True
-    if not dep_pres:
+        details["reason"] = "lossy_join"
+    if lost:
         details["dep_pres_warn"] = True
-    return TaskResult(status="PASS", actual=relations, details=details)
+        details["dep_lost"] = [f"{', '.join(lhs)} -> {rhs}" for lhs, rhs in lost]
+    if partial:
+        details["projection_partial"] = partial
+    return TaskResult(status="PASS" if lossless else "WARN", actual=relations, details=details)
@@ -1,10 +1,15 @@
 """Task 3: 1NF table — strict headers and multiset of rows."""
+from app.core.algos.partitions import PartitionIndex
+from app.core.algos.row_diff import NearMatch, diff_rows
 from app.core.checks.common import canon_attr_for_compare, normalize_cell_value, is_separator_row
+from app.core.excel.columnar import ColumnarTable
 from app.core.excel.importer import ParsedSolution
 from app.core.result import TaskResult
 from app.core.semantic.query import get_pk_hint, get_table_1nf
 from app.core.semantic.triples import TripleStore
 
+NEAR_MATCH_LIMIT = 10  # пар «отличается одной ячейкой» в details
+
 
 def _get_table_1nf(parsed: ParsedSolution):
     t = parsed.tasks.get(3)
@@ -12,6 +17,14 @@ def _get_table_1nf(parsed: ParsedSolution):
         return None
     tbl = t.tables[0]
     headers = [str(h).strip() for h in tbl.headers]
+    if isinstance(tbl.rows, ColumnarTable) and tbl.rows.n_cols == len(headers):
+        # Ячейки уже нормализованы при разборе; разделители — по уникальным значениям пула
+        table = tbl.rows
+        strings = table.pool.strings
+        used = set().union(*map(set, table.columns))
+        filler = {i for i in used if is_separator_row([strings[i]])}
+        keep = [r for r, ids in enumerate(table.row_ids()) if not filler.issuperset(ids)]
+        return (headers, table if len(keep) == len(table) else table.take(keep))
     max_col = len(headers)
     rows = []
     for row in tbl.rows:
@@ -22,6 +35,16 @@ def _get_table_1nf(parsed: ParsedSolution):
     return (headers, rows)
 
 
+def _row(row: list, n_cols: int) -> list:
+    return [row[c] if c < len(row) else "" for c in range(n_cols)]
+
+
+def _near_text(m: NearMatch, headers: list[str], ref_rows: list, stu_rows: list) -> str:
+    exp = _row(ref_rows[m.ref_row], len(headers))[m.column]
+    got = _row(stu_rows[m.stu_row], len(headers))[m.column]
+    return f"строка {m.stu_row + 1}: «{headers[m.column]}» = «{got}», ожидалось «{exp}» (строка эталона {m.ref_row + 1})"
+
+
 def check(ref_graph: TripleStore, stu_graph: TripleStore, dict_ref: dict[str, str]) -> TaskResult:
     ref_t = get_table_1nf(ref_graph, "ref")
     stu_t = get_table_1nf(stu_graph, "stu")
@@ -47,52 +70,42 @@ def check(ref_graph: TripleStore, stu_graph: TripleStore, dict_ref: dict[str, st
             details={"reason": "header_mismatch"},
             explanation="Заголовки таблицы в 1НФ не совпадают с эталоном.",
         )
-    ref_multiset = [tuple(r) for r in ref_rows]
-    stu_multiset = [tuple(r) for r in stu_rows]
-    ref_counts: dict[tuple, int] = {}
-    for r in ref_multiset:
-        ref_counts[r] = ref_counts.get(r, 0) + 1
-    stu_counts: dict[tuple, int] = {}
-    for r in stu_multiset:
-        stu_counts[r] = stu_counts.get(r, 0) + 1
-    missing_rows = []
-    for r, c in ref_counts.items():
-        for _ in range(c - stu_counts.get(r, 0)):
-            missing_rows.append(list(r))
-    extra_rows = []
-    for r, c in stu_counts.items():
-        for _ in range(c - ref_counts.get(r, 0)):
-            extra_rows.append(list(r))
+    n_cols = len(ref_h_canon)
+    diff = diff_rows(ref_rows, stu_rows, n_cols)
     # При совпадении заголовков различие в строках — только предупреждение
-    if missing_rows or extra_rows:
+    if diff.missing or diff.extra:
+        missing_rows = [_row(ref_rows[i], n_cols) for i in diff.missing]
+        extra_rows = [_row(stu_rows[j], n_cols) for j in diff.extra]
+        details = {"missing_count": len(missing_rows), "extra_count": len(extra_rows), "reason": "rows_differ"}
+        explanation = f"Состав строк таблицы отличается от эталона: не хватает {len(missing_rows)} строк, лишних {len(extra_rows)}."
+        if diff.near:
+            details["near_matches"] = [
+                _near_text(m, ref_h_canon, ref_rows, stu_rows) for m in diff.near[:NEAR_MATCH_LIMIT]
+            ]
+            explanation += f" Из них {len(diff.near)} строк отличаются от эталонных одной ячейкой."
         return TaskResult(
             status="WARN",
             expected=ref_h_canon,
             actual=stu_h_canon,
             missing=missing_rows[:20],
             extra=extra_rows[:20],
-            details={"missing_count": len(missing_rows), "extra_count": len(extra_rows), "reason": "rows_differ"},
-            explanation=f"Состав строк таблицы отличается от эталона: не хватает {len(missing_rows)} строк, лишних {len(extra_rows)}.",
+            details=details,
+            explanation=explanation,
         )
-    # PK hint from * in headers (from graph)
+    # PK hint from * in headers (from graph): пустые ячейки и дубликаты — один проход по строкам
     pk_hint = get_pk_hint(stu_graph, "stu")
     if pk_hint:
-        key_cols = [ref_h_canon.index(a) for a in pk_hint if a in ref_h_canon]
-        for row in stu_rows:
-            if any((row[i] if i < len(row) else "").strip() == "" for i in key_cols):
-                return TaskResult(
-                    status="FAIL",
-                    details={"reason": "pk_hint_empty_cell"},
-                    explanation="Первичный ключ (столбцы со *) определён неверно: в ключевых столбцах есть пустые ячейки.",
-                )
-        seen = set()
-        for row in stu_rows:
-            key = tuple(row[i] if i < len(row) else "" for i in key_cols)
-            if key in seen:
-                return TaskResult(
-                    status="FAIL",
-                    details={"reason": "pk_hint_duplicate", "example": list(key)},
-                    explanation="Первичный ключ определён неверно: есть дубликаты по ключу (нарушение уникальности).",
-                )
-            seen.add(key)
+        v = PartitionIndex(ref_h_canon, stu_rows).scan_key(pk_hint)
+        if v is not None and v.reason == "empty_cell":
+            return TaskResult(
+                status="FAIL",
+                details={"reason": "pk_hint_empty_cell", "rows": [r + 1 for r in v.rows]},
+                explanation="Первичный ключ (столбцы со *) определён неверно: в ключевых столбцах есть пустые ячейки.",
+            )
+        if v is not None:
+            return TaskResult(
+                status="FAIL",
+                details={"reason": "pk_hint_duplicate", "example": list(v.values), "rows": [r + 1 for r in v.rows]},
+                explanation="Первичный ключ определён неверно: есть дубликаты по ключу (нарушение уникальности).",
+            )
     return TaskResult(status="PASS", expected=ref_h_canon, actual=stu_h_canon)
@@ -1,12 +1,17 @@
 """Task 4: FDs — извлечение по словарю, сравнение по выводимости, оценка ++/+-/-+/--."""
 import re
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from app.core.checks.common import normalize_fd_arrow, parse_fd_string
-from app.core.algos.fd import closure, minimal_cover
+from app.core.algos.canonical import fd_diff, fd_key, fd_set
+from app.core.algos.fd import minimal_cover
+from app.core.algos.discovery import discover_fds
+from app.core.algos.partitions import PartitionIndex
 from app.core.excel.importer import ParsedSolution
 from app.core.result import TaskResult
-from app.core.semantic.explain import explain_missing_fd
+from app.core.semantic.explain import explain_fd_contradicts_data, explain_missing_fd
+from app.core.semantic.query import get_table_index
+from app.core.trace import span
 
 if TYPE_CHECKING:
     from app.core.semantic.triples import TripleStore
@@ -67,6 +72,36 @@ def extract_fds_student(parsed: ParsedSolution, dict_ref: dict[str, str]) -> lis
     return minimal_cover(single)
 
 
+def explain_missing_against_table(
+    index: PartitionIndex,
+    missing: list[tuple[list[str], str]],
+    limit: int = 3,
+) -> list[str]:
+    """
+    Для пропущенных ФЗ: выполняется ли она в таблице студента, а если нет —
+    какие минимальные LHS определяют атрибут в его данных (поиск TANE с бюджетом).
+    """
+    hints: list[str] = []
+    discovered = None
+    for lhs, rhs in missing[:limit]:
+        if not index.has(lhs) or not index.has([rhs]):
+            continue
+        fd = f"{', '.join(lhs)} -> {rhs}"
+        pairs = index.counterexamples(lhs, rhs, limit=1)
+        if not pairs:
+            hints.append(f"{fd} выполняется в вашей таблице 1НФ, но не указана")
+            continue
+        if discovered is None:
+            discovered = discover_fds(index.headers, index.rows)
+        i, j = pairs[0]
+        hint = f"{fd} не выполняется в вашей таблице 1НФ (строки {i + 1} и {j + 1})"
+        dets = [d for d in discovered.determinants(rhs) if d]
+        if dets:
+            hint += f"; в ваших данных {rhs} определяют: " + ", ".join("{" + ", ".join(d) + "}" for d in dets[:3])
+        hints.append(hint)
+    return hints
+
+
 def check(
     ref_graph: "TripleStore",
     stu_graph: "TripleStore",
@@ -74,27 +109,45 @@ def check(
     F_ref: list[tuple[list[str], str]],
     F_stu: list[tuple[list[str], str]],
     score_label: str,
+    diff: Optional[tuple[list[tuple[list[str], str]], list[tuple[list[str], str]]]] = None,
 ) -> TaskResult:
-    missing_fds = []
-    for lhs, rhs in F_ref:
-        if rhs not in closure(lhs, F_stu):
-            missing_fds.append((lhs, rhs))
-    extra_fds = []
-    for lhs, rhs in F_stu:
-        if rhs not in closure(lhs, F_ref):
-            extra_fds.append((lhs, rhs))
+    """diff — (пропущенные, лишние) из fd_diff, если уже посчитаны (run_checks делит их со скорингом)."""
+    # эквивалентность — по хэшу канонической формы; одинаковые ответы — из кэша
+    missing_fds, extra_fds = diff if diff is not None else fd_diff(F_ref, F_stu)
     status = "PASS" if not missing_fds else "FAIL"
     explanation = ""
     if missing_fds:
         lhs, rhs = missing_fds[0]
-        cl = closure(lhs, F_stu)
+        cl = fd_set(F_stu).closure(fd_key(lhs, rhs)[0])
         explanation = explain_missing_fd(lhs, rhs, cl)
+    details = {"score": score_label, "missing_count": len(missing_fds)}
+    index = get_table_index(stu_graph, "stu")
+    if index is None:
+        contradictions = []
+    else:
+        with span("fd_data_check", rows=index.n_rows):
+            # ФЗ студента против его же таблицы 1НФ: при полном покрытии — предупреждение
+            contradictions = index.validate(F_stu)
+            if missing_fds:
+                hints = explain_missing_against_table(index, missing_fds)
+                if hints:
+                    details["missing_in_data"] = hints
+                    explanation = f"{explanation}. {hints[0]}"
+    if contradictions:
+        details["data_violations"] = [
+            f"{', '.join(c.lhs)} -> {c.rhs}: строки {', '.join(f'{i + 1} и {j + 1}' for i, j in c.pairs)}"
+            for c in contradictions
+        ]
+        data_expl = "; ".join(explain_fd_contradicts_data(list(c.lhs), c.rhs, c.pairs[0]) for c in contradictions[:3])
+        explanation = f"{explanation}. {data_expl}" if explanation else data_expl
+        if status == "PASS":
+            status = "WARN"
     return TaskResult(
         status=status,
         expected=F_ref,
         actual=F_stu,
         missing=missing_fds,
         extra=extra_fds,
-        details={"score": score_label, "missing_count": len(missing_fds)},
+        details=details,
         explanation=explanation,
     )
@@ -1,10 +1,12 @@
 """Task 5: PK in 1NF — strict equality + validation (superkey, minimality, uniqueness)."""
 from app.core.checks.common import extract_attrs_via_dictionary_simple
-from app.core.algos.keys import is_superkey
+from app.core.algos.keys import candidate_keys, is_superkey
+from app.core.algos.partitions import KeyViolation
 from app.core.excel.importer import ParsedSolution
 from app.core.result import TaskResult
-from app.core.semantic.query import get_pk
+from app.core.semantic.query import get_pk, get_table_index
 from app.core.semantic.triples import TripleStore
+from app.core.trace import span
 
 
 def extract_pk_ref(parsed: ParsedSolution, dict_ref: dict[str, str]) -> list[str]:
@@ -23,6 +25,14 @@ def extract_pk_student(parsed: ParsedSolution, dict_ref: dict[str, str]) -> list
     return extract_pk_ref(parsed, dict_ref)
 
 
+def describe_key_violation(v: KeyViolation) -> str:
+    attrs = ", ".join(v.key)
+    if v.reason == "empty_cell":
+        return f"{{{attrs}}}: пустое значение в строке {v.rows[0] + 1}"
+    i, j = v.rows
+    return f"{{{attrs}}}: строки {i + 1} и {j + 1} совпадают по ключу ({', '.join(str(x) for x in v.values)})"
+
+
 def check(
     ref_graph: TripleStore,
     stu_graph: TripleStore,
@@ -32,6 +42,46 @@ def check(
     ref_pk = get_pk(ref_graph, "ref", 5)
     stu_pk = get_pk(stu_graph, "stu", 5)
     U = set(dict_ref.keys())
+    result = _check_pk(ref_pk, stu_pk, U, F_ref)
+    # Уникальность и непустота на данных таблицы 1НФ студента: PK и все кандидатные ключи
+    index = get_table_index(stu_graph, "stu")
+    if index is None or not stu_pk:
+        return result
+    with span("pk_data_check", rows=index.n_rows):
+        # столбца ключа нет в таблице — по части ключа дубликаты не ищем (были бы ложными)
+        missing_cols = [a for a in stu_pk if not index.has([a])]
+        pk_violation = index.scan_key(stu_pk) if not missing_cols else None
+        key_violations = []
+        for key in candidate_keys(U, F_ref) if F_ref else []:
+            if set(key) == set(stu_pk) or not index.has(key):
+                continue
+            v = index.scan_key(sorted(key))
+            if v is not None:
+                key_violations.append(v)
+    notes = []
+    if missing_cols:
+        result.details["pk_columns_missing"] = missing_cols
+    if pk_violation is not None:
+        result.details["pk_violation"] = describe_key_violation(pk_violation)
+        notes.append(f"Первичный ключ нарушается в таблице 1НФ: {result.details['pk_violation']}.")
+        if result.status == "PASS":
+            result.details["reason"] = f"pk_{pk_violation.reason}"
+    if key_violations:
+        result.details["key_violations"] = [describe_key_violation(v) for v in key_violations]
+        notes.append("Кандидатные ключи нарушаются в таблице 1НФ: " + "; ".join(result.details["key_violations"]) + ".")
+    if notes:
+        if result.status == "PASS":
+            result.status = "WARN"
+        result.explanation = " ".join(([result.explanation] if result.explanation else []) + notes)
+    return result
+
+
+def _check_pk(
+    ref_pk: list[str],
+    stu_pk: list[str],
+    U: set[str],
+    F_ref: list[tuple[list[str], str]],
+) -> TaskResult:
     ref_set = set(ref_pk)
     stu_set = set(stu_pk)
     if ref_set != stu_set:
@@ -1,4 +1,5 @@
 """Task 8: Transitive FDs — strict set match."""
+from app.core.algos.canonical import fd_key
 from app.core.algos.keys import candidate_keys, is_superkey
 from app.core.checks.common import parse_fd_string, normalize_fd_arrow
 from app.core.excel.importer import ParsedSolution
@@ -58,14 +59,14 @@ def check(
     U = set(dict_ref.keys())
     T_ref = get_fds(ref_graph, "ref", 8) or compute_transitive_ref(U, F_ref)
     T_stu = get_fds(stu_graph, "stu", 8)
-    ref_set = set((tuple(sorted(l)), r) for l, r in T_ref)
-    stu_set = set((tuple(sorted(l)), r) for l, r in T_stu)
+    ref_set = {fd_key(l, r) for l, r in T_ref}
+    stu_set = {fd_key(l, r) for l, r in T_stu}
     if ref_set != stu_set:
         return TaskResult(
             status="FAIL",
             expected=T_ref,
             actual=T_stu,
-            missing=[x for x in T_ref if (tuple(sorted(x[0])), x[1]) not in stu_set],
-            extra=[x for x in T_stu if (tuple(sorted(x[0])), x[1]) not in ref_set],
+            missing=[x for x in T_ref if fd_key(*x) not in stu_set],
+            extra=[x for x in T_stu if fd_key(*x) not in ref_set],
         )
     return TaskResult(status="PASS", expected=T_ref, actual=T_stu)
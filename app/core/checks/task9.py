@@ -1,6 +1,7 @@
 """Task 9: Nested transitive chains."""
 from typing import Optional
 
+from app.core.algos.canonical import fd_key
 from app.core.checks.task8 import compute_transitive_ref
 from app.core.checks.common import parse_fd_string, normalize_fd_arrow
 from app.core.excel.importer import ParsedSolution
@@ -56,11 +57,8 @@ def check(
     expected_chains = build_chains_transitive(T_ref)
     T_stu = get_fds(stu_graph, "stu", 8) or []
     actual_chains = build_chains_transitive(T_stu)
-    ref_fd_set = set((tuple(sorted(l)), r) for l, r in T_ref)
-    stu_fd_set = set()
-    for chain in actual_chains:
-        for l, r in chain:
-            stu_fd_set.add((tuple(sorted(l)), r))
+    ref_fd_set = {fd_key(l, r) for l, r in T_ref}
+    stu_fd_set = {fd_key(l, r) for chain in actual_chains for l, r in chain}
     if ref_fd_set != stu_fd_set:
         return TaskResult(status="FAIL", expected=expected_chains, actual=actual_chains)
     return TaskResult(status="PASS", expected=expected_chains, actual=actual_chains, details={"order_warn": True})
@@ -1,20 +1,19 @@
 """Compare ref vs student: fingerprint, run all checks, diff."""
-import hashlib
 from pathlib import Path
-from typing import Any, Union
+from typing import Any, Callable, Optional, Union
 
+from app.core.algos.canonical import fd_diff
+from app.core.dedup import AnswerProfile, TaskResultCache, answer_digest, reference_key, task_digests
 from app.core.excel.importer import parse_workbook, ParsedSolution
 from app.core.checks.common import canon_attr_for_compare
 from app.core.result import TaskResult
 from app.core.checks import task1, task2, task3, task4, task5, task6, task7, task8, task9, task10, task11, task12, task13
 from app.core.scoring import score_fd_coverage
 from app.core.semantic.build_graph import build_graph
+from app.core.similarity import answer_shingles
 from app.core.semantic.query import get_attributes, get_fds, get_pk
-
-
-def fingerprint(attrs_canon: list[str]) -> str:
-    """SHA256 of sorted canonical attributes (task 1 ref)."""
-    return hashlib.sha256("|".join(sorted(attrs_canon)).encode()).hexdigest()
+from app.core.trace import collect, span
+from app.core.variants import VariantSource, fingerprint, load_reference, solution_fingerprint
 
 
 def run_checks(
@@ -22,17 +21,19 @@ def run_checks(
     stu: ParsedSolution,
     strict_order_task1: bool = False,
     strict_nested_order: bool = False,
-) -> tuple[dict[int, TaskResult], str, str]:
+    cache: Optional[TaskResultCache] = None,
+) -> tuple[dict[int, TaskResult], str, str, Optional[AnswerProfile]]:
     """
     Run all task checks. Builds semantic graphs from ref/stu, then runs checks using graph data.
-    Returns (task_results, score_4_label, fingerprint_warn).
+    With cache (batch grading), answers already graded against the same reference are not re-checked.
+    Returns (task_results, score_4_label, fingerprint_warn, profile); profile (digests, shingles) only with cache.
     """
     results: dict[int, TaskResult] = {}
     ref_attrs = task1.extract_headers_ref(ref)
     if not ref_attrs:
         for i in range(1, 14):
             results[i] = TaskResult(status="FAIL", details={"error": "No ref task 1 headers"})
-        return results, "--", "No reference attributes"
+        return results, "--", "No reference attributes", None
     dict_ref = {canon_attr_for_compare(a): canon_attr_for_compare(a) for a in ref_attrs}
     U_attrs = set(dict_ref.keys())
     fp_ref = fingerprint(list(U_attrs))
@@ -45,56 +46,86 @@ def run_checks(
     fp_stu = fingerprint(stu_attrs_t1) if stu_attrs_t1 else ""
     fingerprint_warn = "" if fp_ref == fp_stu else "Fingerprint mismatch: possibly different variant or wrong file."
 
-    results[1] = task1.check(ref_graph, stu_graph, dict_ref, strict_order=strict_order_task1)
-    results[2] = task2.check(ref_graph, stu_graph, dict_ref)
-    results[3] = task3.check(ref_graph, stu_graph, dict_ref)
+    profile: Optional[AnswerProfile] = None
+    digests: dict[int, str] = {}
+    ref_key = ""
+    if cache is not None:
+        with span("dedup_digests"):
+            digests = task_digests(stu_graph)
+            ref_key = reference_key(ref_graph, strict_order_task1=strict_order_task1)
+            profile = AnswerProfile(digests, answer_shingles(stu_graph, ref_graph))
+
+    def run(task_num: int, check: Callable[[], TaskResult]) -> None:
+        key = (ref_key, task_num, digests.get(task_num, ""))
+        hit = cache.get(key) if cache is not None else None
+        if hit is not None:
+            results[task_num] = hit
+            return
+        with span(f"task{task_num}.check"):
+            results[task_num] = check()
+        if cache is not None:
+            cache.put(key, results[task_num])
+
+    run(1, lambda: task1.check(ref_graph, stu_graph, dict_ref, strict_order=strict_order_task1))
+    run(2, lambda: task2.check(ref_graph, stu_graph, dict_ref))
+    run(3, lambda: task3.check(ref_graph, stu_graph, dict_ref))
 
     F_ref = get_fds(ref_graph, "ref", 4)
-    F_stu = get_fds(stu_graph, "stu", 4)
-    score_ratio, score_4_label = score_fd_coverage(F_ref, F_stu)
-    t4 = ref.tasks.get(4)
-    has_fd_content = t4 and (t4.text_lines or t4.tables)
-    if not F_ref and has_fd_content:
-        results[4] = TaskResult(
-            status="FAIL",
-            expected=[],
-            actual=F_stu,
-            details={"error": "не удалось распознать ФЗ из эталона"},
-        )
-    else:
-        results[4] = task4.check(ref_graph, stu_graph, dict_ref, F_ref, F_stu, score_4_label)
-
-    results[5] = task5.check(ref_graph, stu_graph, dict_ref, F_ref)
+
+    def check_4() -> TaskResult:
+        F_stu = get_fds(stu_graph, "stu", 4)
+        with span("score_4"):
+            # одни и те же замыкания для оценки ++/+-/-+/-- и проверки №4
+            fd_4 = fd_diff(F_ref, F_stu)
+            score_ratio, score_4_label = score_fd_coverage(F_ref, F_stu, missing=fd_4[0])
+        t4 = ref.tasks.get(4)
+        has_fd_content = t4 and (t4.text_lines or t4.tables)
+        if not F_ref and has_fd_content:
+            return TaskResult(
+                status="FAIL",
+                expected=[],
+                actual=F_stu,
+                details={"error": "не удалось распознать ФЗ из эталона", "score": score_4_label},
+            )
+        return task4.check(ref_graph, stu_graph, dict_ref, F_ref, F_stu, score_4_label, diff=fd_4)
+
+    run(4, check_4)
+    score_4_label = results[4].details["score"]
+
     PK_ref = get_pk(ref_graph, "ref", 5)
     P_ref = get_fds(ref_graph, "ref", 6)
     T_ref = get_fds(ref_graph, "ref", 8)
+    run(5, lambda: task5.check(ref_graph, stu_graph, dict_ref, F_ref))
+    run(6, lambda: task6.check(ref_graph, stu_graph, dict_ref, F_ref, PK_ref))
+    run(7, lambda: task7.check(ref_graph, stu_graph, dict_ref, P_ref))
+    run(8, lambda: task8.check(ref_graph, stu_graph, dict_ref, F_ref))
+    run(9, lambda: task9.check(ref_graph, stu_graph, dict_ref, F_ref, T_ref))
+    run(10, lambda: task10.check(ref_graph, stu_graph, dict_ref, results[2].expected))
+    run(11, lambda: task11.check(ref_graph, stu_graph, dict_ref, F_ref, P_ref))
+    run(12, lambda: task12.check(ref_graph, stu_graph, dict_ref, P_ref))
+    run(13, lambda: task13.check(ref_graph, stu_graph, dict_ref, F_ref))
 
-    results[6] = task6.check(ref_graph, stu_graph, dict_ref, F_ref, PK_ref)
-    results[7] = task7.check(ref_graph, stu_graph, dict_ref, P_ref)
-    results[8] = task8.check(ref_graph, stu_graph, dict_ref, F_ref)
-    results[9] = task9.check(ref_graph, stu_graph, dict_ref, F_ref, T_ref)
-    results[10] = task10.check(ref_graph, stu_graph, dict_ref, results[2].expected)
-    results[11] = task11.check(ref_graph, stu_graph, dict_ref, F_ref, P_ref)
-    results[12] = task12.check(ref_graph, stu_graph, dict_ref, P_ref)
-    results[13] = task13.check(ref_graph, stu_graph, dict_ref, F_ref)
-
-    return results, score_4_label, fingerprint_warn
+    return results, score_4_label, fingerprint_warn, profile
 
 
-def compare(ref_path: Union[str, Path], stu_path: Union[str, Path], **kwargs: Any) -> dict[str, Any]:
+def compare_parsed(
+    ref: ParsedSolution,
+    stu: ParsedSolution,
+    ref_path: Union[str, Path] = "",
+    stu_path: Union[str, Path] = "",
+    **kwargs: Any,
+) -> dict[str, Any]:
     """
-    Load both files, run checks, return full result dict for UI/report.
+    Run checks on already parsed workbooks (reference parsed once, reused for many students).
     """
-    ref = parse_workbook(ref_path)
-    stu = parse_workbook(stu_path)
-    results, score_4, fp_warn = run_checks(ref, stu, **kwargs)
-    ref_attrs = task1.extract_headers_ref(ref)
-    fp_ref = fingerprint([canon_attr_for_compare(a) for a in ref_attrs]) if ref_attrs else ""
-    stu_attrs = task1.extract_headers_student(stu)
-    fp_stu = fingerprint([canon_attr_for_compare(a) for a in stu_attrs]) if stu_attrs else ""
-    return {
+    with span("run_checks"):
+        results, score_4, fp_warn, profile = run_checks(ref, stu, **kwargs)
+    fp_ref = solution_fingerprint(ref)
+    fp_stu = solution_fingerprint(stu)
+    result = {
         "ref_path": str(ref_path),
         "stu_path": str(stu_path),
+        "ref_sheet": ref.sheet_name,
         "fingerprint_ref": fp_ref,
         "fingerprint_stu": fp_stu,
         "fingerprint_match": fp_ref == fp_stu,
@@ -104,3 +135,42 @@ def compare(ref_path: Union[str, Path], stu_path: Union[str, Path], **kwargs: An
         "ref_parsed": ref,
         "stu_parsed": stu,
     }
+    if profile is not None:
+        result["task_digests"] = profile.task_digests
+        result["answer_digest"] = answer_digest(profile.task_digests)
+        result["shingles"] = profile.shingles
+    return result
+
+
+def compare_variants(
+    variants: VariantSource,
+    stu: ParsedSolution,
+    ref_path: Union[str, Path] = "",
+    stu_path: Union[str, Path] = "",
+    **kwargs: Any,
+) -> dict[str, Any]:
+    """
+    compare_parsed против варианта эталона с тем же отпечатком задания №1, что у студента
+    (в библиотеке без точного совпадения — ближайшего по Жаккару); ref_path — файл варианта.
+    """
+    with span("select_variant", variants=len(variants)):
+        m = variants.match(stu)
+    result = compare_parsed(m.parsed, stu, m.path or ref_path, stu_path, **kwargs)
+    result["ref_variants"] = len(variants)
+    result["ref_similarity"] = m.similarity
+    return result
+
+
+def compare(ref_path: Union[str, Path], stu_path: Union[str, Path], **kwargs: Any) -> dict[str, Any]:
+    """
+    Load both files, run checks, return full result dict for UI/report.
+    Reference sheets are variants: the one matching the student's task 1 is used.
+    With DBNC_TRACE set, the timing tree is also returned under "trace" (see app.core.trace).
+    """
+    with collect("compare", file=Path(stu_path).name) as tr:
+        variants = load_reference(ref_path)
+        stu = parse_workbook(stu_path)
+        result = compare_variants(variants, stu, ref_path, stu_path, **kwargs)
+    if tr is not None:
+        result["trace"] = tr.to_dict()
+    return result
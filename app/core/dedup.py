@@ -0,0 +1,183 @@
+"""
+Batch deduplication: per-task digests of student answers, shared TaskResults, clusters of identical work.
+
+Отпечаток ответа на задание — sha256 тех данных графа студента, которые читает
+проверка этого задания (TASK_INPUTS): разобранные и нормализованные атрибуты,
+строки таблицы 1НФ, ФЗ, отношения, текст. Переоформление ячеек, пробелы, вид
+стрелок, другие листы и метаданные книги на него не влияют; порядок перечисления
+сохраняется — от него зависит вид отчёта (эквивалентные наборы ФЗ в другом
+порядке для №4 сокращает кэш fd_diff). Одинаковый ответ при том же эталоне —
+тот же TaskResult из TaskResultCache; совпавшие целиком работы — кластеры.
+"""
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+from app.core.excel.columnar import ColumnarTable
+from app.core.result import TaskResult
+from app.core.semantic.query import (
+    get_attributes, get_fds, get_pk, get_pk_hint, get_relations, get_repeating_group, get_table_1nf, get_text,
+)
+from app.core.semantic.triples import TripleStore
+from app.core.trace import count
+
+_PARTS: dict[str, Callable[[TripleStore, str], Any]] = {
+    "attrs": lambda g, role: get_attributes(g, role, 1),
+    "repeating_group": lambda g, role: get_repeating_group(g, role),
+    "table_1nf": lambda g, role: get_table_1nf(g, role),
+    "pk_hint": lambda g, role: get_pk_hint(g, role),
+    "fds_4": lambda g, role: get_fds(g, role, 4),
+    "pk_5": lambda g, role: get_pk(g, role, 5),
+    "fds_6": lambda g, role: get_fds(g, role, 6),
+    "fds_8": lambda g, role: get_fds(g, role, 8),
+    "text_10": lambda g, role: get_text(g, role, 10),
+    "relations_11": lambda g, role: get_relations(g, role, 11),
+    "text_12": lambda g, role: get_text(g, role, 12),
+    "relations_13": lambda g, role: get_relations(g, role, 13),
+}
+
+# Задание -> данные студента, которые читает его проверка (app/core/checks/taskN.py)
+TASK_INPUTS: dict[int, tuple[str, ...]] = {
+    1: ("attrs",),
+    2: ("repeating_group",),
+    3: ("table_1nf", "pk_hint"),
+    4: ("fds_4", "table_1nf"),
+    5: ("pk_5", "table_1nf"),
+    6: ("fds_6",),
+    7: ("fds_6",),
+    8: ("fds_8",),
+    9: ("fds_8",),
+    10: ("text_10",),
+    11: ("relations_11",),
+    12: ("text_12",),
+    13: ("relations_13",),
+}
+
+
+def _feed(h: Any, v: Any) -> None:
+    """Однозначная сериализация значения графа в хэш (с длинами; множества — отсортированы)."""
+    if v is None:
+        h.update(b"N")
+    elif isinstance(v, str):
+        b = v.encode("utf-8")
+        h.update(b"s%d:" % len(b))
+        h.update(b)
+    elif isinstance(v, ColumnarTable):
+        h.update(b"t%d,%d:" % (len(v), v.n_cols))
+        for c in range(v.n_cols):
+            for cell in v.column(c):
+                _feed(h, cell)
+    elif isinstance(v, (set, frozenset)):
+        items = sorted(v)
+        h.update(b"S%d:" % len(items))
+        for x in items:
+            _feed(h, x)
+    elif isinstance(v, (list, tuple)) or hasattr(v, "__iter__") and hasattr(v, "__len__"):
+        h.update(b"l%d:" % len(v))
+        for x in v:
+            _feed(h, x)
+    else:
+        _feed(h, str(v))
+
+
+def _digest(values: list[Any]) -> str:
+    h = hashlib.sha256()
+    for v in values:
+        _feed(h, v)
+    return h.hexdigest()
+
+
+def task_digests(graph: TripleStore, role: str = "stu") -> dict[int, str]:
+    """Отпечатки ответов по заданиям; задание без данных — пустая строка."""
+    parts = {name: get(graph, role) for name, get in _PARTS.items()}
+    return {
+        task: _digest([parts[p] for p in names]) if any(parts[p] for p in names) else ""
+        for task, names in TASK_INPUTS.items()
+    }
+
+
+def answer_digest(digests: dict[int, str]) -> str:
+    """Отпечаток работы целиком; пустая работа — пустая строка (в кластеры не попадает)."""
+    if not any(digests.values()):
+        return ""
+    return _digest([f"{task}:{d}" for task, d in sorted(digests.items())])
+
+
+def reference_key(graph: TripleStore, **options: Any) -> str:
+    """Ключ эталона для кэша: все данные графа эталона и параметры проверки."""
+    return _digest([_PARTS[name](graph, "ref") for name in _PARTS] + [repr(sorted(options.items()))])
+
+
+@dataclass
+class AnswerProfile:
+    """Отпечатки ответов по заданиям (кэш, кластеры) и шинглы работы (app.core.similarity)."""
+    task_digests: dict[int, str]
+    shingles: frozenset[int]
+
+
+def file_digest(path: Union[str, Path]) -> str:
+    """sha256 содержимого файла; нечитаемый файл — пустая строка."""
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    except OSError:
+        return ""
+    return h.hexdigest()
+
+
+class TaskResultCache:
+    """
+    TaskResult по (ключ эталона, задание, отпечаток ответа) с вытеснением LRU.
+    Один кэш на процесс пула на всю пакетную проверку; результаты общие — не изменять.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self._data: "OrderedDict[tuple[str, int, str], TaskResult]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: tuple[str, int, str]) -> Optional[TaskResult]:
+        result = self._data.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        count("task_result_reused")
+        return result
+
+    def put(self, key: tuple[str, int, str], result: TaskResult) -> TaskResult:
+        self._data[key] = result
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return result
+
+
+@dataclass
+class Cluster:
+    """Работы с одинаковыми ответами на все задания (индексы в списке файлов пакета)."""
+    members: list[int]
+    same_file: bool  # все файлы кластера побайтно совпадают
+
+
+def find_clusters(answer_digests: dict[int, str], file_digests: Optional[dict[int, str]] = None) -> list[Cluster]:
+    """Кластеры из двух и более работ с одним отпечатком, по первому участнику."""
+    groups: dict[str, list[int]] = {}
+    for i in sorted(answer_digests):
+        if answer_digests[i]:
+            groups.setdefault(answer_digests[i], []).append(i)
+    files = file_digests or {}
+    return [
+        Cluster(members, len({files.get(i) for i in members}) == 1 and bool(files.get(members[0])))
+        for members in groups.values()
+        if len(members) > 1
+    ]
@@ -1,5 +1,5 @@
 from app.core.excel.blocks import find_task_blocks
-from app.core.excel.importer import parse_workbook, ParsedSolution
+from app.core.excel.importer import parse_workbook, parse_workbook_sheets, ParsedSolution
 from app.core.excel.table_detect import detect_tables_in_block
 
-__all__ = ["find_task_blocks", "parse_workbook", "ParsedSolution", "detect_tables_in_block"]
+__all__ = ["find_task_blocks", "parse_workbook", "parse_workbook_sheets", "ParsedSolution", "detect_tables_in_block"]
@@ -1,12 +1,7 @@
 """Find task blocks by anchor 'Задание №<number>'."""
-import re
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
 
-if TYPE_CHECKING:
-    from openpyxl.worksheet.worksheet import Worksheet
-
-TASK_ANCHOR_RE = re.compile(r"Задание\s*№\s*(\d+)", re.IGNORECASE)
+from app.core.excel.sheet_index import TASK_ANCHOR_RE, SheetLike, sheet_index  # noqa: F401 — TASK_ANCHOR_RE для импортёров
 
 
 @dataclass
@@ -18,22 +13,15 @@ class TaskBlock:
     anchor_row: int  # row where "Задание №N" was found
 
 
-def find_task_blocks(ws: "Worksheet") -> list[TaskBlock]:
+def find_task_blocks(ws: SheetLike) -> list[TaskBlock]:
     """
     Scan worksheet for 'Задание №N' and build blocks.
     Block for task N: from anchor row (inclusive) to next anchor or end of sheet.
+    ws — SheetIndex листа (готовый список якорей) или сам лист. Последний блок
+    заканчивается на последней непустой строке, а не на ws.max_row.
     """
-    anchors: list[tuple[int, int]] = []  # (row, task_num)
-    for row_idx in range(1, ws.max_row + 1):
-        row_text = " ".join(
-            str(ws.cell(row=row_idx, column=c).value or "").strip()
-            for c in range(1, min(ws.max_column + 1, 50))
-        )
-        m = TASK_ANCHOR_RE.search(row_text)
-        if m:
-            num = int(m.group(1))
-            if 1 <= num <= 13:
-                anchors.append((row_idx, num))
+    sheet = sheet_index(ws)
+    anchors = [(row, num) for row, num in sheet.anchors if 1 <= num <= 13]  # (row, task_num)
 
     # Sort by row; dedupe by task_num (keep first occurrence per task)
     seen: set[int] = set()
@@ -45,6 +33,6 @@ def find_task_blocks(ws: "Worksheet") -> list[TaskBlock]:
 
     blocks: list[TaskBlock] = []
     for i, (row, num) in enumerate(ordered):
-        end = ordered[i + 1][0] if i + 1 < len(ordered) else ws.max_row + 1
+        end = ordered[i + 1][0] if i + 1 < len(ordered) else sheet.max_row + 1
         blocks.append(TaskBlock(task_num=num, start_row=row, end_row=end, anchor_row=row))
     return blocks
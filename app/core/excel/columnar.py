@@ -0,0 +1,166 @@
+"""
+Columnar table: one array of string ids per column over a shared string pool.
+
+Ячейки таблицы — номера строк в пуле (array('I'), 4 байта на ячейку); одинаковые
+значения хранятся один раз. Строка таблицы — RowView (без копирования): индексация,
+срезы, итерация и сравнение со списками как у list[str], поэтому код, перебирающий
+``tbl.rows``, работает без изменений. Разбиения и ключи (partitions, discovery)
+берут столбцы id напрямую: равенство id в одном пуле — равенство строк.
+"""
+from array import array
+from typing import Any, Iterable, Iterator, Optional, Sequence, Union
+
+
+class StringPool:
+    """Интернирование строк: строка -> id, id -> строка."""
+
+    __slots__ = ("strings", "_ids")
+
+    def __init__(self) -> None:
+        self.strings: list[str] = []
+        self._ids: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def intern(self, s: str) -> int:
+        i = self._ids.get(s)
+        if i is None:
+            i = self._ids[s] = len(self.strings)
+            self.strings.append(s)
+        return i
+
+    def id_of(self, s: str) -> Optional[int]:
+        return self._ids.get(s)
+
+    def __getstate__(self) -> list[str]:
+        return self.strings
+
+    def __setstate__(self, strings: list[str]) -> None:
+        self.strings = strings
+        self._ids = {s: i for i, s in enumerate(strings)}
+
+
+class RowView(Sequence[str]):
+    """Строка i таблицы: ячейки читаются из столбцов по требованию."""
+
+    __slots__ = ("_table", "_i")
+
+    def __init__(self, table: "ColumnarTable", i: int) -> None:
+        self._table = table
+        self._i = i
+
+    def __len__(self) -> int:
+        return len(self._table.columns)
+
+    def __getitem__(self, c: Union[int, slice]) -> Any:
+        strings = self._table.pool.strings
+        if isinstance(c, slice):
+            return [strings[col[self._i]] for col in self._table.columns[c]]
+        return strings[self._table.columns[c][self._i]]
+
+    def __iter__(self) -> Iterator[str]:
+        strings = self._table.pool.strings
+        i = self._i
+        return (strings[col[i]] for col in self._table.columns)
+
+    def ids(self) -> tuple[int, ...]:
+        i = self._i
+        return tuple(col[i] for col in self._table.columns)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, RowView) and other._table.pool is self._table.pool:
+            return self.ids() == other.ids()
+        if isinstance(other, (RowView, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]  # как у list
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class ColumnarTable(Sequence[RowView]):
+    """Прямоугольная таблица строк; ``len``, ``table[i]``, итерация — по строкам (RowView)."""
+
+    def __init__(self, n_cols: int, pool: Optional[StringPool] = None) -> None:
+        self.pool = pool if pool is not None else StringPool()
+        self.columns: list[array] = [array("I") for _ in range(n_cols)]
+        self._n_rows = 0
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[Any]], n_cols: int, pool: Optional[StringPool] = None) -> "ColumnarTable":
+        """Строки обрезаются / дополняются пустой строкой до n_cols; значения — str(v)."""
+        t = cls(n_cols, pool)
+        for row in rows:
+            t.append(row)
+        return t
+
+    @property
+    def n_cols(self) -> int:
+        return len(self.columns)
+
+    def append(self, row: Sequence[Any]) -> None:
+        intern = self.pool.intern
+        n = len(row)
+        for c, col in enumerate(self.columns):
+            v = row[c] if c < n else ""
+            col.append(intern(v if isinstance(v, str) else ("" if v is None else str(v))))
+        self._n_rows += 1
+
+    def __len__(self) -> int:
+        return self._n_rows
+
+    def __getitem__(self, i: Union[int, slice]) -> Any:
+        if isinstance(i, slice):
+            return [RowView(self, k) for k in range(*i.indices(self._n_rows))]
+        if i < 0:
+            i += self._n_rows
+        if not 0 <= i < self._n_rows:
+            raise IndexError(i)
+        return RowView(self, i)
+
+    def __iter__(self) -> Iterator[RowView]:
+        return (RowView(self, i) for i in range(self._n_rows))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (ColumnarTable, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"ColumnarTable({self._n_rows} rows x {self.n_cols} cols, {len(self.pool)} strings)"
+
+    def column_ids(self, c: int) -> array:
+        return self.columns[c]
+
+    def column(self, c: int) -> list[str]:
+        strings = self.pool.strings
+        return [strings[i] for i in self.columns[c]]
+
+    def row_ids(self) -> Iterator[tuple[int, ...]]:
+        """Кортежи id по строкам (ключи словарей без декодирования)."""
+        return zip(*self.columns) if self.columns else iter([()] * self._n_rows)
+
+    def take(self, indices: Sequence[int]) -> "ColumnarTable":
+        """Подмножество строк (тот же пул): копируются только массивы id."""
+        t = ColumnarTable(0, self.pool)
+        t.columns = [array("I", (col[i] for i in indices)) for col in self.columns]
+        t._n_rows = len(indices)
+        return t
+
+    def to_lists(self) -> list[list[str]]:
+        return [list(r) for r in self]
+
+
+def table_columns(rows: Sequence[Sequence[Any]], indices: Sequence[int]) -> list[Sequence[Any]]:
+    """
+    Столбцы таблицы для разбиений: у ColumnarTable — массивы id без копирования,
+    у списка списков — списки значений (недостающие ячейки — пустая строка).
+    """
+    if isinstance(rows, ColumnarTable):
+        return [rows.columns[i] for i in indices]
+    return [[row[i] if i < len(row) else "" for row in rows] for i in indices]
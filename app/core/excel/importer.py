@@ -1,19 +1,22 @@
 """Parse workbook into ParsedSolution (task blocks -> tables/text)."""
+import os
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Optional, Union
 
-from openpyxl import load_workbook
-
 from app.core.excel.blocks import TaskBlock, find_task_blocks
+from app.core.excel.columnar import ColumnarTable, StringPool
+from app.core.excel.sheet_index import SheetIndex
 from app.core.excel.table_detect import TableInBlock, detect_tables_in_block
+from app.core.settings import SHEETS_MAX_WORKERS, SHEETS_PARALLEL_MIN
+from app.core.trace import span
 
 
 @dataclass
 class ExtractedTable:
-    """One table: header list (labels), rows of cell values."""
+    """One table: header list (labels), rows of normalized cell strings (columnar, see columnar.py)."""
     headers: list[str]
-    rows: list[list[Any]]
+    rows: ColumnarTable
 
 
 @dataclass
@@ -32,27 +35,16 @@ class ParsedSolution:
     sheet_name: str = ""
 
 
-def _cell_value(ws, row: int, col: int) -> Any:
-    v = ws.cell(row=row, column=col).value
-    if v is None:
-        return ""
-    return v
-
-
-def _extract_table(ws, table: TableInBlock) -> ExtractedTable:
+def _extract_table(sheet: SheetIndex, table: TableInBlock, pool: Optional[StringPool] = None) -> ExtractedTable:
     from app.core.checks.common import normalize_cell_value
 
-    headers = []
-    for c in range(table.min_col, table.max_col + 1):
-        v = _cell_value(ws, table.header_row, c)
-        headers.append(str(v).strip() if v is not None else "")
-    rows = []
+    cols = range(table.min_col, table.max_col + 1)
+    header = sheet.row(table.header_row)
+    headers = [str(header.value(c) if header.value(c) is not None else "").strip() for c in cols]
+    rows = ColumnarTable(len(cols), pool)
     for r in table.data_rows:
-        row = []
-        for c in range(table.min_col, table.max_col + 1):
-            v = _cell_value(ws, r, c)
-            row.append(normalize_cell_value(v))
-        rows.append(row)
+        s = sheet.row(r)
+        rows.append([normalize_cell_value(s.value(c)) for c in cols])
     return ExtractedTable(headers=headers, rows=rows)
 
 
@@ -71,36 +63,30 @@ def _line_looks_like_instruction(line: str) -> bool:
     return False
 
 
-def _block_text_lines(
-    ws, start_row: int, end_row: int, max_col: int = 30, skip_rows: Optional[set[int]] = None
-) -> list[str]:
+def _block_text_lines(sheet: SheetIndex, start_row: int, end_row: int, skip_rows: Optional[set[int]] = None) -> list[str]:
     """Собирает текст по строкам блока. skip_rows — номера строк (1-based) не включать (якорь, инструкции)."""
     skip_rows = skip_rows or set()
     lines = []
     for r in range(start_row, end_row):
         if r in skip_rows:
             continue
-        parts = []
-        for c in range(1, max_col + 1):
-            v = ws.cell(row=r, column=c).value
-            if v is not None and str(v).strip():
-                parts.append(str(v).strip())
-        if parts:
-            raw = " ".join(parts)
-            if not _line_looks_like_instruction(raw):
-                lines.append(raw)
+        raw = sheet.row(r).text
+        if raw and not _line_looks_like_instruction(raw):
+            lines.append(raw)
     return lines
 
 
-def _parse_block(ws, block: TaskBlock) -> TaskContent:
-    tables = detect_tables_in_block(
-        ws, block.start_row, block.end_row, anchor_row=block.anchor_row
-    )
-    extracted_tables = [_extract_table(ws, t) for t in tables]
+def _parse_block(sheet: SheetIndex, block: TaskBlock, pool: Optional[StringPool] = None) -> TaskContent:
+    with span("tables", task=block.task_num):
+        tables = detect_tables_in_block(
+            sheet, block.start_row, block.end_row, anchor_row=block.anchor_row
+        )
+        extracted_tables = [_extract_table(sheet, t, pool) for t in tables]
     # Не включать строку-якорь в text_lines, чтобы не попадали "ответ:" и подсказки
-    text_lines = _block_text_lines(
-        ws, block.start_row, block.end_row, skip_rows={block.anchor_row}
-    )
+    with span("text", task=block.task_num):
+        text_lines = _block_text_lines(
+            sheet, block.start_row, block.end_row, skip_rows={block.anchor_row}
+        )
     return TaskContent(
         task_num=block.task_num,
         tables=extracted_tables,
@@ -108,18 +94,95 @@ def _parse_block(ws, block: TaskBlock) -> TaskContent:
     )
 
 
+def _load(path: Path):
+    from openpyxl import load_workbook  # ленивый импорт: ~0.1 с, нужен только при разборе файла
+
+    # read_only: лист читается потоково, один раз — в SheetIndex
+    return load_workbook(path, read_only=True, data_only=True)
+
+
+def _parse_sheet(ws, pool: Optional[StringPool] = None) -> ParsedSolution:
+    with span("index", sheet=ws.title):
+        sheet = SheetIndex.from_worksheet(ws)
+    with span("blocks"):
+        blocks = find_task_blocks(sheet)
+    pool = pool if pool is not None else StringPool()
+    tasks = {b.task_num: _parse_block(sheet, b, pool) for b in blocks}
+    return ParsedSolution(tasks=tasks, sheet_name=ws.title)
+
+
+def _task1_key(parsed: ParsedSolution) -> tuple[str, ...]:
+    t = parsed.tasks.get(1)
+    return tuple(t.tables[0].headers) if t and t.tables else ()
+
+
 def parse_workbook(path: Union[str, Path]) -> ParsedSolution:
-    """Load Excel file and parse first sheet into task blocks and content."""
+    """
+    Load Excel file and parse the active sheet into task blocks and content.
+    Работа, разбитая по листам: задания, которых нет на активном листе, берутся с
+    остальных листов по порядку — кроме листов с другим заданием №1 (другой вариант).
+    """
     path = Path(path)
-    wb = load_workbook(path, read_only=False, data_only=True)
-    ws = wb.active
-    if ws is None:
+    with span("parse_workbook", file=path.name):
+        with span("load"):
+            wb = _load(path)
+        try:
+            ws = wb.active
+            if ws is None:
+                return ParsedSolution(sheet_name="")
+            pool = StringPool()  # один пул ячеек на книгу
+            parsed = _parse_sheet(ws, pool)
+            key = _task1_key(parsed)
+            for other in wb.worksheets:
+                if len(parsed.tasks) >= 13:
+                    break
+                if other.title == ws.title:
+                    continue
+                extra = _parse_sheet(other, pool)
+                other_key = _task1_key(extra)
+                if other_key and key and other_key != key:
+                    continue
+                for num, content in extra.tasks.items():
+                    parsed.tasks.setdefault(num, content)
+        finally:
+            wb.close()
+    return parsed
+
+
+def _parse_sheet_by_name(path: str, name: str) -> ParsedSolution:
+    wb = _load(Path(path))
+    try:
+        return _parse_sheet(wb[name])
+    finally:
         wb.close()
-        return ParsedSolution(sheet_name="")
-    name = ws.title
-    blocks = find_task_blocks(ws)
-    tasks = {}
-    for b in blocks:
-        tasks[b.task_num] = _parse_block(ws, b)
-    wb.close()
-    return ParsedSolution(tasks=tasks, sheet_name=name)
+
+
+def parse_workbook_sheets(path: Union[str, Path], max_workers: Optional[int] = SHEETS_MAX_WORKERS) -> list[ParsedSolution]:
+    """
+    Every sheet with task blocks, the active sheet first (эталон со всеми вариантами —
+    по листу на вариант). При SHEETS_PARALLEL_MIN листах и больше листы разбираются
+    параллельно в процессах (каждый со своим пулом строк), иначе — в этом процессе.
+    """
+    path = Path(path)
+    with span("parse_workbook_sheets", file=path.name):
+        with span("load"):
+            wb = _load(path)
+        active = wb.active.title if wb.active is not None else ""
+        names = [ws.title for ws in wb.worksheets]
+        workers = min(max_workers or os.cpu_count() or 1, len(names))
+        if len(names) < SHEETS_PARALLEL_MIN or workers <= 1:
+            try:
+                pool = StringPool()
+                sheets = [_parse_sheet(ws, pool) for ws in wb.worksheets]
+            finally:
+                wb.close()
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            wb.close()
+            with span("parallel", sheets=len(names), workers=workers):
+                with ProcessPoolExecutor(max_workers=workers) as ex:
+                    sheets = list(ex.map(_parse_sheet_by_name, [str(path)] * len(names), names))
+    sheets = [s for s in sheets if s.tasks]
+    sheets.sort(key=lambda s: s.sheet_name != active)  # стабильно: активный лист первым
+    return sheets
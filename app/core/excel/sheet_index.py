@@ -0,0 +1,178 @@
+"""
+Per-row summary of a worksheet, computed in one pass.
+
+Лист читается один раз (``iter_rows(values_only=True)``); для каждой строки
+заранее считаются: занятость столбцов 1..30 (битовая маска), число непустых ячеек,
+первый/последний занятый столбец, «разделитель» (только точки/многоточия),
+«инструкция» («Задание №N», «ответ:», длинная подсказка), склеенный текст и номер
+задания из якоря. Поиск блоков, таблиц и текстовых строк дальше работает только
+с этими сводками — без ws.cell и повторного str().strip().
+"""
+import re
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+from app.core.checks.common import SEPARATOR_ROW_RE
+
+if TYPE_CHECKING:
+    from openpyxl.worksheet.worksheet import Worksheet
+
+DETECT_COLS = 30  # столбцы для таблиц и текста
+ANCHOR_COLS = 49  # столбцы для поиска «Задание №N»
+
+# Строка с "Задание №N" или "ответ:" — инструкция, не данные
+TASK_ANCHOR_RE = re.compile(r"Задание\s*№\s*(\d+)", re.IGNORECASE)
+ANSWER_PREFIX_RE = re.compile(r"^\s*ответ\s*:?\s*", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class RowSummary:
+    """Сводка одной строки листа (столбцы 1-based, маски — бит c-1 для столбца c)."""
+    row: int
+    values: tuple[Any, ...]  # сырые значения ячеек 1..ANCHOR_COLS (может быть короче)
+    mask: int  # непустые ячейки в 1..DETECT_COLS
+    content_mask: int  # непустые и не «точки/многоточия»
+    count: int
+    first_col: int  # 0 — строка пуста
+    last_col: int
+    is_separator: bool
+    is_instruction: bool
+    text: str  # непустые ячейки 1..DETECT_COLS через пробел
+    anchor: Optional[int]  # N из «Задание №N» (в 1..ANCHOR_COLS), если есть
+
+    def value(self, col: int) -> Any:
+        return self.values[col - 1] if 0 < col <= len(self.values) else None
+
+    def has_content(self, min_col: int, max_col: int) -> bool:
+        """Есть непустая ячейка в [min_col, max_col]."""
+        return bool(self.mask & _range_mask(min_col, max_col))
+
+    def count_in(self, min_col: int, max_col: int) -> int:
+        return bin(self.mask & _range_mask(min_col, max_col)).count("1")
+
+    def is_separator_in(self, min_col: int, max_col: int) -> bool:
+        """В [min_col, max_col] только пустые ячейки и разделители."""
+        return not self.content_mask & _range_mask(min_col, max_col)
+
+
+def _range_mask(min_col: int, max_col: int) -> int:
+    if max_col < min_col:
+        return 0
+    return ((1 << (max_col - min_col + 1)) - 1) << (min_col - 1)
+
+
+def _is_instruction(cells: list[str], text: str) -> bool:
+    """Заголовок задания, «ответ:», одна длинная подсказка — не данные."""
+    if not cells:
+        return True
+    if TASK_ANCHOR_RE.search(text):
+        return True
+    # Первая ячейка — только "ответ:" или начинается с "ответ:"
+    if ANSWER_PREFIX_RE.match(cells[0]) and len(cells) <= 2:
+        return True
+    if cells[0].lower().strip().startswith("ответ") and len(cells) <= 3:
+        return True
+    # Одна длинная подсказка (например "порядок столбцов лучше изменить...")
+    if len(cells) <= 2 and any(len(s) > 50 for s in cells):
+        return True
+    return False
+
+
+_EMPTY = RowSummary(
+    row=0, values=(), mask=0, content_mask=0, count=0, first_col=0, last_col=0,
+    is_separator=True, is_instruction=True, text="", anchor=None,
+)
+
+
+def _find_anchor(parts: list[str]) -> Optional[int]:
+    """«Задание №N» в ячейках строки; без «№» в какой-либо ячейке регулярное выражение не запускается."""
+    if not any("№" in p for p in parts):
+        return None
+    m = TASK_ANCHOR_RE.search(" ".join(parts))
+    return int(m.group(1)) if m else None
+
+
+def summarize_row(row: int, values: tuple[Any, ...]) -> RowSummary:
+    mask = content_mask = count = first = last = 0
+    cells: list[str] = []
+    anchor_parts: list[str] = []
+    for c, v in enumerate(values, start=1):
+        if v is None:
+            continue
+        s = str(v).strip()
+        if not s:
+            continue
+        if c > DETECT_COLS:
+            anchor_parts.append(s)
+            continue
+        bit = 1 << (c - 1)
+        mask |= bit
+        if not SEPARATOR_ROW_RE.match(s):
+            content_mask |= bit
+        count += 1
+        first = first or c
+        last = c
+        cells.append(s)
+    if not cells and not anchor_parts:
+        return replace(_EMPTY, row=row, values=values)
+    text = " ".join(cells)
+    has_str = any(isinstance(v, str) for v in values)
+    return RowSummary(
+        row=row,
+        values=values,
+        mask=mask,
+        content_mask=content_mask,
+        count=count,
+        first_col=first,
+        last_col=last,
+        is_separator=not content_mask,
+        is_instruction=_is_instruction(cells, text),
+        text=text,
+        anchor=_find_anchor(cells + anchor_parts) if has_str else None,
+    )
+
+
+class SheetIndex:
+    """
+    Сводки строк листа; row(r) — строка r (1-based). Пустые строки не хранятся
+    (пустая сводка), хвост из пустых строк отрезается: max_row — последняя строка
+    с содержимым, а не размер листа с учётом оформления. anchors — (строка, N)
+    для всех «Задание №N» по порядку строк.
+    """
+
+    def __init__(self, rows: list[Optional[RowSummary]]) -> None:
+        last = len(rows)
+        while last and (rows[last - 1] is None or not rows[last - 1].text and rows[last - 1].anchor is None):
+            last -= 1
+        self._rows = rows[:last]
+        self.max_row = last
+        self.anchors = [(s.row, s.anchor) for s in self._rows if s is not None and s.anchor is not None]
+
+    @classmethod
+    def from_worksheet(cls, ws: "Worksheet") -> "SheetIndex":
+        """Один проход по листу (обычному или read_only); строки из одних None — без разбора."""
+        if hasattr(ws, "reset_dimensions"):  # read_only: размеры из файла могут быть неверны
+            ws.reset_dimensions()
+            it = ws.iter_rows(max_col=ANCHOR_COLS, values_only=True)
+        else:
+            width = min(ws.max_column, ANCHOR_COLS)
+            it = ws.iter_rows(min_row=1, max_row=ws.max_row, max_col=width, values_only=True)
+        rows: list[Optional[RowSummary]] = []
+        for r, values in enumerate(it, start=1):
+            rows.append(None if values.count(None) == len(values) else summarize_row(r, tuple(values)))
+        return cls(rows)
+
+    def row(self, r: int) -> RowSummary:
+        if 1 <= r <= self.max_row:
+            s = self._rows[r - 1]
+            if s is not None:
+                return s
+        return _EMPTY
+
+
+SheetLike = Union["Worksheet", SheetIndex]
+
+
+def sheet_index(ws: SheetLike) -> SheetIndex:
+    """SheetIndex как есть или построенный по листу (для вызовов с ws напрямую)."""
+    return ws if isinstance(ws, SheetIndex) else SheetIndex.from_worksheet(ws)
@@ -0,0 +1,244 @@
+"""
+Reference library: a folder of reference workbooks, indexed in SQLite by task 1 fingerprint.
+
+Каждый лист каждой книги папки — вариант: разобранный лист (ParsedSolution)
+сохраняется «пакетом» в базе ``.dbnc_library.sqlite`` рядом с книгами вместе с
+отпечатком и атрибутами задания №1. Пакет — только данные (JSON: пул строк, id
+ячеек по столбцам, заголовки, текст): база лежит в общей папке, и pickle из неё
+исполнял бы код любого, кто может её записать. ``sync`` перечитывает только новые и
+изменённые книги (по mtime и размеру), удалённые — убирает. Выбор варианта для
+работы студента — запрос по индексу отпечатка; без точного совпадения — вариант с
+наибольшим коэффициентом Жаккара по множествам атрибутов задания №1.
+
+CLI: ``python -m app.core.library <папка>`` — обновить индекс и вывести варианты.
+"""
+import json
+import sqlite3
+from array import array
+import sys
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from app.core.excel.columnar import ColumnarTable, StringPool
+from app.core.excel.importer import ExtractedTable, ParsedSolution, TaskContent, parse_workbook_sheets
+from app.core.trace import count, span
+from app.core.variants import VariantMatch, jaccard, solution_attrs, solution_fingerprint
+
+LIBRARY_DB_NAME = ".dbnc_library.sqlite"
+# Формат пакета: при изменении ParsedSolution/ColumnarTable — увеличить, индекс пересоберётся
+BUNDLE_VERSION = 2  # 2 — JSON вместо pickle
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS variants (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    sheet TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    attrs TEXT NOT NULL,
+    bundle TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS variants_fingerprint ON variants(fingerprint);
+"""
+
+
+def dump_bundle(parsed: ParsedSolution) -> str:
+    """Пакет варианта: JSON с общим пулом строк и id ячеек по столбцам (как в ColumnarTable)."""
+    pool = StringPool()
+    tasks = []
+    for num, t in sorted(parsed.tasks.items()):
+        tables = []
+        for tbl in t.tables:
+            strings = tbl.rows.pool.strings
+            columns = [[pool.intern(strings[i]) for i in tbl.rows.column_ids(c)] for c in range(tbl.rows.n_cols)]
+            tables.append({"headers": list(tbl.headers), "rows": len(tbl.rows), "columns": columns})
+        tasks.append({"num": num, "text_lines": list(t.text_lines), "tables": tables})
+    return json.dumps({"sheet": parsed.sheet_name, "strings": pool.strings, "tasks": tasks}, ensure_ascii=False)
+
+
+def load_bundle(text: str) -> ParsedSolution:
+    """Обратно к ParsedSolution; запись не того вида — ValueError (данные не исполняются)."""
+    try:
+        data = json.loads(text)
+        strings = [str(s) for s in data["strings"]]
+        pool = StringPool()
+        pool.__setstate__(strings)
+        parsed = ParsedSolution(sheet_name=str(data["sheet"]))
+        for t in data["tasks"]:
+            num = int(t["num"])
+            content = TaskContent(task_num=num, text_lines=[str(x) for x in t["text_lines"]])
+            for tbl in t["tables"]:
+                n_rows = int(tbl["rows"])
+                rows = ColumnarTable(0, pool)
+                rows.columns = [array("I", col) for col in tbl["columns"]]
+                if any(len(col) != n_rows or (col and max(col) >= len(strings)) for col in rows.columns):
+                    raise ValueError("ячейки вне пула строк")
+                rows._n_rows = n_rows
+                content.tables.append(ExtractedTable([str(h) for h in tbl["headers"]], rows))
+            parsed.tasks[num] = content
+        return parsed
+    except (KeyError, TypeError, AttributeError, OverflowError, json.JSONDecodeError) as e:
+        raise ValueError(f"пакет варианта повреждён: {e!s}") from None
+
+
+class ReferenceLibrary:
+    """
+    Варианты из всех книг папки (без вложенных папок). Пакеты загружаются из базы по
+    требованию и кэшируются; в процессы пула передаётся только путь к папке.
+    """
+
+    def __init__(self, root: Union[str, Path], db_path: Optional[Union[str, Path]] = None) -> None:
+        self.root = Path(root)
+        self.db_path = Path(db_path) if db_path is not None else self.root / LIBRARY_DB_NAME
+        self._conn: Optional[sqlite3.Connection] = None
+        self._bundles: dict[int, ParsedSolution] = {}
+        self._attrs: Optional[list[tuple[int, frozenset[str]]]] = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"root": self.root, "db_path": self.db_path}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(state["root"], state["db_path"])
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.db_path))
+            conn.execute("PRAGMA foreign_keys = ON")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != BUNDLE_VERSION:
+                conn.executescript("DROP TABLE IF EXISTS variants; DROP TABLE IF EXISTS files;")
+                conn.execute(f"PRAGMA user_version = {BUNDLE_VERSION}")
+            conn.executescript(_SCHEMA)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def sync(self) -> tuple[int, int]:
+        """Переиндексировать новые/изменённые книги, удалить исчезнувшие. Возвращает (обновлено, удалено)."""
+        from app.core.batch import list_student_files
+
+        db = self._db()
+        known = {p: (m, s) for p, m, s in db.execute("SELECT path, mtime_ns, size FROM files")}
+        updated = 0
+        with span("library_sync", root=self.root.name):
+            present = set()
+            for p in list_student_files(self.root):
+                st = p.stat()
+                present.add(p.name)
+                if known.get(p.name) == (st.st_mtime_ns, st.st_size):
+                    continue
+                try:
+                    sheets = parse_workbook_sheets(p)
+                except Exception:  # битая книга в папке не должна ломать библиотеку
+                    count("library_bad_file")
+                    sheets = []
+                db.execute("DELETE FROM files WHERE path = ?", (p.name,))
+                db.execute("INSERT INTO files VALUES (?, ?, ?)", (p.name, st.st_mtime_ns, st.st_size))
+                for parsed in sheets:
+                    fp = solution_fingerprint(parsed)
+                    if not fp:
+                        continue
+                    db.execute(
+                        "INSERT INTO variants (path, sheet, fingerprint, attrs, bundle) VALUES (?, ?, ?, ?, ?)",
+                        (p.name, parsed.sheet_name, fp, "\n".join(solution_attrs(parsed)),
+                         dump_bundle(parsed)),
+                    )
+                updated += 1
+            removed = [p for p in known if p not in present]
+            db.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in removed])
+            db.commit()
+        if updated or removed:
+            self._bundles.clear()
+            self._attrs = None
+        return updated, len(removed)
+
+    def __len__(self) -> int:
+        return self._db().execute("SELECT COUNT(*) FROM variants").fetchone()[0]
+
+    def variants(self) -> list[tuple[str, str, str]]:
+        """(файл, лист, отпечаток) всех вариантов по порядку файлов."""
+        return list(self._db().execute("SELECT path, sheet, fingerprint FROM variants ORDER BY path, id"))
+
+    def _bundle(self, vid: int) -> ParsedSolution:
+        parsed = self._bundles.get(vid)
+        if parsed is None:
+            name, text = self._db().execute("SELECT path, bundle FROM variants WHERE id = ?", (vid,)).fetchone()
+            try:
+                parsed = load_bundle(text)
+            except ValueError:
+                # испорченная запись: книга будет разобрана заново при следующем sync
+                count("library_bad_bundle")
+                self._db().execute("DELETE FROM files WHERE path = ?", (name,))
+                self._db().commit()
+                raise ValueError(f"Повреждён индекс библиотеки для {name}: обновите библиотеку") from None
+            self._bundles[vid] = parsed
+        return parsed
+
+    def _path(self, vid: int) -> str:
+        (name,) = self._db().execute("SELECT path FROM variants WHERE id = ?", (vid,)).fetchone()
+        return str(self.root / name)
+
+    @property
+    def default(self) -> ParsedSolution:
+        row = self._db().execute("SELECT id FROM variants ORDER BY path, id LIMIT 1").fetchone()
+        return self._bundle(row[0]) if row else ParsedSolution()
+
+    def by_name(self, sheet_name: str, path: str = "") -> Optional[ParsedSolution]:
+        row = self._db().execute(
+            "SELECT id FROM variants WHERE path = ? AND sheet = ?", (Path(path).name, sheet_name)
+        ).fetchone()
+        return self._bundle(row[0]) if row else None
+
+    def match(self, stu: ParsedSolution) -> VariantMatch:
+        """Вариант с отпечатком студента, иначе ближайший по Жаккару (пустая библиотека — ValueError)."""
+        fp = solution_fingerprint(stu)
+        row = self._db().execute(
+            "SELECT id FROM variants WHERE fingerprint = ? ORDER BY path, id LIMIT 1", (fp,)
+        ).fetchone()
+        if row is not None:
+            return VariantMatch(self._bundle(row[0]), self._path(row[0]), 1.0)
+        count("library_nearest")
+        if self._attrs is None:
+            self._attrs = [
+                (vid, frozenset(attrs.split("\n")))
+                for vid, attrs in self._db().execute("SELECT id, attrs FROM variants ORDER BY path, id")
+            ]
+        if not self._attrs:
+            raise ValueError(f"В библиотеке эталонов нет вариантов: {self.root}")
+        stu_attrs = set(solution_attrs(stu))
+        vid, best = self._attrs[0][0], -1.0
+        for i, attrs in self._attrs:  # при равенстве — первый по порядку файлов
+            sim = jaccard(attrs, stu_attrs)
+            if sim > best:
+                vid, best = i, sim
+        return VariantMatch(self._bundle(vid), self._path(vid), best)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Обновить индекс папки эталонов и вывести варианты."""
+    args = sys.argv[1:] if argv is None else argv
+    if not args:
+        print("usage: python -m app.core.library <folder>", file=sys.stderr)
+        return 2
+    library = ReferenceLibrary(args[0])
+    try:
+        updated, removed = library.sync()
+        rows = library.variants()
+        print(f"Книг обновлено: {updated}, удалено: {removed}, вариантов: {len(rows)}")
+        for name, sheet, fp in rows:
+            print(f"  {fp[:12]}  {name} / {sheet}")
+    finally:
+        library.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,9 @@
 """HTML report builder. Все подписи и форматирование — по-русски."""
 import html
-from typing import Any, List, Tuple
+from typing import Any, List, Optional, Tuple
+
+# Строк на страницу при постраничном просмотре задания (таблица 1НФ и длинные списки)
+REPORT_PAGE_ROWS = 50
 
 # Русские подписи статусов
 STATUS_RU = {
@@ -28,6 +31,14 @@ TASK_TITLES = {
 }
 
 
+_TASK_CSS = (
+    "table{border-collapse:collapse;margin:0.5rem 0;}"
+    "th,td{border:1px solid #ccc;padding:4px 8px;text-align:left;vertical-align:top;}"
+    "th{background:#f5f5f5;} .expected{background:#f8f8f8;}"
+    ".pass{color:#0a0;} .warn{color:#c60;} .fail{color:#c00;} .insf{color:#666;}"
+)
+
+
 def _escape(s: str) -> str:
     return html.escape(str(s))
 
@@ -75,6 +86,132 @@ def _format_value_html(val: Any) -> str:
     return _escape(raw).replace("\n", "<br>\n")
 
 
+def _rows_table_html(rows: List[Any], start: int = 0, more: int = 0) -> str:
+    """Строки данных (список списков) — HTML-таблица с номерами строк; more — сколько строк не показано."""
+    width = max((len(row) for row in rows), default=1) or 1
+    out = [f"<table><tr><th>№</th><th colspan='{width}'>Строка данных</th></tr>"]
+    for j, row in enumerate(rows, start=start + 1):
+        out.append(f"<tr><td>{j}</td>{_row_to_html(list(row))}</tr>")
+    if more:
+        out.append(f"<tr><td colspan='{width + 1}'>… и ещё {more} строк</td></tr>")
+    out.append("</table>")
+    return "".join(out)
+
+
+def _is_rows(val: Any) -> bool:
+    """Список строк таблицы: элементы — списки скалярных ячеек (не ФЗ, не цепочки, не отношения)."""
+    return (
+        isinstance(val, (list, tuple))
+        and bool(val)
+        and isinstance(val[0], (list, tuple))
+        and all(not isinstance(c, (list, tuple, set, frozenset)) for c in val[0])
+    )
+
+
+def task_page_count(r: Any, page_size: int = REPORT_PAGE_ROWS) -> int:
+    """Сколько страниц нужно для самого длинного списка (ожидалось/получено/не хватает/лишнее)."""
+    longest = max(
+        (len(v) for v in (r.expected, r.actual, r.missing, r.extra) if isinstance(v, (list, tuple))),
+        default=0,
+    )
+    return max(1, -(-longest // page_size))
+
+
+def _task_body_parts(task_num: int, r: Any, page: Optional[int] = None, page_size: int = REPORT_PAGE_ROWS) -> List[str]:
+    """
+    Тело секции задания. page=None — полный отчёт (списки усечены, как в экспорте);
+    page=k — k-я страница длинных списков (строки таблиц выводятся таблицей).
+    """
+    i = task_num
+    parts: List[str] = []
+
+    def window(val: Any) -> tuple[Any, int]:
+        if page is None or not isinstance(val, (list, tuple)) or len(val) <= page_size:
+            return val, 0
+        start = page * page_size
+        return list(val[start:start + page_size]), start
+
+    def value_html(val: Any) -> str:
+        if val is None:
+            return "—"
+        shown, start = window(val)
+        if page is not None and _is_rows(shown):
+            return _rows_table_html(shown, start)
+        if page is not None and isinstance(shown, (list, tuple)):
+            return _escape(_format_value(shown, max_items=page_size)).replace("\n", "<br>\n")
+        return _format_value_html(shown)
+
+    # Таблица сравнения: Ожидалось | Получено
+    parts.append("<table class='compare-table'><tr><th>Ожидалось (эталон)</th><th>Получено (ответ студента)</th></tr><tr>")
+    parts.append(f"<td class='expected'>{value_html(r.expected)}</td><td>{value_html(r.actual)}</td></tr></table>")
+
+    # Сначала — чего не хватает / в чём ошибка (явная формулировка)
+    if r.explanation:
+        parts.append(f"<p><b>В чём ошибка:</b> {_escape(r.explanation)}</p>")
+    if r.details and not r.explanation:
+        details_ru = _details_ru(r.details, i)
+        if details_ru:
+            parts.append(f"<p><b>Причина:</b> {_escape(details_ru)}</p>")
+
+    for label, val in (("missing", r.missing), ("extra", r.extra)):
+        if not val:
+            continue
+        if label == "missing":
+            if i == 11 and isinstance(val, list) and isinstance(val[0], str):
+                parts.append("<p><b>Атрибуты без покрытия в схемах студента:</b></p>")
+            else:
+                parts.append("<p><b>Отсутствует в ответе студента:</b></p>")
+        else:
+            parts.append("<p><b>Лишнее в ответе студента:</b></p>")
+        if i == 3 and isinstance(val, list) and isinstance(val[0], (list, tuple)):
+            if page is None:
+                parts.append(_rows_table_html(val[:10], more=max(0, len(val) - 10)))
+            else:
+                shown, start = window(val)
+                parts.append(_rows_table_html(shown, start))
+        else:
+            parts.append(f"<p class='code'>{value_html(val)}</p>")
+    if r.details and r.explanation and _details_ru(r.details, i):
+        parts.append(f"<p><b>Детали:</b> {_escape(_details_ru(r.details, i))}</p>")
+    return parts
+
+
+def build_task_html(task_num: int, r: Any, page: int = 0, page_size: int = REPORT_PAGE_ROWS) -> str:
+    """HTML одного задания (для просмотра по запросу): длинные списки — постранично."""
+    status_ru = STATUS_RU.get(r.status, r.status)
+    title = TASK_TITLES.get(task_num, f"Задание {task_num}")
+    parts = [
+        "<html><head><meta charset='utf-8'><style>",
+        _TASK_CSS,
+        "</style></head><body>",
+        f"<h2>Задание №{task_num}. {_escape(title)} — <span class='{r.status.lower()}'>{status_ru}</span></h2>",
+    ]
+    parts.extend(_task_body_parts(task_num, r, page=page, page_size=page_size))
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def _similarity_note(similarity: float) -> str:
+    """Вариант выбран не по отпечатку, а как ближайший по атрибутам задания №1."""
+    if similarity >= 1.0:
+        return ""
+    return f" (ближайший: совпадает {similarity:.0%} атрибутов задания №1)"
+
+
+def _student_file_html(stu_path: str, duplicate_of: str = "") -> str:
+    out = "<p><b>Файл студента:</b> " + _escape(stu_path) + "</p>"
+    if duplicate_of:
+        out += "<p><b>Побайтная копия файла:</b> " + _escape(duplicate_of) + "</p>"
+    return out
+
+
+def copy_report_html(report_html: str, stored_path: str, stored_duplicate_of: str, stu_path: str, original: str) -> str:
+    """Сохранённый отчёт (файл stored_path) — для побайтной копии stu_path работы original, без повторной проверки."""
+    return report_html.replace(
+        _student_file_html(stored_path, stored_duplicate_of), _student_file_html(stu_path, original), 1
+    )
+
+
 def build_html_report(compare_result: dict) -> str:
     """
     Build structured HTML report from compare() result.
@@ -106,8 +243,13 @@ def build_html_report(compare_result: dict) -> str:
         "</style></head><body>",
         "<h1>Отчёт проверки заданий по нормализации БД до 3НФ</h1>",
         "<p><b>Эталон:</b> " + _escape(compare_result.get("ref_path", "")) + "</p>",
-        "<p><b>Файл студента:</b> " + _escape(compare_result.get("stu_path", "")) + "</p>",
+        _student_file_html(compare_result.get("stu_path", ""), compare_result.get("duplicate_of", "")),
         f"<p><b>{fp_label}</b></p>",
+        *(
+            ["<p><b>Вариант эталона:</b> лист «" + _escape(compare_result.get("ref_sheet", "")) + "»"
+             + _similarity_note(compare_result.get("ref_similarity", 1.0)) + "</p>"]
+            if compare_result.get("ref_variants", 1) > 1 else []
+        ),
         f"<p><b>Оценка по заданию №4 (функциональные зависимости):</b> {_escape(score_4)} ({score_label})</p>",
         "<h2>Сводка по заданиям</h2>",
         "<table><tr><th>№</th><th>Задание</th><th>Результат</th></tr>",
@@ -130,48 +272,7 @@ def build_html_report(compare_result: dict) -> str:
         status_ru = STATUS_RU.get(r.status, r.status)
         title = TASK_TITLES.get(i, f"Задание {i}")
         parts.append(f"<details open><summary><b>Задание №{i}. {_escape(title)}</b> — {status_ru}</summary><div class='details'>")
-
-        # Таблица сравнения: Ожидалось | Получено
-        parts.append("<table class='compare-table'><tr><th>Ожидалось (эталон)</th><th>Получено (ответ студента)</th></tr><tr>")
-        expected_cell = _format_value_html(r.expected) if r.expected is not None else "—"
-        actual_cell = _format_value_html(r.actual) if r.actual is not None else "—"
-        parts.append(f"<td class='expected'>{expected_cell}</td><td>{actual_cell}</td></tr></table>")
-
-        # Сначала — чего не хватает / в чём ошибка (явная формулировка)
-        if r.explanation:
-            parts.append(f"<p><b>В чём ошибка:</b> {_escape(r.explanation)}</p>")
-        if r.details and not r.explanation:
-            details_ru = _details_ru(r.details, i)
-            if details_ru:
-                parts.append(f"<p><b>Причина:</b> {_escape(details_ru)}</p>")
-
-        if r.missing:
-            if i == 11 and isinstance(r.missing, list) and r.missing and isinstance(r.missing[0], str):
-                parts.append("<p><b>Атрибуты без покрытия в схемах студента:</b></p>")
-            else:
-                parts.append("<p><b>Отсутствует в ответе студента:</b></p>")
-            if i == 3 and isinstance(r.missing, list) and r.missing and isinstance(r.missing[0], (list, tuple)):
-                parts.append("<table><tr><th>№</th><th>Строка данных</th></tr>")
-                for j, row in enumerate(r.missing[:10]):
-                    parts.append(f"<tr><td>{j+1}</td><td>{_row_to_html(list(row))}</td></tr>")
-                if len(r.missing) > 10:
-                    parts.append(f"<tr><td colspan='2'>… и ещё {len(r.missing) - 10} строк</td></tr>")
-                parts.append("</table>")
-            else:
-                parts.append(f"<p class='code'>{_format_value_html(r.missing)}</p>")
-        if r.extra:
-            parts.append("<p><b>Лишнее в ответе студента:</b></p>")
-            if i == 3 and isinstance(r.extra, list) and r.extra and isinstance(r.extra[0], (list, tuple)):
-                parts.append("<table><tr><th>№</th><th>Строка данных</th></tr>")
-                for j, row in enumerate(r.extra[:10]):
-                    parts.append(f"<tr><td>{j+1}</td><td>{_row_to_html(list(row))}</td></tr>")
-                if len(r.extra) > 10:
-                    parts.append(f"<tr><td colspan='2'>… и ещё {len(r.extra) - 10} строк</td></tr>")
-                parts.append("</table>")
-            else:
-                parts.append(f"<p class='code'>{_format_value_html(r.extra)}</p>")
-        if r.details and r.explanation and _details_ru(r.details, i):
-            parts.append(f"<p><b>Детали:</b> {_escape(_details_ru(r.details, i))}</p>")
+        parts.extend(_task_body_parts(i, r))
         parts.append("</div></details>")
 
     parts.append("</body></html>")
@@ -198,6 +299,16 @@ def _details_ru(details: dict, task_num: int) -> str:
             "error": "ошибка",
             "lossless_warn": "предупреждение о беспотерьности",
             "dep_pres_warn": "предупреждение о сохранении зависимостей",
+            "dep_lost": "ФЗ, не следующие из проекций на отношения",
+            "projection_partial": "проекция ФЗ неполная (лимит атрибутов или времени)",
+            "data_violations": "ФЗ противоречат таблице 1НФ",
+            "missing_in_data": "пропущенные ФЗ и таблица 1НФ",
+            "pk_violation": "первичный ключ в таблице 1НФ",
+            "key_violations": "кандидатные ключи в таблице 1НФ",
+            "pk_columns_missing": "столбцов первичного ключа нет в таблице 1НФ (уникальность не проверялась)",
+            "example": "пример",
+            "rows": "строки",
+            "near_matches": "строки, отличающиеся одной ячейкой",
         }.get(k, k)
         if k == "reason":
             v_ru = {
@@ -210,9 +321,16 @@ def _details_ru(details: dict, task_num: int) -> str:
                 "pk_hint_empty_cell": "в ключевом столбце пустая ячейка",
                 "pk_hint_duplicate": "дубликат по ключу",
                 "rows_differ": "состав строк таблицы отличается от эталона",
+                "pk_duplicate": "дубликат по первичному ключу в таблице 1НФ",
+                "pk_empty_cell": "пустое значение первичного ключа в таблице 1НФ",
+                "lossy_join": "соединение отношений даёт лишние строки (декомпозиция с потерями)",
             }.get(str(v), str(v))
         elif k == "error":
             v_ru = str(v)
+        elif isinstance(v, list) and all(isinstance(x, str) for x in v):
+            v_ru = "; ".join(v)
+        elif isinstance(v, list) and all(isinstance(x, int) for x in v):
+            v_ru = ", ".join(str(x) for x in v)
         else:
             v_ru = str(v)
         if v_ru:
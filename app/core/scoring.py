@@ -1,22 +1,26 @@
 """Scoring for task #4: ++ / +- / -+ / -- by coverage of F_ref."""
-from app.core.algos.fd import closure
+from typing import Optional
+
+from app.core.algos.canonical import fd_set
 
 
 def score_fd_coverage(
     F_ref: list[tuple[list[str], str]],
     F_stu: list[tuple[list[str], str]],
+    missing: Optional[list[tuple[list[str], str]]] = None,
 ) -> tuple[float, str]:
     """
     F_ref, F_stu: list of (lhs, rhs) single RHS.
     covered = count of X->A in F_ref such that A in closure(X, F_stu).
+    missing — уже посчитанные невыводимые ФЗ F_ref (fd_diff), чтобы не повторять замыкания.
     Returns (score_ratio, label).
     """
     if not F_ref:
         return (0.0, "—")
-    covered = 0
-    for lhs, rhs in F_ref:
-        if rhs in closure(lhs, F_stu):
-            covered += 1
+    if missing is None:
+        covered = sum(fd_set(F_stu).implies_all(F_ref))
+    else:
+        covered = len(F_ref) - len(missing)
     ratio = covered / len(F_ref)
     if ratio >= 1.0:
         return (ratio, "++")
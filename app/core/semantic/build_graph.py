@@ -1,11 +1,12 @@
 """Build TripleStore graph from ParsedSolution; populates all task data used by checks."""
-from typing import Optional
+from typing import Optional, Sequence
 
 from app.core.checks import task2, task3, task4, task5, task6, task8, task11, task13
 from app.core.checks.common import canon_attr_for_compare
 from app.core.excel.importer import ParsedSolution
 from app.core.semantic.query import get_pk_hint
 from app.core.semantic.triples import TripleStore
+from app.core.trace import span
 
 
 def _task_subject(role: str, task_num: int) -> str:
@@ -27,7 +28,7 @@ def _add_repeating_group(store: TripleStore, role: str, attrs: set[str]) -> None
         store.add(subj, "repeating_group_contains", a)
 
 
-def _add_table_1nf(store: TripleStore, role: str, headers: list[str], rows: list[list]) -> None:
+def _add_table_1nf(store: TripleStore, role: str, headers: list[str], rows: Sequence[Sequence[str]]) -> None:
     subj = _task_subject(role, 3)
     store.add(subj, "has_task", 3)
     canon_headers = [canon_attr_for_compare(h) for h in headers]
@@ -92,60 +93,77 @@ def build_graph(
     Build graph from ParsedSolution; fills all task data used by checks.
     dict_ref is the attribute dictionary from ref task 1.
     """
+    with span("build_graph", role=role):
+        return _build_graph(solution, role, dict_ref, attr_canon_list)
+
+
+def _build_graph(
+    solution: ParsedSolution,
+    role: str,
+    dict_ref: dict[str, str],
+    attr_canon_list: Optional[list[str]],
+) -> TripleStore:
     store = TripleStore()
     U = set(dict_ref.keys())
 
     # Task 1: universal relation headers
-    t1 = solution.tasks.get(1)
-    if t1 and t1.tables:
-        headers = t1.tables[0].headers
-        attrs = [canon_attr_for_compare(h) for h in headers if str(h).strip()]
-        if attrs:
-            _add_universal_relation(store, role, attrs)
-    elif attr_canon_list:
-        _add_universal_relation(store, role, attr_canon_list)
+    with span("task1"):
+        t1 = solution.tasks.get(1)
+        if t1 and t1.tables:
+            headers = t1.tables[0].headers
+            attrs = [canon_attr_for_compare(h) for h in headers if str(h).strip()]
+            if attrs:
+                _add_universal_relation(store, role, attrs)
+        elif attr_canon_list:
+            _add_universal_relation(store, role, attr_canon_list)
 
     # Task 2: repeating group
-    rep = task2.extract_repeating_group_ref(solution, dict_ref)
-    if rep:
-        _add_repeating_group(store, role, rep)
+    with span("task2"):
+        rep = task2.extract_repeating_group_ref(solution, dict_ref)
+        if rep:
+            _add_repeating_group(store, role, rep)
 
     # Task 3: 1NF table (headers + rows for get_table_1nf)
-    table_1nf = task3._get_table_1nf(solution)
-    if table_1nf:
-        _add_table_1nf(store, role, table_1nf[0], table_1nf[1])
+    with span("task3"):
+        table_1nf = task3._get_table_1nf(solution)
+        if table_1nf:
+            _add_table_1nf(store, role, table_1nf[0], table_1nf[1])
 
     # Task 4: FDs
-    F = task4.extract_fds_ref(solution, dict_ref) if role == "ref" else task4.extract_fds_student(solution, dict_ref)
-    if F:
-        _add_fds(store, role, 4, F)
+    with span("task4"):
+        F = task4.extract_fds_ref(solution, dict_ref) if role == "ref" else task4.extract_fds_student(solution, dict_ref)
+        if F:
+            _add_fds(store, role, 4, F)
 
     # Task 5: PK — из блока №5 или из PK-hint таблицы 1НФ (столбцы с *)
-    pk_list = task5.extract_pk_ref(solution, dict_ref) if role == "ref" else task5.extract_pk_student(solution, dict_ref)
-    if not pk_list:
-        pk_list = get_pk_hint(store, role, 3)  # эталон/студент: PK по звёздочкам в заголовках
-    if pk_list:
-        _add_pk(store, role, pk_list)
+    with span("task5"):
+        pk_list = task5.extract_pk_ref(solution, dict_ref) if role == "ref" else task5.extract_pk_student(solution, dict_ref)
+        if not pk_list:
+            pk_list = get_pk_hint(store, role)  # эталон/студент: PK по звёздочкам в заголовках
+        if pk_list:
+            _add_pk(store, role, pk_list)
 
     # Task 6: partial FDs — ref derived from F+PK; stu extracted from task 6
-    if role == "ref" and F and pk_list:
-        P_ref = task6.compute_partial_ref(U, F, pk_list)
-        if P_ref:
-            _add_fds(store, role, 6, P_ref)
-    elif role == "stu":
-        P_stu = task6.extract_partial_student(solution, dict_ref)
-        if P_stu:
-            _add_fds(store, role, 6, P_stu)
+    with span("task6"):
+        if role == "ref" and F and pk_list:
+            P_ref = task6.compute_partial_ref(U, F, pk_list)
+            if P_ref:
+                _add_fds(store, role, 6, P_ref)
+        elif role == "stu":
+            P_stu = task6.extract_partial_student(solution, dict_ref)
+            if P_stu:
+                _add_fds(store, role, 6, P_stu)
 
     # Task 8: transitive FDs — ref derived; stu extracted from task 8
-    if role == "ref" and F:
-        T_ref = task8.compute_transitive_ref(U, F)
-        if T_ref:
-            _add_fds(store, role, 8, T_ref)
-    elif role == "stu":
-        T_stu = task8.extract_transitive_student(solution, dict_ref)
-        if T_stu:
-            _add_fds(store, role, 8, T_stu)
+    with span("task8"):
+        if role == "ref" and F:
+            T_ref = task8.compute_transitive_ref(U, F)
+            if T_ref:
+                _add_fds(store, role, 8, T_ref)
+        elif role == "stu":
+            T_stu = task8.extract_transitive_student(solution, dict_ref)
+            if T_stu:
+                _add_fds(store, role, 8, T_stu)
 
     # Tasks 7, 9: structure only (checks use task 6/8 results)
     for tn in [7, 9]:
@@ -160,8 +178,9 @@ def build_graph(
 
     # Tasks 11, 13: relations
     for task_num, module in [(11, task11), (13, task13)]:
-        rels = module.extract_relations(solution, task_num, dict_ref)
-        if rels:
-            _add_relations(store, role, task_num, rels)
+        with span(f"task{task_num}"):
+            rels = module.extract_relations(solution, task_num, dict_ref)
+            if rels:
+                _add_relations(store, role, task_num, rels)
 
     return store
@@ -15,6 +15,15 @@ def explain_missing_fd(lhs: list[str], rhs: str, closure_result: set[str]) -> st
     return f"'{','.join(lhs)}→{rhs}': {rhs} ∉ closure({{{','.join(lhs)}}}) = {{{', '.join(sorted(closure_result))}}}"
 
 
+def explain_fd_contradicts_data(lhs: list[str], rhs: str, pair: tuple[int, int]) -> str:
+    """X->A fails on the 1NF table: two rows agree on X, differ on A (pair is 0-based)."""
+    i, j = pair
+    return (
+        f"'{','.join(lhs)}→{rhs}' противоречит таблице 1НФ (задание №3): строки {i + 1} и {j + 1} "
+        f"совпадают по {{{', '.join(lhs)}}}, но различаются по {rhs}"
+    )
+
+
 def explain_partial_fd(X: list[str], rhs: str, pk: list[str]) -> str:
     """Partial FD: X ⊂ PK, A non-prime."""
     return f"Partial: {{{', '.join(X)}}} ⊂ PK, determines {rhs}."
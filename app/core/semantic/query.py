@@ -1,8 +1,10 @@
 """Simple queries over the graph."""
 from __future__ import annotations
 
-from typing import Optional
+from typing import Optional, Sequence
 
+from app.core.algos.partitions import PartitionIndex
+from app.core.excel.columnar import ColumnarTable
 from app.core.semantic.triples import TripleStore, Triple
 
 
@@ -17,16 +19,24 @@ def get_repeating_group(store: TripleStore, role: str) -> set[str]:
     return {t.o for t in triples if isinstance(t.o, str)}
 
 
-def get_table_1nf(store: TripleStore, role: str) -> Optional[tuple[list[str], list[list]]]:
-    """Get (canon_headers, rows) for task 3; None if not present."""
+def get_table_1nf(store: TripleStore, role: str) -> Optional[tuple[list[str], Sequence[Sequence[str]]]]:
+    """Get (canon_headers, rows) for task 3; None if not present. Rows: ColumnarTable (as parsed) or list of lists."""
     subj = get_task_subject(role, 3)
     h = store.find_one(s=subj, p="table_1nf_headers")
     r = store.find_one(s=subj, p="table_1nf_rows")
-    if h is not None and isinstance(h.o, list) and r is not None and isinstance(r.o, list):
-        return (list(h.o), list(r.o))
+    if h is not None and isinstance(h.o, list) and r is not None and isinstance(r.o, (list, ColumnarTable)):
+        return (list(h.o), r.o if isinstance(r.o, ColumnarTable) else list(r.o))
     return None
 
 
+def get_table_index(store: TripleStore, role: str) -> Optional[PartitionIndex]:
+    """Partitions / key scans over the task 3 table; None if there is no table or no rows."""
+    table = get_table_1nf(store, role)
+    if not table or not table[1]:
+        return None
+    return PartitionIndex(*table)
+
+
 def get_pk_hint(store: TripleStore, role: str) -> list[str]:
     """Get PK hint from task 3 (headers with *)."""
     subj = get_task_subject(role, 3)
@@ -5,3 +5,42 @@ KEYS_MAX_OPTIONAL = 25
 
 # Optional: timeout for keys search (future use)
 KEYS_TIMEOUT_SEC = 10.0
+
+# Batch grading: worker processes (None -> os.cpu_count())
+BATCH_MAX_WORKERS = None
+
+# FD discovery over the 1NF table (task 4 explanations): max LHS size and time budget per table
+DISCOVERY_MAX_LHS = 3
+DISCOVERY_TIME_BUDGET_SEC = 1.0
+# Max attribute sets (partitions) kept per lattice level — memory bound on wide tables
+DISCOVERY_MAX_LEVEL_SETS = 20000
+
+# Multi-sheet workbooks: processes for parsing sheets (None -> os.cpu_count()); with fewer
+# sheets than SHEETS_PARALLEL_MIN they are parsed in-process (process start costs more)
+SHEETS_MAX_WORKERS = None
+SHEETS_PARALLEL_MIN = 3
+
+# FD projection onto a relation (tasks 11, 13): subsets of R are enumerated, so R wider than
+# PROJECTION_MAX_ATTRS falls back to FDs of F inside R; time budget per relation
+PROJECTION_MAX_ATTRS = 16
+PROJECTION_TIME_BUDGET_SEC = 1.0
+
+# Similarity screening in batch grading (app.core.similarity): MinHash signature length, LSH
+# bands (k / bands rows each: candidates from J ≈ (1/bands)^(bands/k)), exact Jaccard threshold
+# for reported pairs, and works with fewer own (not in the reference) shingles are not indexed
+SIMILARITY_PERMUTATIONS = 128
+SIMILARITY_BANDS = 32
+SIMILARITY_THRESHOLD = 0.5
+SIMILARITY_MIN_SHINGLES = 5
+
+# Watch-folder daemon (python -m app.watch): folder poll interval, and a file is graded only
+# after its size and mtime stayed unchanged this long (a copy or save still in progress)
+WATCH_POLL_SEC = 2.0
+WATCH_SETTLE_SEC = 2.0
+
+# Local HTTP grading service (python -m app.service): worker processes (None -> os.cpu_count()),
+# uploads waiting for a worker (more -> 429), max upload size, finished results kept for GET
+SERVICE_MAX_WORKERS = None
+SERVICE_QUEUE_SIZE = 32
+SERVICE_MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+SERVICE_MAX_RESULTS = 1000
@@ -0,0 +1,171 @@
+"""
+Similarity screening across a batch: shingles, MinHash signatures, LSH candidates, exact Jaccard.
+
+Шинглы работы — её «собственные» элементы: канонические ФЗ №4, ФЗ №6/№8, строки
+таблицы 1НФ, ключ, схемы отношений №11/№13 (без имён), тройки слов текстов
+№10/№12 — за вычетом элементов эталона: совпадение правильных ответов
+списыванием не считается, общие ошибки и отсебятина — считаются. Каждый шингл —
+64-битный blake2b, он же служит случайной перестановкой.
+
+Сигнатура — MinHash одной перестановкой (one permutation hashing): хэш попадает в
+одну из k ячеек, в ячейке — минимум; пустая ячейка берёт значение непустой, найденной
+по общей для всех работ случайной последовательности ячеек (densification), так что
+P[sig_a[i] == sig_b[i]] ≈ J(a, b) за O(|шинглы|) на работу. LSH: сигнатура режется на полосы, работы с совпавшей
+полосой — кандидаты; точный коэффициент Жаккара считается только для них.
+"""
+import hashlib
+import random
+import re
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Hashable, Iterable, Optional
+
+from app.core.algos.canonical import fd_key, fd_set
+from app.core.semantic.query import get_fds, get_pk, get_relations, get_table_1nf, get_text
+from app.core.semantic.triples import TripleStore
+from app.core.settings import (
+    SIMILARITY_BANDS, SIMILARITY_MIN_SHINGLES, SIMILARITY_PERMUTATIONS, SIMILARITY_THRESHOLD,
+)
+from app.core.trace import count, span
+
+_WORD = re.compile(r"\w+")
+_EMPTY = 1 << 64  # больше любого значения ячейки: пустая ячейка сигнатуры
+_PROBES: dict[tuple[int, int], list[int]] = {}
+
+
+def _hash(s: str) -> int:
+    return int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _graph_shingles(graph: TripleStore, role: str) -> set[str]:
+    out: set[str] = set()
+    F = get_fds(graph, role, 4)
+    if F:
+        out.update(f"fd4:{','.join(lhs)}->{rhs}" for lhs, rhs in fd_set(F).canonical.fds)
+    for task in (6, 8):
+        keys = (fd_key(lhs, rhs) for lhs, rhs in get_fds(graph, role, task))
+        out.update(f"fd{task}:{','.join(lhs)}->{rhs}" for lhs, rhs in keys)
+    table = get_table_1nf(graph, role)
+    if table:
+        headers, rows = table
+        order = sorted(range(len(headers)), key=lambda c: headers[c])
+        out.update("row:" + "\x1f".join(f"{headers[c]}={row[c]}" for c in order if c < len(row)) for row in rows)
+    pk = get_pk(graph, role, 5)
+    if pk:
+        out.add("pk:" + ",".join(sorted(pk)))
+    for task in (11, 13):
+        out.update(f"rel{task}:" + ",".join(sorted(attrs)) for _, attrs in get_relations(graph, role, task))
+    for task in (10, 12):
+        words = _WORD.findall(get_text(graph, role, task).lower())
+        out.update(f"t{task}:" + " ".join(words[i:i + 3]) for i in range(max(0, len(words) - 2)))
+    return out
+
+
+def answer_shingles(stu_graph: TripleStore, ref_graph: Optional[TripleStore] = None) -> frozenset[int]:
+    """Хэши шинглов работы студента, которых нет в эталоне."""
+    own = _graph_shingles(stu_graph, "stu")
+    if ref_graph is not None:
+        own -= _graph_shingles(ref_graph, "ref")
+    return frozenset(_hash(s) for s in own)
+
+
+def _probes(k: int, i: int) -> list[int]:
+    """Фиксированная (одна на все работы) случайная последовательность ячеек для пустой ячейки i."""
+    seq = _PROBES.get((k, i))
+    if seq is None:
+        rng = random.Random(k * 1_000_003 + i)
+        seq = _PROBES[(k, i)] = [rng.randrange(k) for _ in range(4 * k)]
+    return seq
+
+
+def minhash(shingles: Iterable[int], k: int = SIMILARITY_PERMUTATIONS) -> tuple[int, ...]:
+    """Сигнатура из k значений; пустое множество — пустая сигнатура."""
+    sig = [_EMPTY] * k
+    for h in shingles:
+        b, v = h % k, h // k
+        if v < sig[b]:
+            sig[b] = v
+    if all(v == _EMPTY for v in sig):
+        return ()
+    out = list(sig)
+    for i, v in enumerate(sig):
+        if v != _EMPTY:
+            continue
+        # пустая ячейка берёт значение первой непустой по своей случайной последовательности ячеек;
+        # последовательность кончилась (очень разреженная сигнатура) — ближайшей непустой справа
+        j = next((j for j in _probes(k, i) if sig[j] != _EMPTY), None)
+        if j is None:
+            j = next(j % k for j in range(i + 1, i + k) if sig[j % k] != _EMPTY)
+        out[i] = sig[j] + (1 + j) * _EMPTY
+    return tuple(out)
+
+
+def jaccard(a: frozenset[int], b: frozenset[int]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass(frozen=True)
+class SimilarPair:
+    a: Hashable
+    b: Hashable
+    similarity: float  # точный коэффициент Жаккара по шинглам
+
+
+class SimilarityIndex:
+    """
+    LSH-индекс работ пакета: add() по мере готовности, pairs() — пары с J >= threshold.
+    Работы меньше чем из min_shingles собственных шинглов не индексируются: одна-две
+    общие ошибки встречаются и без списывания.
+    """
+
+    def __init__(
+        self,
+        k: int = SIMILARITY_PERMUTATIONS,
+        bands: int = SIMILARITY_BANDS,
+        min_shingles: int = SIMILARITY_MIN_SHINGLES,
+    ) -> None:
+        if k % bands:
+            raise ValueError(f"k={k} не делится на число полос {bands}")
+        self.k = k
+        self.bands = bands
+        self.rows = k // bands
+        self.min_shingles = min_shingles
+        self._shingles: dict[Hashable, frozenset[int]] = {}
+        self._buckets: dict[tuple[int, tuple[int, ...]], list[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._shingles)
+
+    def add(self, key: Hashable, shingles: frozenset[int]) -> bool:
+        """Добавить работу (ключ — один раз); False — слишком мало собственных шинглов, не индексируется."""
+        if len(shingles) < self.min_shingles:
+            return False
+        self._shingles[key] = shingles
+        sig = minhash(shingles, self.k)
+        r = self.rows
+        for band in range(self.bands):
+            self._buckets.setdefault((band, sig[band * r:(band + 1) * r]), []).append(key)
+        return True
+
+    def candidates(self) -> set[tuple[Hashable, Hashable]]:
+        """Пары работ, совпавшие хотя бы в одной полосе (в паре — в порядке добавления)."""
+        out: set[tuple[Hashable, Hashable]] = set()
+        for members in self._buckets.values():
+            if len(members) > 1:
+                out.update(combinations(members, 2))
+        return out
+
+    def pairs(self, threshold: float = SIMILARITY_THRESHOLD) -> list[SimilarPair]:
+        """Пары с точным J >= threshold, по убыванию сходства."""
+        with span("similarity_pairs", works=len(self._shingles)):
+            cands = self.candidates()
+            count("similarity_candidates", len(cands))
+            found = []
+            for a, b in cands:
+                j = jaccard(self._shingles[a], self._shingles[b])
+                if j >= threshold:
+                    found.append(SimilarPair(a, b, j))
+        order = {key: i for i, key in enumerate(self._shingles)}
+        return sorted(found, key=lambda p: (-p.similarity, order[p.a], order[p.b]))
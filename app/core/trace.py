@@ -0,0 +1,303 @@
+"""
+Lightweight tracing: nested timing spans, call counters, JSON tree / Chrome trace export.
+
+Выключено по умолчанию: span() возвращает общий no-op объект, count() — одна проверка.
+Включение:
+- DBNC_TRACE=1 — дерево времени каждой проверки печатается в stderr;
+- DBNC_TRACE=<папка> — в папку пишутся trace-<pid>-<n>.json (дерево) и .chrome.json
+  (chrome://tracing, Perfetto);
+- DBNC_PROFILE=cprofile | tracemalloc — дополнительно профиль cProfile (.prof + топ функций)
+  или прирост памяти по span'ам и топ строк с аллокациями.
+Программно: ``with collect("compare") as tr: ...; tr.to_dict()``.
+"""
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Optional
+
+TRACE_ENV = "DBNC_TRACE"
+PROFILE_ENV = "DBNC_PROFILE"
+PROFILE_TOP = 25  # строк в текстовом профиле
+
+_active: ContextVar[Optional["Trace"]] = ContextVar("dbnc_trace", default=None)
+_file_seq = itertools.count(1)
+
+
+class Span:
+    """Узел дерева: имя, время (ns от начала trace), атрибуты, счётчики вызовов, дети."""
+
+    __slots__ = ("name", "attrs", "start_ns", "end_ns", "counts", "children", "mem_delta", "_trace", "_mem0")
+
+    def __init__(self, trace: "Trace", name: str, attrs: dict[str, Any]) -> None:
+        self.name = name
+        self.attrs = attrs
+        self.start_ns = 0
+        self.end_ns = 0
+        self.counts: dict[str, int] = {}
+        self.children: list[Span] = []
+        self.mem_delta: Optional[int] = None
+        self._trace = trace
+        self._mem0 = 0
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def __enter__(self) -> "Span":
+        tr = self._trace
+        tr._stack[-1].children.append(self)
+        tr._stack.append(self)
+        if tr.track_memory:
+            import tracemalloc
+
+            self._mem0 = tracemalloc.get_traced_memory()[0]
+        self.start_ns = time.perf_counter_ns() - tr._t0
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        tr = self._trace
+        self.end_ns = time.perf_counter_ns() - tr._t0
+        if tr.track_memory:
+            import tracemalloc
+
+            self.mem_delta = tracemalloc.get_traced_memory()[0] - self._mem0
+        tr._stack.pop()
+
+    def to_dict(self) -> dict[str, Any]:
+        d: dict[str, Any] = {
+            "name": self.name,
+            "start_ms": round(self.start_ns / 1e6, 3),
+            "duration_ms": round(self.duration_ms, 3),
+        }
+        if self.attrs:
+            d["attrs"] = self.attrs
+        if self.counts:
+            d["counts"] = dict(self.counts)
+        if self.mem_delta is not None:
+            d["mem_delta"] = self.mem_delta
+        if self.children:
+            d["children"] = [c.to_dict() for c in self.children]
+        return d
+
+
+class _NullSpan:
+    """Заглушка при выключенной трассировке."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NULL = _NullSpan()
+
+
+class Trace:
+    """Один прогон (проверка одной работы): корневой span, стек открытых span'ов, итоговые счётчики."""
+
+    def __init__(self, name: str, track_memory: bool = False, **attrs: Any) -> None:
+        self._t0 = time.perf_counter_ns()
+        self.root = Span(self, name, attrs)
+        self._stack: list[Span] = [self.root]
+        self.counts: dict[str, int] = {}
+        self.track_memory = track_memory
+        self.profile = ""  # текстовый профиль (cProfile / tracemalloc), если включён
+        self.pid = os.getpid()
+        self.tid = threading.get_ident()
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counts[name] = self.counts.get(name, 0) + n
+        span_counts = self._stack[-1].counts
+        span_counts[name] = span_counts.get(name, 0) + n
+
+    def to_dict(self) -> dict[str, Any]:
+        d = self.root.to_dict()
+        d["totals"] = dict(self.counts)
+        if self.profile:
+            d["profile"] = self.profile
+        return d
+
+    def to_chrome(self) -> dict[str, Any]:
+        """Chrome Trace Event Format: complete events ("ph": "X"), время в микросекундах."""
+        events = []
+
+        def walk(s: Span) -> None:
+            args = dict(s.attrs)
+            args.update(s.counts)
+            if s.mem_delta is not None:
+                args["mem_delta"] = s.mem_delta
+            events.append(
+                {
+                    "name": s.name,
+                    "ph": "X",
+                    "ts": s.start_ns / 1e3,
+                    "dur": (s.end_ns - s.start_ns) / 1e3,
+                    "pid": self.pid,
+                    "tid": self.tid,
+                    "args": args,
+                }
+            )
+            for c in s.children:
+                walk(c)
+
+        walk(self.root)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def format_tree(self, min_ms: float = 0.0) -> str:
+        """Текстовое дерево: имя, мс, счётчики; span'ы короче min_ms не показываются."""
+        lines = []
+
+        def walk(s: Span, depth: int) -> None:
+            if depth and s.duration_ms < min_ms:
+                return
+            label = s.name + "".join(f" {k}={v}" for k, v in s.attrs.items())
+            counts = "".join(f"  {k}×{v}" for k, v in s.counts.items())
+            lines.append(f"{'  ' * depth}{label:<{max(1, 48 - 2 * depth)}} {s.duration_ms:10.2f} ms{counts}")
+            for c in s.children:
+                walk(c, depth + 1)
+
+        walk(self.root, 0)
+        if self.counts:
+            lines.append("totals: " + ", ".join(f"{k}={v}" for k, v in sorted(self.counts.items())))
+        return "\n".join(lines)
+
+
+def enabled() -> bool:
+    return _active.get() is not None
+
+
+def current() -> Optional[Trace]:
+    return _active.get()
+
+
+def span(name: str, **attrs: Any) -> Any:
+    """Вложенный span текущего trace; без trace — no-op (один ContextVar.get)."""
+    tr = _active.get()
+    if tr is None:
+        return _NULL
+    return Span(tr, name, attrs)
+
+
+def count(name: str, n: int = 1) -> None:
+    """Счётчик вызовов (closure, candidate_keys ...) в текущем span и в итогах trace."""
+    tr = _active.get()
+    if tr is not None:
+        tr.count(name, n)
+
+
+def collect(name: str, force: bool = False, **attrs: Any) -> "_Collector":
+    """
+    Начать trace (если ещё не начат) или вложенный span (если trace уже идёт).
+    force=False: trace включается только переменной окружения DBNC_TRACE;
+    по выходу результат пишется туда, куда она указывает. В with ... as tr
+    приходит Trace или None (трассировка выключена).
+    """
+    return _Collector(name, force, attrs)
+
+
+class _Collector:
+    """Контекст collect(): свой trace, вложенный span или ничего."""
+
+    def __init__(self, name: str, force: bool, attrs: dict[str, Any]) -> None:
+        self.name = name
+        self.attrs = attrs
+        self.force = force
+        self.trace: Optional[Trace] = None
+        self._span: Any = _NULL
+        self._token = None
+        self._profiler: Any = None
+        self._own_tracemalloc = False
+
+    def __enter__(self) -> Optional[Trace]:
+        outer = _active.get()
+        if outer is not None:
+            self._span = Span(outer, self.name, self.attrs).__enter__()
+            return outer
+        if not (self.force or os.environ.get(TRACE_ENV)):
+            return None
+        mode = os.environ.get(PROFILE_ENV, "").strip().lower()
+        track_memory = mode == "tracemalloc"
+        if track_memory:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._own_tracemalloc = True
+        self.trace = Trace(self.name, track_memory=track_memory, **self.attrs)
+        self._token = _active.set(self.trace)
+        if mode == "cprofile":
+            import cProfile
+
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self.trace
+
+    def __exit__(self, *exc: Any) -> None:
+        if self.trace is None:
+            self._span.__exit__(*exc)
+            return
+        tr = self.trace
+        tr.root.end_ns = time.perf_counter_ns() - tr._t0
+        if self._profiler is not None:
+            self._profiler.disable()
+            tr.profile = _cprofile_text(self._profiler)
+        if tr.track_memory:
+            tr.profile = _tracemalloc_text(stop=self._own_tracemalloc)
+        _active.reset(self._token)
+        if not self.force:
+            _emit(tr, self._profiler)
+
+
+def _cprofile_text(profiler: Any) -> str:
+    import io
+    import pstats
+
+    buf = io.StringIO()
+    pstats.Stats(profiler, stream=buf).sort_stats("cumulative").print_stats(PROFILE_TOP)
+    return buf.getvalue()
+
+
+def _tracemalloc_text(stop: bool) -> str:
+    import tracemalloc
+
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    if stop:
+        tracemalloc.stop()
+    lines = [f"peak: {peak / 1024:.1f} KiB"]
+    for stat in snapshot.statistics("lineno")[:PROFILE_TOP]:
+        lines.append(str(stat))
+    return "\n".join(lines)
+
+
+def _emit(tr: Trace, profiler: Any) -> None:
+    """Вывод по DBNC_TRACE: «1» — stderr, иначе папка для JSON/Chrome/.prof."""
+    target = os.environ.get(TRACE_ENV, "").strip()
+    if target.lower() in ("1", "true", "yes", "stderr"):
+        print(tr.format_tree(), file=sys.stderr)
+        if tr.profile:
+            print(tr.profile, file=sys.stderr)
+        return
+    out_dir = Path(target)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stem = out_dir / f"trace-{tr.pid}-{next(_file_seq)}"
+    write_json(tr, stem.with_suffix(".json"))
+    write_chrome(tr, stem.with_suffix(".chrome.json"))
+    if profiler is not None:
+        profiler.dump_stats(str(stem.with_suffix(".prof")))
+
+
+def write_json(tr: Trace, path: Path) -> None:
+    Path(path).write_text(json.dumps(tr.to_dict(), ensure_ascii=False, indent=1, default=str), encoding="utf-8")
+
+
+def write_chrome(tr: Trace, path: Path) -> None:
+    Path(path).write_text(json.dumps(tr.to_chrome(), ensure_ascii=False, default=str), encoding="utf-8")
@@ -0,0 +1,118 @@
+"""
+Reference variants: one workbook, one sheet per variant, picked by the task 1 fingerprint.
+
+Отпечаток варианта — SHA256 отсортированных канонических атрибутов задания №1.
+Индекс «отпечаток -> лист» строится один раз при загрузке эталона; выбор варианта
+для работы студента — поиск в словаре. Нет совпадения — активный лист эталона
+(в отчёте останется предупреждение о несовпадении отпечатков). Папка эталонов —
+библиотека (app.core.library): тот же выбор по отпечатку, но через индекс SQLite.
+"""
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Protocol, Union
+
+from app.core.checks import task1
+from app.core.checks.common import canon_attr_for_compare
+from app.core.excel.importer import ParsedSolution, parse_workbook_sheets
+from app.core.settings import SHEETS_MAX_WORKERS
+
+if TYPE_CHECKING:
+    from app.core.library import ReferenceLibrary
+
+
+def fingerprint(attrs_canon: list[str]) -> str:
+    """SHA256 of sorted canonical attributes (task 1 ref)."""
+    return hashlib.sha256("|".join(sorted(attrs_canon)).encode()).hexdigest()
+
+
+def solution_attrs(parsed: ParsedSolution) -> list[str]:
+    """Канонические атрибуты задания №1 разобранного листа."""
+    return [canon_attr_for_compare(a) for a in task1.extract_headers_ref(parsed)]
+
+
+def solution_fingerprint(parsed: ParsedSolution) -> str:
+    """Отпечаток задания №1 разобранного листа; "" — если заголовков нет."""
+    attrs = solution_attrs(parsed)
+    return fingerprint(attrs) if attrs else ""
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+@dataclass(frozen=True)
+class VariantMatch:
+    """Выбранный вариант эталона: лист, файл, сходство набора атрибутов задания №1 (1.0 — тот же отпечаток)."""
+    parsed: ParsedSolution
+    path: str
+    similarity: float
+
+
+class VariantSource(Protocol):
+    """Откуда берутся варианты: листы одной книги (VariantIndex) или библиотека эталонов."""
+
+    def __len__(self) -> int: ...
+
+    @property
+    def default(self) -> ParsedSolution: ...
+
+    def match(self, stu: ParsedSolution) -> VariantMatch: ...
+
+    def by_name(self, sheet_name: str, path: str = "") -> Optional[ParsedSolution]: ...
+
+
+class VariantIndex:
+    """Листы эталона (активный — первым) и словарь «отпечаток задания №1 -> лист»."""
+
+    def __init__(self, sheets: list[ParsedSolution], path: str = "") -> None:
+        self.sheets = sheets or [ParsedSolution()]
+        self.path = path
+        self._by_fp: dict[str, ParsedSolution] = {}
+        for s in self.sheets:
+            fp = solution_fingerprint(s)
+            if fp:
+                self._by_fp.setdefault(fp, s)  # одинаковые листы — первый по порядку
+
+    def __len__(self) -> int:
+        return len(self.sheets)
+
+    @property
+    def default(self) -> ParsedSolution:
+        return self.sheets[0]
+
+    def get(self, fp: str) -> Optional[ParsedSolution]:
+        return self._by_fp.get(fp)
+
+    def by_name(self, sheet_name: str, path: str = "") -> Optional[ParsedSolution]:
+        return next((s for s in self.sheets if s.sheet_name == sheet_name), None)
+
+    def select(self, stu: ParsedSolution) -> ParsedSolution:
+        """Вариант с тем же отпечатком задания №1, что у студента, иначе ближайший по атрибутам."""
+        return self.match(stu).parsed
+
+    def match(self, stu: ParsedSolution) -> VariantMatch:
+        """Лист с отпечатком студента, иначе ближайший по Жаккару (при равенстве — первый, активный)."""
+        found = self._by_fp.get(solution_fingerprint(stu))
+        if found is not None:
+            return VariantMatch(found, self.path, 1.0)
+        stu_attrs = set(solution_attrs(stu))
+        best, best_sim = self.default, -1.0
+        for s in self.sheets:
+            sim = jaccard(set(solution_attrs(s)), stu_attrs)
+            if sim > best_sim:
+                best, best_sim = s, sim
+        return VariantMatch(best, self.path, best_sim)
+
+
+def load_reference(
+    path: Union[str, Path], max_workers: Optional[int] = SHEETS_MAX_WORKERS
+) -> Union[VariantIndex, "ReferenceLibrary"]:
+    """Книга эталона (варианты — листы) или папка эталонов (библиотека, индекс обновляется)."""
+    if Path(path).is_dir():
+        from app.core.library import ReferenceLibrary
+
+        library = ReferenceLibrary(path)
+        library.sync()
+        return library
+    return VariantIndex(parse_workbook_sheets(path, max_workers=max_workers), str(path))
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 """Entry point for the DB Normalization Checker desktop app."""
+import multiprocessing
 import sys
 from pathlib import Path
 
@@ -9,11 +10,14 @@ if __name__ == "__main__":
     if str(root) not in sys.path:
         sys.path.insert(0, str(root))
 
-from PySide6.QtWidgets import QApplication
-from app.ui.main_window import MainWindow
-
 
 def main() -> None:
+    # Qt импортируется только здесь: процессы пула пакетной проверки (spawn) заново
+    # исполняют этот модуль и не должны платить за загрузку PySide6.
+    from PySide6.QtWidgets import QApplication
+
+    from app.ui.main_window import MainWindow
+
     app = QApplication(sys.argv)
     app.setApplicationName("DB Normalization Checker")
     window = MainWindow()
@@ -22,4 +26,6 @@ def main() -> None:
 
 
 if __name__ == "__main__":
+    # Пул пакетной проверки в собранном PyInstaller-приложении
+    multiprocessing.freeze_support()
     main()
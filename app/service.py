@@ -0,0 +1,365 @@
+"""
+Local HTTP grading service: references parsed once, a warm process pool, a bounded queue.
+
+Стенд для интеграции с LMS. Эталоны разбираются при запуске (app.core.variants /
+папка эталонов — app.core.library) и один раз передаются в каждый процесс пула;
+процессы запускаются сразу, так что время ответа — разбор книги студента и
+проверки, без запуска Python и разбора эталона. Принятые работы ждут в очереди
+из SERVICE_QUEUE_SIZE мест; очередь заполнена — 429 с Retry-After, клиент
+повторяет позже. Сервер — asyncio из stdlib (HTTP/1.1, соединение на запрос).
+
+    POST /grade?ref=<id>[&name=<файл>]   тело — книга .xlsx, или multipart/form-data
+                                         с полями ref и file -> 202 {"id", "status"}
+    GET  /results/<id>                   -> {"id", "status": queued|running|done|error, "result"?}
+    GET  /references                     -> {"references": [id, ...]}
+
+Идентификатор эталона — имя файла (папки) без расширения.
+CLI: ``python -m app.service <эталон> [<эталон> ...] [--host 127.0.0.1] [--port 8765]``.
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from email import policy
+from email.errors import MessageError
+from email.parser import BytesParser
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Optional, Union
+from urllib.parse import parse_qs, urlsplit
+
+from app.core.batch import EXCEL_SUFFIXES
+from app.core.compare import compare_variants
+from app.core.dedup import TaskResultCache
+from app.core.excel.importer import parse_workbook
+from app.core.report import build_html_report
+from app.core.settings import (
+    SERVICE_MAX_RESULTS, SERVICE_MAX_UPLOAD_BYTES, SERVICE_MAX_WORKERS, SERVICE_QUEUE_SIZE,
+)
+from app.core.trace import count
+from app.core.variants import VariantSource, load_reference
+
+DEFAULT_PORT = 8765
+
+# Эталоны сервиса (id -> варианты, путь), переданные в процесс пула через initializer
+_worker_refs: dict[str, tuple[VariantSource, str]] = {}
+_worker_cache: Optional[TaskResultCache] = None
+
+
+def _init_worker(refs: dict[str, tuple[VariantSource, str]]) -> None:
+    global _worker_refs, _worker_cache
+    _worker_refs = refs
+    _worker_cache = TaskResultCache()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _plain(v: Any) -> Any:
+    """Значение результата проверки -> JSON (ФЗ — списки, множества — отсортированные списки)."""
+    if v is None or isinstance(v, (str, int, float, bool)):
+        return v
+    if isinstance(v, dict):
+        return {str(k): _plain(x) for k, x in v.items()}
+    if isinstance(v, (set, frozenset)):
+        return [_plain(x) for x in sorted(v, key=str)]
+    if isinstance(v, (list, tuple)):
+        return [_plain(x) for x in v]
+    return str(v)
+
+
+def _upload_name(name: str) -> str:
+    name = Path(name or "").name or "upload.xlsx"
+    return name if name.lower().endswith(EXCEL_SUFFIXES) else name + ".xlsx"
+
+
+def _grade_upload(ref_id: str, name: str, data: bytes) -> dict[str, Any]:
+    """В процессе пула: разобрать загруженную книгу и проверить. Не бросает: ошибка — {"error"}."""
+    variants, ref_path = _worker_refs[ref_id]
+    started = time.perf_counter()
+    try:
+        with tempfile.TemporaryDirectory(prefix="dbnc-") as tmp:
+            path = Path(tmp) / name
+            path.write_bytes(data)
+            stu = parse_workbook(path)
+        result = compare_variants(variants, stu, ref_path, name, cache=_worker_cache)
+        report_html = build_html_report(result)
+    except Exception as e:  # битая книга — ошибка этой работы, не сервиса
+        return {"error": f"{e!s}"}
+    return {
+        "ref": ref_id,
+        "ref_file": Path(result["ref_path"]).name,
+        "ref_sheet": result["ref_sheet"],
+        "fingerprint_match": result["fingerprint_match"],
+        "fingerprint_warn": result["fingerprint_warn"],
+        "score_4": result["score_4"],
+        "tasks": {
+            str(num): {
+                "status": r.status,
+                "missing": _plain(r.missing),
+                "extra": _plain(r.extra),
+                "explanation": r.explanation,
+            }
+            for num, r in sorted(result["task_results"].items())
+        },
+        "report_html": report_html,
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+
+
+@dataclass
+class Job:
+    id: str
+    ref: str
+    name: str
+    data: bytes = field(repr=False)
+    status: str = "queued"  # queued, running, done, error
+    result: Optional[dict[str, Any]] = None
+    error: str = ""
+
+    def to_dict(self) -> dict[str, Any]:
+        out: dict[str, Any] = {"id": self.id, "ref": self.ref, "name": self.name, "status": self.status}
+        if self.result is not None:
+            out["result"] = self.result
+        if self.error:
+            out["error"] = self.error
+        return out
+
+
+class ServiceError(Exception):
+    """Ответ с кодом ошибки HTTP."""
+
+    def __init__(self, status: int, message: str, headers: Optional[dict[str, str]] = None) -> None:
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class GradingService:
+    """
+    Эталоны разбираются в конструкторе; start() поднимает пул (все процессы сразу,
+    с эталонами), обработчики очереди (по одному на процесс) и HTTP-сервер.
+    Готовые результаты хранятся в памяти, последние max_results.
+    """
+
+    def __init__(
+        self,
+        references: dict[str, Union[str, Path]],
+        max_workers: Optional[int] = SERVICE_MAX_WORKERS,
+        queue_size: int = SERVICE_QUEUE_SIZE,
+        max_results: int = SERVICE_MAX_RESULTS,
+        max_upload: int = SERVICE_MAX_UPLOAD_BYTES,
+    ) -> None:
+        self.references = {rid: (load_reference(p), str(p)) for rid, p in references.items()}
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.max_results = max_results
+        self.max_upload = max_upload
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._finished: list[str] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._dispatchers: list[asyncio.Task] = []
+        self._server: Optional[asyncio.Server] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> asyncio.Server:
+        loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(self.queue_size)
+        self._pool = self._new_pool()
+        # прогрев: процессы запускаются и получают эталоны до первой работы
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _ping) for _ in range(self.max_workers)))
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.max_workers)]
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._dispatchers = []
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker, initargs=(self.references,))
+
+    def submit(self, ref_id: str, name: str, data: bytes) -> Job:
+        """Поставить работу в очередь; очередь заполнена — ServiceError 429."""
+        assert self._queue is not None, "service not started"
+        if ref_id not in self.references:
+            raise ServiceError(404, f"Нет эталона {ref_id!r}")
+        if not data:
+            raise ServiceError(400, "Пустая книга")
+        job = Job(uuid.uuid4().hex, ref_id, _upload_name(name), data)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            count("service_rejected")
+            raise ServiceError(429, "Очередь заполнена, повторите позже", {"Retry-After": "1"}) from None
+        self.jobs[job.id] = job
+        return job
+
+    async def _dispatch(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            pool = self._pool
+            try:
+                result = await loop.run_in_executor(pool, _grade_upload, job.ref, job.name, job.data)
+            except BrokenProcessPool as e:
+                # процесс пула убит (OOM, сигнал): пул больше не принимает работ — новый, с теми же эталонами
+                result = {"error": f"Процесс проверки завершился аварийно: {e!s}"}
+                if pool is self._pool:
+                    count("service_pool_restart")
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    self._pool = self._new_pool()
+            except Exception as e:
+                result = {"error": f"{e!s}"}
+            job.data = b""
+            if "error" in result:
+                job.status, job.error = "error", result["error"]
+            else:
+                job.status, job.result = "done", result
+            self._finish(job.id)
+            self._queue.task_done()
+
+    def _finish(self, job_id: str) -> None:
+        self._finished.append(job_id)
+        while len(self._finished) > self.max_results:
+            self.jobs.pop(self._finished.pop(0), None)
+
+    def route(self, method: str, target: str, headers: dict[str, str], body: bytes) -> tuple[int, dict[str, Any]]:
+        """Ответ (код, JSON) на разобранный запрос."""
+        url = urlsplit(target)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path == "/grade":
+            if method != "POST":
+                raise ServiceError(405, "Нужен POST")
+            ref_id, name, data = query.get("ref", ""), query.get("name", ""), body
+            ctype = headers.get("content-type", "")
+            if ctype.startswith("multipart/form-data"):
+                ref_id, name, data = _parse_multipart(ctype, body, ref_id)
+            job = self.submit(ref_id, name, data)
+            return 202, {"id": job.id, "status": job.status}
+        if method != "GET":
+            raise ServiceError(405, "Нужен GET")
+        if url.path.startswith("/results/"):
+            job = self.jobs.get(url.path[len("/results/"):])
+            if job is None:
+                raise ServiceError(404, "Нет такой проверки")
+            return 200, job.to_dict()
+        if url.path == "/references":
+            return 200, {"references": sorted(self.references)}
+        raise ServiceError(404, f"Нет пути {url.path}")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        extra: dict[str, str] = {}
+        try:
+            method, target, headers = await _read_head(reader)
+            length = int(headers.get("content-length", "0") or 0)
+            if length > self.max_upload:
+                raise ServiceError(413, f"Книга больше {self.max_upload} байт")
+            body = await reader.readexactly(length) if length else b""
+            status, payload = self.route(method, target, headers, body)
+        except ServiceError as e:
+            status, payload, extra = e.status, {"error": str(e)}, e.headers
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            status, payload = 400, {"error": f"Некорректный запрос: {e!s}"}
+        except Exception as e:  # ответ клиенту есть всегда, соединение не обрывается молча
+            count("service_internal_error")
+            status, payload = 500, {"error": f"Внутренняя ошибка: {e!s}"}
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}", "Content-Type: application/json; charset=utf-8",
+                f"Content-Length: {len(data)}", "Connection: close"]
+        head += [f"{k}: {v}" for k, v in extra.items()]
+        try:
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+async def _read_head(reader: asyncio.StreamReader) -> tuple[str, str, dict[str, str]]:
+    parts = (await reader.readline()).decode("latin-1").split()
+    if len(parts) != 3:
+        raise ValueError("строка запроса")
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        k, _, v = line.partition(":")
+        headers[k.strip().lower()] = v.strip()
+    return parts[0].upper(), parts[1], headers
+
+
+def _parse_multipart(ctype: str, body: bytes, ref_id: str) -> tuple[str, str, bytes]:
+    """(ref, имя файла, книга) из multipart/form-data с полями ref и file; ошибка разбора — ValueError."""
+    msg = BytesParser(policy=policy.HTTP).parsebytes(b"Content-Type: " + ctype.encode("latin-1") + b"\r\n\r\n" + body)
+    name, data = "", b""
+    try:
+        for part in msg.iter_parts():
+            field_name = part.get_param("name", header="content-disposition")
+            if field_name == "ref":
+                ref_id = part.get_content().strip()
+            elif field_name == "file":
+                name, data = part.get_filename() or "", part.get_payload(decode=True) or b""
+    except (LookupError, TypeError, AttributeError, MessageError) as e:  # неизвестная кодировка, битые заголовки
+        raise ValueError(f"multipart: {e!s}") from e
+    return ref_id, name, data
+
+
+async def _serve(service: GradingService, host: str, port: int) -> None:
+    server = await service.start(host, port)
+    print(f"Сервис проверки: http://{host}:{port} (эталоны: {', '.join(sorted(service.references))})")
+    try:
+        await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Запустить сервис с эталонами из командной строки."""
+    args = list(sys.argv[1:] if argv is None else argv)
+    options = {"--host": "127.0.0.1", "--port": str(DEFAULT_PORT)}
+    refs: dict[str, Path] = {}
+    while args:
+        a = args.pop(0)
+        if a in options and args:
+            options[a] = args.pop(0)
+            continue
+        p = Path(a)
+        if p.stem in refs:
+            print(f"Два эталона с идентификатором {p.stem!r}", file=sys.stderr)
+            return 2
+        refs[p.stem] = p
+    if not refs:
+        print("usage: python -m app.service <reference> [<reference> ...] [--host H] [--port N]", file=sys.stderr)
+        return 2
+    try:
+        asyncio.run(_serve(GradingService(refs), options["--host"], int(options["--port"])))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    # Пул процессов в собранном PyInstaller-приложении
+    multiprocessing.freeze_support()
+    sys.exit(main())
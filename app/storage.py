@@ -6,27 +6,56 @@ from typing import Any, Optional
 _DB_PATH = Path.home() / ".db_norm_checker" / "projects.db"
 
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ref_path TEXT,
+    stu_path TEXT,
+    fingerprint_ref TEXT,
+    fingerprint_stu TEXT,
+    fingerprint_match INTEGER,
+    score_4 TEXT,
+    report_html TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    ref_sha256 TEXT,
+    stu_sha256 TEXT,
+    duplicate_of TEXT
+);
+CREATE TABLE IF NOT EXISTS similarity (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ref_path TEXT,
+    stu_path_a TEXT,
+    stu_path_b TEXT,
+    similarity REAL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+"""
+# Колонки, добавленные после первой версии: в существующую базу — ALTER TABLE
+_ADDED_COLUMNS = {"sessions": [("ref_sha256", "TEXT"), ("stu_sha256", "TEXT"), ("duplicate_of", "TEXT")]}
+_INDEXES = "CREATE INDEX IF NOT EXISTS sessions_sha256 ON sessions(stu_sha256, ref_sha256);"
+
+_ensured: Optional[Path] = None
+
+
 def _ensure_db() -> None:
+    """Создать базу и недостающие таблицы (в том числе в базе прежней версии) — раз на процесс."""
+    global _ensured
+    if _ensured == _DB_PATH:
+        return
     _DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    if not _DB_PATH.exists():
-        conn = sqlite3.connect(str(_DB_PATH))
-        try:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS sessions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    ref_path TEXT,
-                    stu_path TEXT,
-                    fingerprint_ref TEXT,
-                    fingerprint_stu TEXT,
-                    fingerprint_match INTEGER,
-                    score_4 TEXT,
-                    report_html TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            conn.commit()
-        finally:
-            conn.close()
+    conn = sqlite3.connect(str(_DB_PATH))
+    try:
+        conn.executescript(_SCHEMA)
+        for table, columns in _ADDED_COLUMNS.items():
+            have = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            for name, decl in columns:
+                if name not in have:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+        conn.executescript(_INDEXES)
+        conn.commit()
+    finally:
+        conn.close()
+    _ensured = _DB_PATH
 
 
 def save_session(
@@ -37,15 +66,19 @@ def save_session(
     fingerprint_match: bool,
     score_4: str,
     report_html: str,
+    ref_sha256: str = "",
+    stu_sha256: str = "",
+    duplicate_of: str = "",
 ) -> int:
     _ensure_db()
     conn = sqlite3.connect(str(_DB_PATH))
     try:
         cur = conn.execute(
             """INSERT INTO sessions (ref_path, stu_path, fingerprint_ref, fingerprint_stu,
-               fingerprint_match, score_4, report_html)
-               VALUES (?, ?, ?, ?, ?, ?, ?)""",
-            (ref_path, stu_path, fingerprint_ref, fingerprint_stu, 1 if fingerprint_match else 0, score_4, report_html),
+               fingerprint_match, score_4, report_html, ref_sha256, stu_sha256, duplicate_of)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (ref_path, stu_path, fingerprint_ref, fingerprint_stu, 1 if fingerprint_match else 0, score_4, report_html,
+             ref_sha256, stu_sha256, duplicate_of),
         )
         conn.commit()
         return cur.lastrowid or 0
@@ -53,6 +86,25 @@ def save_session(
         conn.close()
 
 
+def find_result(ref_sha256: str, stu_sha256: str, stu_path: str = "") -> Optional[dict[str, Any]]:
+    """
+    Сохранённый результат для файла студента с этим содержимым против этого эталона:
+    сессия того же файла (stu_path), если есть, иначе первая не помеченная как копия; нет — None.
+    """
+    _ensure_db()
+    conn = sqlite3.connect(str(_DB_PATH))
+    try:
+        conn.row_factory = sqlite3.Row
+        row = conn.execute(
+            """SELECT * FROM sessions WHERE stu_sha256 = ? AND ref_sha256 = ?
+               ORDER BY stu_path = ? DESC, COALESCE(duplicate_of, '') = '' DESC, id LIMIT 1""",
+            (stu_sha256, ref_sha256, stu_path),
+        ).fetchone()
+        return dict(row) if row else None
+    finally:
+        conn.close()
+
+
 def list_sessions(limit: int = 50) -> list[dict[str, Any]]:
     _ensure_db()
     conn = sqlite3.connect(str(_DB_PATH))
@@ -76,3 +128,33 @@ def get_session(session_id: int) -> Optional[dict[str, Any]]:
         return dict(row) if row else None
     finally:
         conn.close()
+
+
+def save_similarity(ref_path: str, pairs: list[tuple[str, str, float]]) -> int:
+    """Пары похожих работ пакетной проверки: (файл A, файл B, коэффициент Жаккара)."""
+    _ensure_db()
+    conn = sqlite3.connect(str(_DB_PATH))
+    try:
+        conn.executemany(
+            "INSERT INTO similarity (ref_path, stu_path_a, stu_path_b, similarity) VALUES (?, ?, ?, ?)",
+            [(ref_path, a, b, sim) for a, b, sim in pairs],
+        )
+        conn.commit()
+        return len(pairs)
+    finally:
+        conn.close()
+
+
+def list_similarity(limit: int = 200) -> list[dict[str, Any]]:
+    _ensure_db()
+    conn = sqlite3.connect(str(_DB_PATH))
+    try:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            "SELECT id, ref_path, stu_path_a, stu_path_b, similarity, created_at FROM similarity "
+            "ORDER BY id DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        conn.close()
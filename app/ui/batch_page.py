@@ -0,0 +1,367 @@
+"""Page: batch queue — one reference, a folder of student files, graded in a worker pool."""
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, QThread, Signal
+from PySide6.QtGui import QBrush, QColor
+from PySide6.QtWidgets import (
+    QFileDialog,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QPushButton,
+    QTableView,
+    QVBoxLayout,
+    QWidget,
+)
+
+STATUS_QUEUED = "В очереди"
+STATUS_RUNNING = "Проверяется"
+STATUS_DONE = "Готово"
+STATUS_ERROR = "Ошибка"
+
+_STATUS_COLORS = {
+    STATUS_DONE: QColor("#0a0"),
+    STATUS_ERROR: QColor("#c00"),
+    STATUS_RUNNING: QColor("#c60"),
+}
+
+
+@dataclass
+class BatchRow:
+    """Одна строка очереди: файл студента и результат проверки (когда готов)."""
+    path: Path
+    status: str = STATUS_QUEUED
+    result: Optional[dict[str, Any]] = field(default=None, repr=False)
+
+
+class BatchTableModel(QAbstractTableModel):
+    """Таблица очереди; QTableView запрашивает только видимые ячейки."""
+
+    COLUMNS = ["Файл", "Статус", "Оценка №4", "Зачтено", "Вариант", "Совпадает с"]
+
+    def __init__(self, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self._rows: list[BatchRow] = []
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: N802 (Qt API)
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: N802 (Qt API)
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole) -> Any:  # noqa: N802
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        col = index.column()
+        if role == Qt.DisplayRole:
+            return self._same_work(index.row()) if col == 5 else self._display(row, col)
+        if role == Qt.ForegroundRole and col == 1 and row.status in _STATUS_COLORS:
+            return QBrush(_STATUS_COLORS[row.status])
+        if role == Qt.ToolTipRole:
+            if row.result and row.result.get("error"):
+                return row.result["error"]
+            return str(row.path)
+        return None
+
+    @staticmethod
+    def _display(row: BatchRow, col: int) -> str:
+        if col == 0:
+            return row.path.name
+        if col == 1:
+            return row.status
+        res = row.result
+        if not res or res.get("error"):
+            return ""
+        if col == 2:
+            return str(res.get("score_4", ""))
+        if col == 3:
+            task_results = res.get("task_results", {})
+            passed = sum(1 for r in task_results.values() if r.status == "PASS")
+            return f"{passed}/13"
+        if col == 4:
+            return "да" if res.get("fingerprint_match") else "нет"
+        return ""
+
+    def _same_work(self, i: int) -> str:
+        """Другие файлы очереди с теми же ответами на все задания (отпечаток из app.core.dedup)."""
+        res = self._rows[i].result
+        digest = res.get("answer_digest") if res else ""
+        if not digest:
+            return ""
+        return ", ".join(
+            r.path.name for j, r in enumerate(self._rows)
+            if j != i and r.result and r.result.get("answer_digest") == digest
+        )
+
+    def set_files(self, paths: list[Path]) -> None:
+        self.beginResetModel()
+        self._rows = [BatchRow(path=p) for p in paths]
+        self.endResetModel()
+
+    def set_status(self, row: int, status: str) -> None:
+        self._rows[row].status = status
+        self._emit_row_changed(row)
+
+    def set_result(self, row: int, result: dict[str, Any]) -> None:
+        self._rows[row].result = result
+        self._rows[row].status = STATUS_ERROR if result.get("error") else STATUS_DONE
+        self._emit_row_changed(row)
+        if result.get("answer_digest"):  # у совпавших с ней работ меняется «Совпадает с»
+            last = len(self.COLUMNS) - 1
+            self.dataChanged.emit(self.index(0, last), self.index(len(self._rows) - 1, last))
+
+    def mark_all(self, status: str) -> None:
+        if not self._rows:
+            return
+        for r in self._rows:
+            r.status = status
+        self.dataChanged.emit(self.index(0, 0), self.index(len(self._rows) - 1, len(self.COLUMNS) - 1))
+
+    def _emit_row_changed(self, row: int) -> None:
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.COLUMNS) - 1))
+
+    def result_at(self, row: int) -> Optional[dict[str, Any]]:
+        return self._rows[row].result if 0 <= row < len(self._rows) else None
+
+    def paths(self) -> list[Path]:
+        return [r.path for r in self._rows]
+
+    def done_count(self) -> int:
+        return sum(1 for r in self._rows if r.status in (STATUS_DONE, STATUS_ERROR))
+
+
+class _BatchThread(QThread):
+    """Гоняет BatchGrader вне GUI-потока; результаты приходят сигналом по мере готовности."""
+
+    result_ready = Signal(int, object)
+    similar_ready = Signal(object)  # [(файл A, файл B, сходство)] — после проверки всей очереди
+    failed = Signal(str)
+
+    def __init__(self, ref_path: str, paths: list[Path], parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self._ref_path = ref_path
+        self._paths = paths
+
+    def run(self) -> None:
+        from app.core.batch import BatchGrader
+
+        try:
+            grader = BatchGrader(self._ref_path)
+        except Exception as e:
+            self.failed.emit(f"Не удалось разобрать эталон:\n{e!s}")
+            return
+        results = grader.grade(self._paths)
+        try:
+            for i, result in results:
+                self.result_ready.emit(i, result)
+                if self.isInterruptionRequested():
+                    return
+        finally:
+            results.close()
+        self.similar_ready.emit([(str(self._paths[p.a]), str(self._paths[p.b]), p.similarity) for p in grader.similar])
+
+
+class BatchPage(QWidget):
+    back_requested = Signal()
+    open_report = Signal(object)  # compare() result dict
+
+    def __init__(self, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self.setAcceptDrops(True)
+        self._ref_path = ""
+        self._run_ref_path = ""  # эталон идущей проверки: пары похожих работ сохраняются под ним
+        self._thread: Optional[_BatchThread] = None
+        layout = QVBoxLayout(self)
+
+        row1 = QHBoxLayout()
+        self._ref_label = QLabel("Эталон (reference.xlsx): не выбран")
+        self._ref_btn = QPushButton("Выбрать эталон")
+        self._ref_btn.clicked.connect(self._on_select_ref)
+        self._lib_btn = QPushButton("Папка эталонов")
+        self._lib_btn.setToolTip("Все эталоны курса: вариант для каждой работы выбирается по заданию №1")
+        self._lib_btn.clicked.connect(self._on_select_library)
+        row1.addWidget(self._ref_label)
+        row1.addWidget(self._ref_btn)
+        row1.addWidget(self._lib_btn)
+        layout.addLayout(row1)
+
+        row2 = QHBoxLayout()
+        self._folder_label = QLabel("Перетащите сюда папку с работами студентов или выберите её.")
+        self._folder_label.setWordWrap(True)
+        self._folder_btn = QPushButton("Выбрать папку")
+        self._folder_btn.clicked.connect(self._on_select_folder)
+        row2.addWidget(self._folder_label)
+        row2.addWidget(self._folder_btn)
+        layout.addLayout(row2)
+
+        self._model = BatchTableModel(self)
+        self._table = QTableView()
+        self._table.setModel(self._model)
+        self._table.setSelectionBehavior(QTableView.SelectRows)
+        self._table.setSelectionMode(QTableView.SingleSelection)
+        self._table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self._table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self._table.doubleClicked.connect(self._on_row_activated)
+        layout.addWidget(self._table)
+
+        row3 = QHBoxLayout()
+        self._back_btn = QPushButton("Назад")
+        self._back_btn.clicked.connect(lambda: self.back_requested.emit())
+        row3.addWidget(self._back_btn)
+        self._run_btn = QPushButton("Проверить все")
+        self._run_btn.clicked.connect(self._on_run)
+        self._run_btn.setEnabled(False)
+        row3.addWidget(self._run_btn)
+        self._progress = QLabel("")
+        row3.addWidget(self._progress)
+        row3.addStretch()
+        layout.addLayout(row3)
+
+    # --- выбор файлов ---
+
+    def set_reference(self, path: str) -> None:
+        if not path:
+            return
+        self._ref_path = path
+        self._ref_label.setText(f"Эталон: {Path(path).name}")
+        self._update_run_btn()
+
+    def _on_select_ref(self) -> None:
+        path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Выберите эталон",
+            str(Path.home()),
+            "Excel (*.xlsx *.xls);;All (*)",
+        )
+        self.set_reference(path)
+
+    def _on_select_library(self) -> None:
+        folder = QFileDialog.getExistingDirectory(self, "Папка с эталонами вариантов", str(Path.home()))
+        if folder:
+            self._ref_path = folder
+            self._ref_label.setText(f"Библиотека эталонов: {Path(folder).name}")
+            self._update_run_btn()
+
+    def _on_select_folder(self) -> None:
+        folder = QFileDialog.getExistingDirectory(self, "Папка с работами студентов", str(Path.home()))
+        if folder:
+            self.set_folder(folder)
+
+    def set_folder(self, folder: str) -> None:
+        from app.core.batch import list_student_files
+
+        self._set_files(list_student_files(folder), Path(folder).name)
+
+    def _set_files(self, paths: list[Path], source: str) -> None:
+        if self._thread is not None:
+            return
+        if self._ref_path:
+            ref = Path(self._ref_path).resolve()
+            paths = [p for p in paths if ref not in (p.resolve(), p.resolve().parent)]  # эталон / папка эталонов
+        self._model.set_files(paths)
+        self._folder_label.setText(f"{source}: файлов — {len(paths)}")
+        self._progress.setText("")
+        self._update_run_btn()
+
+    def dragEnterEvent(self, event) -> None:  # noqa: N802 (Qt API)
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+
+    def dropEvent(self, event) -> None:  # noqa: N802 (Qt API)
+        from app.core.batch import EXCEL_SUFFIXES, list_student_files
+
+        local = [Path(u.toLocalFile()) for u in event.mimeData().urls() if u.isLocalFile()]
+        dirs = [p for p in local if p.is_dir()]
+        if len(dirs) == 1 and len(local) == 1:
+            self.set_folder(str(dirs[0]))
+        else:
+            files = sorted(p for p in local if p.is_file() and p.suffix.lower() in EXCEL_SUFFIXES)
+            for d in dirs:
+                files.extend(list_student_files(d))
+            self._set_files(files, "Перетащено")
+        event.acceptProposedAction()
+
+    def _update_run_btn(self) -> None:
+        self._run_btn.setEnabled(bool(self._ref_path and self._model.rowCount()) and self._thread is None)
+
+    # --- проверка ---
+
+    def _on_run(self) -> None:
+        paths = self._model.paths()
+        if not self._ref_path or not paths:
+            return
+        self._model.mark_all(STATUS_RUNNING)
+        self._progress.setText(f"0/{len(paths)}")
+        self._progress.setToolTip("")
+        self._run_ref_path = self._ref_path
+        self._thread = _BatchThread(self._ref_path, paths, self)
+        self._thread.result_ready.connect(self._on_result)
+        self._thread.similar_ready.connect(self._on_similar)
+        self._thread.failed.connect(self._on_failed)
+        self._thread.finished.connect(self._on_finished)
+        self._update_run_btn()
+        self._folder_btn.setEnabled(False)
+        self._ref_btn.setEnabled(False)
+        self._lib_btn.setEnabled(False)
+        self._thread.start()
+
+    def _on_result(self, row: int, result: dict) -> None:
+        self._model.set_result(row, result)
+        self._progress.setText(f"{self._model.done_count()}/{self._model.rowCount()}")
+        if not result.get("error"):
+            self._save(result)
+
+    @staticmethod
+    def _save(result: dict) -> None:
+        from app.storage import save_session
+
+        save_session(
+            ref_path=result.get("ref_path", ""),
+            stu_path=result.get("stu_path", ""),
+            fingerprint_ref=result.get("fingerprint_ref", ""),
+            fingerprint_stu=result.get("fingerprint_stu", ""),
+            fingerprint_match=result.get("fingerprint_match", False),
+            score_4=result.get("score_4", ""),
+            report_html=result.get("report_html", ""),
+        )
+
+    def _on_similar(self, pairs: list) -> None:
+        if not pairs:
+            return
+        from app.storage import save_similarity
+
+        save_similarity(self._run_ref_path, pairs)
+        self._progress.setText(f"{self._progress.text()} · похожих пар: {len(pairs)}")
+        self._progress.setToolTip("\n".join(f"{Path(a).name} — {Path(b).name}: {sim:.0%}" for a, b, sim in pairs[:30]))
+
+    def _on_failed(self, message: str) -> None:
+        from PySide6.QtWidgets import QMessageBox
+
+        self._model.mark_all(STATUS_QUEUED)
+        QMessageBox.critical(self, "Ошибка", message)
+
+    def _on_finished(self) -> None:
+        self._thread = None
+        self._folder_btn.setEnabled(True)
+        self._ref_btn.setEnabled(True)
+        self._lib_btn.setEnabled(True)
+        self._update_run_btn()
+
+    def _on_row_activated(self, index: QModelIndex) -> None:
+        result = self._model.result_at(index.row())
+        if result and not result.get("error"):
+            self.open_report.emit(result)
+
+    def stop(self) -> None:
+        """Прервать проверку (при закрытии окна)."""
+        if self._thread is not None:
+            self._thread.requestInterruption()
+            self._thread.wait()
@@ -17,6 +17,7 @@ class LoadFilesPage(QWidget):
     ref_selected = Signal(str)
     stu_selected = Signal(str)
     run_check = Signal()
+    batch_requested = Signal()
 
     def __init__(self, parent: Optional[QWidget] = None) -> None:
         super().__init__(parent)
@@ -46,6 +47,9 @@ class LoadFilesPage(QWidget):
         self._check_btn.clicked.connect(lambda: self.run_check.emit())
         self._check_btn.setEnabled(False)
         layout.addWidget(self._check_btn)
+        self._batch_btn = QPushButton("Пакетная проверка (папка работ)")
+        self._batch_btn.clicked.connect(lambda: self.batch_requested.emit())
+        layout.addWidget(self._batch_btn)
         layout.addStretch()
 
     def _on_select_ref(self) -> None:
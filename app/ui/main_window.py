@@ -10,10 +10,9 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt
 
+from app.ui.batch_page import BatchPage
 from app.ui.load_files_page import LoadFilesPage
 from app.ui.report_view import ReportView
-from app.core.compare import compare
-from app.storage import save_session
 
 
 class MainWindow(QMainWindow):
@@ -28,13 +27,20 @@ class MainWindow(QMainWindow):
         self._stack = QStackedWidget()
         self._load_page = LoadFilesPage()
         self._report_view = ReportView()
+        self._batch_page = BatchPage()
         self._stack.addWidget(self._load_page)
         self._stack.addWidget(self._report_view)
+        self._stack.addWidget(self._batch_page)
         layout.addWidget(self._stack)
+        # Куда возвращаться из отчёта: на выбор файлов или в пакетную очередь
+        self._report_origin: QWidget = self._load_page
 
         self._load_page.run_check.connect(self._run_check)
         self._report_view.export_requested.connect(self._on_export_done)
-        self._report_view.back_requested.connect(lambda: self._stack.setCurrentWidget(self._load_page))
+        self._report_view.back_requested.connect(lambda: self._stack.setCurrentWidget(self._report_origin))
+        self._load_page.batch_requested.connect(self._open_batch)
+        self._batch_page.back_requested.connect(lambda: self._stack.setCurrentWidget(self._load_page))
+        self._batch_page.open_report.connect(self._open_batch_report)
         self._load_page.ref_selected.connect(lambda _: None)
         self._load_page.stu_selected.connect(lambda _: None)
 
@@ -43,9 +49,14 @@ class MainWindow(QMainWindow):
         if not ref_path or not stu_path:
             QMessageBox.warning(self, "Ошибка", "Выберите оба файла.")
             return
+        # Ядро проверки (openpyxl, задания, граф) грузится при первой проверке, не при старте окна
+        from app.core.compare import compare
+        from app.storage import save_session
+
         try:
             result = compare(ref_path, stu_path)
             self._report_view.set_result(result)
+            self._report_origin = self._load_page
             self._stack.setCurrentWidget(self._report_view)
             save_session(
                 ref_path=ref_path,
@@ -54,7 +65,7 @@ class MainWindow(QMainWindow):
                 fingerprint_stu=result.get("fingerprint_stu", ""),
                 fingerprint_match=result.get("fingerprint_match", False),
                 score_4=result.get("score_4", ""),
-                report_html=self._report_view._last_html,
+                report_html=self._report_view.report_html(),
             )
         except Exception as e:
             QMessageBox.critical(
@@ -63,5 +74,19 @@ class MainWindow(QMainWindow):
                 f"Проверка завершилась с ошибкой:\n{e!s}",
             )
 
+    def _open_batch(self) -> None:
+        ref_path, _ = self._load_page.get_paths()
+        self._batch_page.set_reference(ref_path)
+        self._stack.setCurrentWidget(self._batch_page)
+
+    def _open_batch_report(self, result: dict) -> None:
+        self._report_view.set_result(result)
+        self._report_origin = self._batch_page
+        self._stack.setCurrentWidget(self._report_view)
+
+    def closeEvent(self, event) -> None:  # noqa: N802 (Qt API)
+        self._batch_page.stop()
+        super().closeEvent(event)
+
     def _on_export_done(self, path: str) -> None:
         QMessageBox.information(self, "Экспорт", f"Отчёт сохранён: {path}")
@@ -1,4 +1,4 @@
-"""Report view: summary, task statuses, expandable details, export HTML."""
+"""Report view: summary, task list, on-demand task details (paged, cached), export HTML."""
 from pathlib import Path
 from PySide6.QtWidgets import (
     QWidget,
@@ -6,14 +6,18 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QLabel,
     QPushButton,
-    QTextEdit,
-    QScrollArea,
-    QFrame,
+    QTextBrowser,
+    QListWidget,
+    QListWidgetItem,
+    QSplitter,
     QFileDialog,
 )
-from PySide6.QtCore import Signal
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtGui import QBrush, QColor
 from typing import Optional
 
+_STATUS_COLORS = {"PASS": "#0a0", "WARN": "#c60", "FAIL": "#c00", "INSF": "#666"}
+
 
 class ReportView(QWidget):
     export_requested = Signal(str)  # path
@@ -26,10 +30,31 @@ class ReportView(QWidget):
         self._summary.setWordWrap(True)
         layout.addWidget(self._summary)
 
-        self._details = QTextEdit()
-        self._details.setReadOnly(True)
-        self._details.setPlaceholderText("Детали по заданиям...")
-        layout.addWidget(self._details)
+        # Слева — список заданий, справа — детали только выбранного задания
+        splitter = QSplitter(Qt.Horizontal)
+        self._tasks = QListWidget()
+        self._tasks.currentRowChanged.connect(lambda _: self._show_current(page=0))
+        splitter.addWidget(self._tasks)
+        right = QWidget()
+        right_layout = QVBoxLayout(right)
+        right_layout.setContentsMargins(0, 0, 0, 0)
+        self._details = QTextBrowser()
+        self._details.setPlaceholderText("Выберите задание слева...")
+        right_layout.addWidget(self._details)
+        pager = QHBoxLayout()
+        self._prev_btn = QPushButton("◀")
+        self._prev_btn.clicked.connect(lambda: self._show_current(page=self._page - 1))
+        self._next_btn = QPushButton("▶")
+        self._next_btn.clicked.connect(lambda: self._show_current(page=self._page + 1))
+        self._page_label = QLabel("")
+        pager.addWidget(self._prev_btn)
+        pager.addWidget(self._page_label)
+        pager.addWidget(self._next_btn)
+        pager.addStretch()
+        right_layout.addLayout(pager)
+        splitter.addWidget(right)
+        splitter.setStretchFactor(1, 1)
+        layout.addWidget(splitter, 1)
 
         row = QHBoxLayout()
         self._back_btn = QPushButton("Новая проверка")
@@ -42,10 +67,12 @@ class ReportView(QWidget):
         layout.addLayout(row)
         self._last_html = ""
         self._last_result = None
+        self._page = 0
+        self._html_cache: dict[tuple[int, int], str] = {}  # (task, page) -> HTML
+        self._set_pager(1)
 
     def set_result(self, compare_result: dict) -> None:
         from app.core.report import (
-            build_html_report,
             STATUS_RU,
             TASK_TITLES,
         )
@@ -61,21 +88,70 @@ class ReportView(QWidget):
             "",
             f"Оценка по заданию №4 (ФЗ): {score_4} ({score_label}).",
             "",
-            "Результаты по заданиям:",
+            "Слева — задания; детали («Ожидалось» / «Получено») открываются по выбору задания.",
         ]
+        self._summary.setText("\n".join(lines))
+
+        # Полный HTML строится только по запросу (экспорт, сохранение в историю)
+        self._last_html = ""
+        self._last_result = compare_result
+        self._html_cache.clear()
+        self._tasks.blockSignals(True)
+        self._tasks.clear()
         for i in range(1, 14):
             r = task_results.get(i)
             status_ru = STATUS_RU.get(r.status, r.status) if r else "Нет данных"
             title = TASK_TITLES.get(i, f"Задание {i}")
-            lines.append(f"  №{i}. {title} — {status_ru}")
-        lines.append("")
-        lines.append("Ниже: по каждому заданию приведены «Ожидалось» (эталон) и «Получено» (ответ студента).")
-        self._summary.setText("\n".join(lines))
+            item = QListWidgetItem(f"№{i}. {title} — {status_ru}")
+            item.setData(Qt.UserRole, i)
+            item.setForeground(QBrush(QColor(_STATUS_COLORS.get(r.status if r else "INSF", "#000"))))
+            self._tasks.addItem(item)
+        self._tasks.blockSignals(False)
+        # Сразу открываем первое задание с замечаниями (или №1)
+        first = next(
+            (i for i in range(1, 14) if task_results.get(i) and task_results[i].status != "PASS"),
+            1,
+        )
+        self._tasks.setCurrentRow(first - 1)
+
+    def _show_current(self, page: int) -> None:
+        from app.core.report import build_task_html, task_page_count
 
-        html = build_html_report(compare_result)
+        item = self._tasks.currentItem()
+        result = self._last_result
+        if item is None or result is None:
+            return
+        task_num = item.data(Qt.UserRole)
+        r = result.get("task_results", {}).get(task_num)
+        if r is None:
+            self._details.setHtml(f"<p>Задание №{task_num}: нет данных.</p>")
+            self._set_pager(1)
+            return
+        pages = task_page_count(r)
+        self._page = max(0, min(page, pages - 1))
+        key = (task_num, self._page)
+        html = self._html_cache.get(key)
+        if html is None:
+            html = build_task_html(task_num, r, page=self._page)
+            self._html_cache[key] = html
         self._details.setHtml(html)
-        self._last_html = html
-        self._last_result = compare_result
+        self._set_pager(pages)
+
+    def _set_pager(self, pages: int) -> None:
+        visible = pages > 1
+        for w in (self._prev_btn, self._next_btn, self._page_label):
+            w.setVisible(visible)
+        self._prev_btn.setEnabled(self._page > 0)
+        self._next_btn.setEnabled(self._page < pages - 1)
+        self._page_label.setText(f"Страница {self._page + 1} из {pages}")
+
+    def report_html(self) -> str:
+        """Полный HTML-отчёт (строится при первом запросе и кэшируется)."""
+        if not self._last_html and self._last_result is not None:
+            from app.core.report import build_html_report
+
+            self._last_html = self._last_result.get("report_html") or build_html_report(self._last_result)
+        return self._last_html
 
     def _on_export(self) -> None:
         path, _ = QFileDialog.getSaveFileName(
@@ -88,5 +164,5 @@ class ReportView(QWidget):
             if not path.endswith(".html"):
                 path += ".html"
             with open(path, "w", encoding="utf-8") as f:
-                f.write(getattr(self, "_last_html", "<p>No report</p>"))
+                f.write(self.report_html() or "<p>No report</p>")
             self.export_requested.emit(path)
@@ -0,0 +1,241 @@
+"""
+Watch-folder grading: poll a folder of student files, grade new and changed ones as they arrive.
+
+Папка опрашивается раз в WATCH_POLL_SEC (только stdlib: опроса раз в пару секунд
+достаточно, inotify потребовал бы отдельной зависимости и не работает на сетевых
+папках). Файл проверяется, когда его размер и mtime не менялись WATCH_SETTLE_SEC —
+копирование или сохранение завершено; изменённый файл проверяется заново.
+Перед проверкой — sha256 содержимого: если для него и этого эталона результат уже
+есть в базе сессий (app.storage), файл не проверяется, так что перезапуск демона не
+перепроверяет всю папку; побайтная копия чужой работы получает свою сессию с тем же
+результатом и пометкой duplicate_of. Готовые файлы опроса идут одним пакетом через BatchGrader
+(эталон разобран один раз, пул процессов, побайтные копии — один раз); результаты
+дописываются в базу сессий, похожие работы пакета — в таблицу similarity.
+
+CLI: ``python -m app.watch <папка работ> <эталон.xlsx | папка эталонов> [--once]``.
+"""
+import hashlib
+import multiprocessing
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+from app.core.batch import BatchGrader, list_student_files
+from app.core.dedup import file_digest
+from app.core.report import copy_report_html
+from app.core.settings import BATCH_MAX_WORKERS, WATCH_POLL_SEC, WATCH_SETTLE_SEC
+from app.core.trace import count, span
+
+_Signature = tuple[int, int]  # (размер, mtime_ns)
+
+
+def _signature(path: Path) -> Optional[_Signature]:
+    try:
+        st = path.stat()
+    except OSError:  # файл удалён между листингом и stat
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class FolderWatcher:
+    """
+    Инкрементальная проверка папки работ. poll() — файлы, запись которых завершилась;
+    process() — проверить их и сохранить результаты; run() — опрос до stop.
+    Файлы, уже обработанные в этом состоянии (проверенные, найденные в базе, с ошибкой), не
+    повторяются до следующего изменения. Изменение эталона — новый разбор и новый ключ базы.
+    """
+
+    def __init__(
+        self,
+        folder: Union[str, Path],
+        ref_path: Union[str, Path],
+        settle: float = WATCH_SETTLE_SEC,
+        max_workers: Optional[int] = BATCH_MAX_WORKERS,
+        log: Callable[[str], None] = print,
+    ) -> None:
+        self.folder = Path(folder)
+        self.ref_path = Path(ref_path)
+        self.settle = settle
+        self.max_workers = max_workers
+        self.log = log
+        self.grader: Optional[BatchGrader] = None
+        self.ref_sha256 = ""
+        self._ref_state: Any = None
+        self._ref_pending: Optional[tuple[Any, float]] = None  # новое состояние эталона, когда замечено
+        self._pending: dict[Path, tuple[_Signature, float]] = {}  # файл -> (состояние, когда замечено)
+        self._done: dict[Path, _Signature] = {}
+
+    def _reference_state(self) -> Any:
+        if self.ref_path.is_dir():
+            return tuple((p.name, _signature(p)) for p in list_student_files(self.ref_path))
+        return _signature(self.ref_path)
+
+    def _reference(self, now: float) -> BatchGrader:
+        """
+        Разобранный эталон. Изменённый файл (или книги папки эталонов) разбирается заново, когда
+        не менялся settle секунд, как файлы работ; до того проверка идёт по прежнему эталону.
+        """
+        state = self._reference_state()
+        if self.grader is not None and state != self._ref_state:
+            if self._ref_pending is None or self._ref_pending[0] != state:
+                self._ref_pending = (state, now)
+            if now - self._ref_pending[1] < self.settle:
+                return self.grader
+        if self.grader is None or state != self._ref_state:
+            if self.ref_path.is_dir():  # библиотека: ключ — состав и состояние книг
+                ref_sha256 = hashlib.sha256(repr(state).encode("utf-8")).hexdigest()
+            else:
+                ref_sha256 = file_digest(self.ref_path)
+            with span("watch_reference", ref=self.ref_path.name):
+                grader = BatchGrader(self.ref_path, max_workers=self.max_workers)
+            if self.grader is not None:
+                self.log(f"Эталон {self.ref_path.name} изменён: проверка по новой версии")
+            self.grader, self.ref_sha256, self._ref_state, self._ref_pending = grader, ref_sha256, state, None
+            self._done.clear()  # с новым эталоном всё проверяется заново (кроме найденного в базе)
+        return self.grader
+
+    def poll(self, now: Optional[float] = None) -> list[Path]:
+        """
+        Файлы, готовые к проверке: новые или изменённые, которые не менялись settle секунд
+        (по наблюдению между опросами или по mtime). now — время по часам time.time().
+        """
+        now = time.time() if now is None else now
+        ready = []
+        present = set()
+        ref = self.ref_path.resolve()
+        for p in list_student_files(self.folder):
+            if p.resolve() == ref:
+                continue
+            sig = _signature(p)
+            if sig is None:
+                continue
+            present.add(p)
+            if self._done.get(p) == sig:
+                continue
+            seen = self._pending.get(p)
+            if seen is None or seen[0] != sig:
+                seen = self._pending[p] = (sig, now)
+            if now - seen[1] >= self.settle or now - sig[1] / 1e9 >= self.settle:
+                ready.append(p)
+        for p in [p for p in self._pending if p not in present]:
+            del self._pending[p]
+        for p in [p for p in self._done if p not in present]:
+            del self._done[p]
+        return ready
+
+    def process(self, now: Optional[float] = None) -> list[dict[str, Any]]:
+        """Один опрос: проверить готовые файлы, сохранить результаты. Возвращает новые результаты."""
+        from app.storage import find_result, save_session, save_similarity
+
+        now = time.time() if now is None else now
+        grader = self._reference(now)
+        todo: list[Path] = []
+        digests: dict[Path, str] = {}
+        for p in self.poll(now):
+            sig = self._pending.pop(p)[0]
+            digest = file_digest(p)
+            if not digest or _signature(p) != sig:  # файл изменился, пока читали — в следующий опрос
+                continue
+            self._done[p] = sig
+            stored = find_result(self.ref_sha256, digest, str(p))
+            if stored is None:
+                digests[p] = digest
+                todo.append(p)
+                continue
+            count("watch_already_graded")
+            if stored["stu_path"] == str(p):
+                self.log(f"{p.name}: уже проверен (результат в базе)")
+                continue
+            # побайтная копия уже проверенной работы: своя сессия с тем же результатом, без проверки
+            original = stored["duplicate_of"] or stored["stu_path"]
+            save_session(
+                ref_path=stored["ref_path"],
+                stu_path=str(p),
+                fingerprint_ref=stored["fingerprint_ref"],
+                fingerprint_stu=stored["fingerprint_stu"],
+                fingerprint_match=bool(stored["fingerprint_match"]),
+                score_4=stored["score_4"],
+                report_html=copy_report_html(
+                    stored["report_html"] or "", stored["stu_path"], stored["duplicate_of"] or "", str(p), original
+                ),
+                ref_sha256=self.ref_sha256,
+                stu_sha256=digest,
+                duplicate_of=original,
+            )
+            self.log(f"{p.name}: копия {Path(original).name}, №4 {stored['score_4'] or '—'}")
+        if not todo:
+            return []
+        out = []
+        with span("watch_batch", files=len(todo)):
+            for i, result in grader.grade(todo):
+                name = todo[i].name
+                if result.get("error"):
+                    self.log(f"{name}: ошибка — {result['error']}")
+                    out.append(result)
+                    continue
+                save_session(
+                    ref_path=result.get("ref_path", ""),
+                    stu_path=result.get("stu_path", ""),
+                    fingerprint_ref=result.get("fingerprint_ref", ""),
+                    fingerprint_stu=result.get("fingerprint_stu", ""),
+                    fingerprint_match=result.get("fingerprint_match", False),
+                    score_4=result.get("score_4", ""),
+                    report_html=result.get("report_html", ""),
+                    ref_sha256=self.ref_sha256,
+                    stu_sha256=digests[todo[i]],
+                    duplicate_of=result.get("duplicate_of", ""),
+                )
+                self.log(f"{name}: проверен, №4 {result.get('score_4', '') or '—'}")
+                out.append(result)
+        if grader.similar:
+            save_similarity(str(self.ref_path), [(str(todo[p.a]), str(todo[p.b]), p.similarity) for p in grader.similar])
+        return out
+
+    def run(self, interval: float = WATCH_POLL_SEC, stop: Optional[threading.Event] = None) -> None:
+        """
+        Опрашивать папку до stop (или до Ctrl+C). Ошибка опроса (эталон не читается, база
+        занята) пишется в лог, следующий опрос повторяет то, что не было сделано.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                self.process()
+            except Exception as e:  # долгоживущий демон не должен падать на одном опросе
+                count("watch_poll_error")
+                self.log(f"Ошибка опроса: {e!s}")
+            stop.wait(interval)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Следить за папкой работ и проверять новые и изменённые файлы."""
+    args = sys.argv[1:] if argv is None else argv
+    once = "--once" in args
+    args = [a for a in args if a != "--once"]
+    if len(args) != 2:
+        print("usage: python -m app.watch <folder> <reference.xlsx | reference folder> [--once]", file=sys.stderr)
+        return 2
+    folder, ref = Path(args[0]), Path(args[1])
+    if not folder.is_dir():
+        print(f"Нет папки работ: {folder}", file=sys.stderr)
+        return 1
+    if not ref.exists() or ref.is_dir() and ref.resolve() == folder.resolve():
+        print(f"Эталон должен быть файлом или отдельной папкой эталонов: {ref}", file=sys.stderr)
+        return 1
+    watcher = FolderWatcher(folder, ref, settle=0.0 if once else WATCH_SETTLE_SEC)
+    if once:
+        watcher.process()
+        return 0
+    print(f"Слежение за {folder} (опрос раз в {WATCH_POLL_SEC:g} с, Ctrl+C — выход)")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    # Пул пакетной проверки в собранном PyInstaller-приложении
+    multiprocessing.freeze_support()
+    sys.exit(main())
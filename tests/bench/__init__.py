@@ -0,0 +1,6 @@
+"""
+Offline benchmark suite: algorithms, Excel parsing, semantic graph, report, full compare().
+
+Запуск: ``python -m tests.bench`` (см. ``--help``). Результаты пишутся в JSON вместе со
+сведениями о машине и сравниваются с ``tests/bench/baseline.json``.
+"""
@@ -0,0 +1,64 @@
+"""CLI: python -m tests.bench [-k closure -k compare] [--output bench_output.json] [--update-baseline]."""
+import argparse
+import sys
+from pathlib import Path
+
+from tests.bench.runner import (
+    BASELINE_PATH,
+    DEFAULT_THRESHOLD,
+    compare_to_baseline,
+    load,
+    machine_info,
+    run,
+    save,
+    to_json,
+)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m tests.bench", description="Бенчмарки проверки нормализации.")
+    parser.add_argument("-k", dest="select", action="append", help="подстрока имени кейса (можно несколько)")
+    parser.add_argument("--repeat", type=int, default=5, help="повторов на кейс (берётся минимум)")
+    parser.add_argument("--output", default="bench_output.json", help="куда записать результаты (JSON)")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="файл baseline для сравнения")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="допустимое замедление (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="записать результаты в baseline")
+    args = parser.parse_args(argv)
+
+    machine = machine_info()
+    print(f"Python {machine['python']} on {machine['platform']}, calibration {machine['calibration_sec'] * 1e3:.2f} ms")
+    results = run(
+        select=args.select,
+        repeat=args.repeat,
+        progress=lambda r: print(f"  {r.name:<28} {r.per_call_sec * 1e3:12.4f} ms  (x{r.number})"),
+    )
+    data = to_json(results, machine)
+    save(data, args.output)
+    print(f"Результаты: {args.output}")
+
+    if args.update_baseline:
+        if args.select:
+            merged = load(args.baseline) if Path(args.baseline).exists() else {"results": {}}
+            merged["results"].update(data["results"])
+            merged["machine"], merged["created"] = data["machine"], data["created"]
+            data = merged
+        save(data, args.baseline)
+        print(f"Baseline обновлён: {args.baseline}")
+        return 0
+
+    try:
+        baseline = load(args.baseline)
+    except FileNotFoundError:
+        print("Baseline не найден — сравнение пропущено.")
+        return 0
+    regressions = compare_to_baseline(data, baseline, args.threshold)
+    for r in regressions:
+        print(f"РЕГРЕССИЯ {r.name}: {r.baseline_sec * 1e3:.4f} -> {r.current_sec * 1e3:.4f} ms (x{r.ratio:.2f})")
+    if regressions:
+        return 1
+    print(f"Регрессий нет (порог +{args.threshold:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
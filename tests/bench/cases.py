@@ -0,0 +1,227 @@
+"""Benchmark cases. Sizes are chosen so the full suite runs in about a minute."""
+import atexit
+import random
+import shutil
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+from app.core.algos.canonical import FDSet, fd_set_key
+from app.core.algos.decomposition import decompose_2nf, decompose_bcnf, lossless_join_chase, lost_dependencies, synthesize_3nf
+from app.core.algos.discovery import discover_fds
+from app.core.algos.fd import closure, minimal_cover
+from app.core.algos.keys import candidate_keys
+from app.core.algos.normal_forms import check_2nf, check_3nf
+from app.core.algos.partitions import validate_fds
+from app.core.algos.projection import FDProjector
+from app.core.algos.row_diff import diff_rows
+from app.core.checks import task1
+from app.core.checks.common import canon_attr_for_compare
+from app.core.compare import compare
+from app.core.excel.importer import parse_workbook
+from app.core.report import build_html_report
+from app.core.similarity import SimilarityIndex
+from app.core.semantic.build_graph import build_graph
+from tests.bench.runner import bench
+from tests.synth import SynthSpec, generate_pair, make_schema
+
+FD = tuple[list[str], str]
+
+
+@lru_cache(maxsize=None)
+def _workdir() -> Path:
+    path = Path(tempfile.mkdtemp(prefix="dbnc_bench_"))
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+
+@lru_cache(maxsize=None)
+def _pair(n_attrs: int, n_rows: int) -> tuple[Path, Path]:
+    spec = SynthSpec(n_attrs=n_attrs, key_size=3, n_fds=n_attrs + 2, n_rows=n_rows, seed=1)
+    ref, stu, _ = generate_pair(spec, _workdir(), name=f"bench_{n_attrs}_{n_rows}")
+    return ref, stu
+
+
+def _chain(n: int) -> list[FD]:
+    """A0 -> A1 -> ... -> A{n-1}, LHS в порядке, обратном обходу closure (худший случай)."""
+    return [([f"A{i}"], f"A{i + 1}") for i in reversed(range(n - 1))]
+
+
+def _paired(k: int) -> tuple[set[str], list[FD]]:
+    """k необязательных атрибутов: пары A_i <-> B_i дают 2^(k/2) кандидатных ключей."""
+    F: list[FD] = []
+    for i in range(k // 2):
+        F += [([f"A{i}"], f"B{i}"), ([f"B{i}"], f"A{i}")]
+    R = {x for lhs, rhs in F for x in lhs + [rhs]}
+    return R, F
+
+
+def _graph_inputs(n_rows: int):
+    ref, _ = _pair(12, n_rows)
+    parsed = parse_workbook(ref)
+    dict_ref = {canon_attr_for_compare(a): canon_attr_for_compare(a) for a in task1.extract_headers_ref(parsed)}
+    return parsed, dict_ref
+
+
+# --- алгоритмы ---
+
+
+@bench("closure", params=(50, 200))
+def _closure(n):
+    F = _chain(n)
+    return lambda: closure(["A0"], F)
+
+
+@bench("minimal_cover", params=(20, 60))
+def _minimal_cover(n):
+    F = _chain(n) + [([f"A{i}", f"A{i + 2}"], f"A{i + 1}") for i in range(n - 2)]
+    return lambda: minimal_cover(F)
+
+
+@bench("candidate_keys", params=(8, 12, 14))
+def _candidate_keys(k):
+    R, F = _paired(k)
+    return lambda: candidate_keys(R, F)
+
+
+@bench("dependency_preservation", params=(100,))
+def _dependency_preservation(n):
+    # Цикл A0 -> A1 -> ... -> A0, отношения — соседние пары: A{n-1} -> A0 выводится
+    # только через все проекции по цепочке
+    F = [([f"A{i}"], f"A{(i + 1) % n}") for i in range(n)]
+    relations = [(f"R{i}", {f"A{i}", f"A{i + 1}"}) for i in range(n - 1)]
+    return lambda: lost_dependencies(F, relations)
+
+
+@bench("lossless_chase", params=(60,))
+def _lossless_chase(n):
+    # Цепочка, перечисленная от конца: без очереди каждый проход по F продвигался бы на одну ФЗ
+    F = [([f"A{i}"], f"A{i + 1}") for i in reversed(range(n - 1))]
+    relations = [(f"R{i}", {f"A{i}", f"A{i + 1}"}) for i in range(n - 1)]
+    U = {f"A{i}" for i in range(n)}
+    return lambda: lossless_join_chase(U, F, relations)
+
+
+@bench("project_fds", params=(12,))
+def _project_fds(n):
+    # Схема на 2n атрибутов, отношение — каждый второй атрибут: почти все ФЗ проекции выводные
+    rng = random.Random(4)
+    attrs = [f"A{i}" for i in range(2 * n)]
+    F = [(rng.sample(attrs[:i], min(i, rng.randint(1, 2))), attrs[i]) for i in range(1, 2 * n)]
+    R = set(attrs[::2])
+    return lambda: FDProjector(F).project(R)
+
+
+@bench("reference_decompositions", params=(20,))
+def _reference_decompositions(n):
+    # Эталоны №11/№13 и НФБК для одного варианта (синтетическая схема на n атрибутов)
+    schema = make_schema(SynthSpec(n_attrs=n, key_size=3, n_fds=n + 5, seed=5))
+    U, F = set(schema.attrs), schema.fds + schema.redundant_fds
+    return lambda: (decompose_2nf(U, F), synthesize_3nf(U, F), decompose_bcnf(U, F))
+
+
+@bench("canonical_fds", params=(20,))
+def _canonical_fds(n):
+    # Каноническая форма ответа №4 с избыточными ФЗ (новый FDSet — без кэша)
+    schema = make_schema(SynthSpec(n_attrs=n, key_size=3, n_fds=n + 5, seed=5))
+    key = fd_set_key(schema.fds + schema.redundant_fds)
+    return lambda: FDSet(key).digest
+
+
+def _nf_inputs(n: int):
+    """Ключ (K1, K2); половина атрибутов зависит от K1, остальные транзитивно."""
+    R = {"K1", "K2"} | {f"A{i}" for i in range(n)}
+    F: list[FD] = [(["K1", "K2"], "A0")]
+    F += [(["K1"], f"A{i}") for i in range(1, n // 2)]
+    F += [(["A0"], f"A{i}") for i in range(n // 2, n)]
+    return R, F, candidate_keys(R, F)
+
+
+@bench("check_2nf", params=(20,))
+def _check_2nf(n):
+    R, F, keys = _nf_inputs(n)
+    return lambda: check_2nf(R, F, keys)
+
+
+@bench("check_3nf", params=(20,))
+def _check_3nf(n):
+    R, F, keys = _nf_inputs(n)
+    return lambda: check_3nf(R, F, keys)
+
+
+# --- Excel и граф ---
+
+
+@bench("parse_workbook", params=(100, 500, 1000))
+def _parse_workbook(n_rows):
+    ref, _ = _pair(12, n_rows)
+    return lambda: parse_workbook(ref)
+
+
+@bench("build_graph", params=(500,))
+def _build_graph(n_rows):
+    parsed, dict_ref = _graph_inputs(n_rows)
+    return lambda: build_graph(parsed, "ref", dict_ref, list(dict_ref))
+
+
+@bench("TripleStore.find", params=(500,))
+def _triple_find(n_rows):
+    parsed, dict_ref = _graph_inputs(n_rows)
+    store = build_graph(parsed, "ref", dict_ref, list(dict_ref))
+    return lambda: store.find(s="sol:ref:task:5", p="primary_key_contains")
+
+
+# --- отчёт и сквозная проверка ---
+
+
+@bench("build_html_report", params=(500,))
+def _build_html_report(n_rows):
+    ref, stu = _pair(12, n_rows)
+    result = compare(ref, stu)
+    return lambda: build_html_report(result)
+
+
+@bench("compare", params=(50, 200))
+def _compare(n_rows):
+    ref, stu = _pair(12, n_rows)
+    return lambda: compare(ref, stu)
+
+
+@bench("validate_fds", params=(5000,))
+def _validate_fds(n_rows):
+    headers = [f"A{i}" for i in range(8)]
+    rows = [[f"{i % (7 * (c + 1))}" for c in range(8)] for i in range(n_rows)]
+    F: list[FD] = [([f"A{c}"], f"A{c + 1}") for c in range(7)] + [(["A0", "A1"], "A7")]
+    return lambda: validate_fds(headers, rows, F)
+
+
+@bench("discover_fds", params=(2000,))
+def _discover_fds(n_rows):
+    schema = make_schema(SynthSpec(n_attrs=20, key_size=3, n_rows=n_rows, seed=1))
+    return lambda: discover_fds(schema.attrs, schema.rows, time_budget=None)
+
+
+@bench("diff_rows", params=(10000,))
+def _diff_rows(n_rows):
+    schema = make_schema(SynthSpec(n_attrs=10, key_size=2, n_rows=n_rows, seed=2))
+    ref = schema.rows
+    stu = [list(r) for r in reversed(ref)]
+    for i in range(0, n_rows, 50):  # 2% строк с опечаткой в одной ячейке
+        stu[i][i % 10] += "x"
+    return lambda: diff_rows(ref, stu, 10)
+
+
+@bench("similarity_index", params=(2000,))
+def _similarity_index(n):
+    # n работ по 5–60 собственных шинглов из общего словаря ошибок: сигнатуры, LSH, точный Жаккар кандидатов
+    rng = random.Random(6)
+    vocab = [rng.getrandbits(64) for _ in range(n)]
+    works = [frozenset(rng.sample(vocab, rng.randint(5, 60))) for _ in range(n)]
+
+    def run():
+        index = SimilarityIndex()
+        for i, shingles in enumerate(works):
+            index.add(i, shingles)
+        return index.pairs()
+
+    return run
@@ -0,0 +1,185 @@
+"""Benchmark runner: case registry, timing, machine info, JSON results, baseline comparison."""
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+DEFAULT_THRESHOLD = 0.25  # +25% к времени эталонного прогона — регрессия
+MIN_REPEAT_SEC = 0.05  # один повтор длится не меньше (число вызовов подбирается)
+
+# setup(param) -> функция без аргументов, время которой измеряется
+Setup = Callable[[Any], Callable[[], Any]]
+
+
+@dataclass
+class Case:
+    name: str
+    setup: Setup
+    params: tuple[Any, ...]
+
+
+@dataclass
+class BenchResult:
+    name: str  # «closure[200]»
+    per_call_sec: float  # минимум по повторам / число вызовов
+    median_sec: float
+    number: int  # вызовов в одном повторе
+    repeat: int
+
+
+@dataclass
+class Regression:
+    name: str
+    baseline_sec: float  # с поправкой на калибровку машины
+    current_sec: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_sec / self.baseline_sec if self.baseline_sec else float("inf")
+
+
+CASES: list[Case] = []
+
+
+def bench(name: str, params: tuple[Any, ...] = (None,)) -> Callable[[Setup], Setup]:
+    """Register a case; each param gives a separate result «name[param]»."""
+
+    def deco(setup: Setup) -> Setup:
+        CASES.append(Case(name=name, setup=setup, params=tuple(params)))
+        return setup
+
+    return deco
+
+
+def case_id(name: str, param: Any) -> str:
+    return name if param is None else f"{name}[{param}]"
+
+
+def measure(fn: Callable[[], Any], repeat: int = 5) -> tuple[float, float, int]:
+    """
+    (per_call_min, per_call_median, number): number подбирается так,
+    чтобы повтор занимал не меньше MIN_REPEAT_SEC.
+    """
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= MIN_REPEAT_SEC or number >= 1 << 20:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(MIN_REPEAT_SEC / elapsed) + 1)
+    times = [elapsed]
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append(time.perf_counter() - t0)
+    return min(times) / number, statistics.median(times) / number, number
+
+
+def calibrate() -> float:
+    """Время фиксированного цикла на чистом Python — поправка при сравнении разных машин."""
+
+    def loop() -> int:
+        acc = 0
+        d: dict[int, int] = {}
+        for i in range(20000):
+            d[i % 97] = d.get(i % 97, 0) + i
+            acc ^= hash(str(i))
+        return acc
+
+    per_call, _, _ = measure(loop, repeat=5)
+    return per_call
+
+
+def machine_info() -> dict[str, Any]:
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "calibration_sec": calibrate(),
+    }
+
+
+def _machine_key(machine: dict[str, Any]) -> tuple:
+    return tuple(machine.get(k) for k in ("python", "implementation", "platform", "machine", "processor", "cpu_count"))
+
+
+def run(
+    select: Optional[list[str]] = None,
+    repeat: int = 5,
+    progress: Optional[Callable[[BenchResult], None]] = None,
+) -> list[BenchResult]:
+    """Run registered cases (select — подстроки имён; пусто — все)."""
+    from tests.bench import cases  # noqa: F401 — регистрирует кейсы
+
+    results = []
+    for c in CASES:
+        for param in c.params:
+            name = case_id(c.name, param)
+            if select and not any(s in name for s in select):
+                continue
+            fn = c.setup(param)
+            per_call, median, number = measure(fn, repeat=repeat)
+            res = BenchResult(name=name, per_call_sec=per_call, median_sec=median, number=number, repeat=repeat)
+            results.append(res)
+            if progress:
+                progress(res)
+    return results
+
+
+def to_json(results: list[BenchResult], machine: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": machine,
+        "results": {r.name: asdict(r) for r in results},
+    }
+
+
+def save(data: dict[str, Any], path: Union[str, Path]) -> None:
+    Path(path).write_text(json.dumps(data, ensure_ascii=False, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def load(path: Union[str, Path]) -> dict[str, Any]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def compare_to_baseline(
+    current: dict[str, Any],
+    baseline: dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[Regression]:
+    """
+    Кейсы, ставшие медленнее baseline более чем на threshold.
+    Для другой машины (или версии Python) время baseline масштабируется
+    отношением калибровок; на той же машине калибровка только шумит. Кейсы,
+    которых нет в одном из прогонов, пропускаются.
+    """
+    scale = 1.0
+    cur_machine = current.get("machine", {})
+    base_machine = baseline.get("machine", {})
+    cal_cur = cur_machine.get("calibration_sec")
+    cal_base = base_machine.get("calibration_sec")
+    if cal_cur and cal_base and _machine_key(cur_machine) != _machine_key(base_machine):
+        scale = cal_cur / cal_base
+    regressions = []
+    base_results = baseline.get("results", {})
+    for name, res in current.get("results", {}).items():
+        base = base_results.get(name)
+        if not base:
+            continue
+        expected = base["per_call_sec"] * scale
+        if res["per_call_sec"] > expected * (1 + threshold):
+            regressions.append(Regression(name=name, baseline_sec=expected, current_sec=res["per_call_sec"]))
+    return regressions
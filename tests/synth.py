@@ -0,0 +1,337 @@
+"""
+Synthetic reference/student workbooks in the «Задание №N» layout for load and scaling tests.
+
+Схема строится так, что ответы эталона согласованы с проверками (частичные/транзитивные ФЗ
+считаются теми же функциями, что и в app.core.checks), поэтому пара «эталон / студент без
+ошибок» проходит все 13 заданий при любом шуме оформления. Ошибки студента вносятся
+с заданными вероятностями (ErrorRates).
+"""
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from openpyxl import Workbook
+
+from app.core.algos.fd import closure
+from app.core.checks.common import NBSP, canon_attr_for_compare
+from app.core.checks.task6 import compute_partial_ref
+from app.core.checks.task8 import compute_transitive_ref
+
+FD = tuple[list[str], str]
+
+_WORDS = ["Код", "Имя", "Цена", "Счёт", "Адрес", "Дата", "Объём", "Телефон", "Отчёт", "Номер", "Город", "Склад"]
+_HINT = "Порядок столбцов можно изменить, главное — полнота и корректность ответа."
+
+
+@dataclass
+class NoiseSpec:
+    """Шум оформления: не должен менять результат проверки."""
+    shift_cols: int = 0  # таблицы и текст сдвинуты вправо на 0..shift_cols колонок
+    shift_rows: int = 0  # перед содержимым задания 0..shift_rows пустых строк
+    separators: float = 0.0  # вероятность строки-разделителя «.....» после строки таблицы 1НФ
+    instructions: bool = False  # строки «ответ:» и длинные подсказки после якоря
+    nbsp: float = 0.0  # вероятность NBSP вместо пробела / хвостового NBSP в ячейке
+    yo: bool = False  # студент пишет «е» вместо «ё» в именах атрибутов
+    arrows: bool = False  # разные стрелки в ФЗ (→, =>, ->)
+
+
+@dataclass
+class ErrorRates:
+    """Вероятности ошибок студента."""
+    header_drop: float = 0.0  # атрибут пропущен в заголовке задания №1 (на атрибут)
+    row_drop: float = 0.0  # строка таблицы 1НФ пропущена (на строку)
+    cell_corrupt: float = 0.0  # одна ячейка строки 1НФ испорчена (на строку)
+    fd_drop: float = 0.0  # ФЗ пропущена (на ФЗ, задания №4, №6, №8)
+    fd_corrupt: float = 0.0  # у ФЗ заменена левая часть (на ФЗ, задание №4)
+    pk_wrong: float = 0.0  # первичный ключ указан неверно (на работу)
+    relation_attr_drop: float = 0.0  # из отношения №11/№13 пропал атрибут (на отношение)
+
+
+@dataclass
+class SynthSpec:
+    n_attrs: int = 8
+    key_size: int = 2
+    n_fds: Optional[int] = None  # >= n_attrs - key_size; сверх этого — избыточные (выводимые) ФЗ
+    partial_ratio: float = 0.4  # доля неключевых атрибутов, зависящих от части ключа
+    transitive_ratio: float = 0.3  # доля неключевых атрибутов, зависящих от неключевого
+    n_rows: int = 20  # строк в таблице 1НФ
+    seed: int = 0
+    noise: NoiseSpec = field(default_factory=NoiseSpec)
+    errors: ErrorRates = field(default_factory=ErrorRates)
+
+
+@dataclass
+class SynthSchema:
+    """Сгенерированный вариант: атрибуты (подписи), ключ, ФЗ, данные и эталонные ответы."""
+    attrs: list[str]
+    key: list[str]
+    fds: list[FD]  # по одной на неключевой атрибут
+    redundant_fds: list[FD]
+    partial_fds: list[FD]
+    transitive_fds: list[FD]
+    repeating_group: list[str]
+    rows: list[list[str]]
+    relations_2nf: list[tuple[str, list[str]]]
+    relations_3nf: list[tuple[str, list[str]]]
+
+
+def make_schema(spec: SynthSpec) -> SynthSchema:
+    if spec.n_attrs < 3 or not (1 <= spec.key_size < spec.n_attrs):
+        raise ValueError("need n_attrs >= 3 and 1 <= key_size < n_attrs")
+    n_nonkey = spec.n_attrs - spec.key_size
+    n_fds = n_nonkey if spec.n_fds is None else spec.n_fds
+    if n_fds < n_nonkey:
+        raise ValueError(f"n_fds must be >= n_attrs - key_size ({n_nonkey}): every non-key attribute needs an FD")
+    rng = random.Random(spec.seed)
+
+    attrs = [f"{_WORDS[i % len(_WORDS)]}{i + 1}" for i in range(spec.n_attrs)]
+    key = attrs[: spec.key_size]
+    nonkey = attrs[spec.key_size:]
+    n_partial = round(spec.partial_ratio * n_nonkey) if spec.key_size >= 2 else 0
+    n_trans = min(round(spec.transitive_ratio * n_nonkey), n_nonkey - n_partial - 1)
+    n_trans = max(n_trans, 0)
+    partial_attrs = nonkey[:n_partial]
+    full_attrs = nonkey[n_partial: n_nonkey - n_trans]
+    trans_attrs = nonkey[n_nonkey - n_trans:]
+
+    determinant: dict[str, list[str]] = {}
+    for a in partial_attrs:
+        size = rng.randint(1, spec.key_size - 1)
+        determinant[a] = sorted(rng.sample(key, size), key=attrs.index)
+    for a in full_attrs:
+        determinant[a] = list(key)
+    for a in trans_attrs:
+        determinant[a] = [rng.choice(full_attrs)]
+    fds: list[FD] = [(determinant[a], a) for a in nonkey]
+
+    redundant: list[FD] = []
+    for _ in range(n_fds - n_nonkey):
+        a = rng.choice(nonkey)
+        extra = [x for x in attrs if x != a and x not in determinant[a]]
+        redundant.append((sorted(determinant[a] + [rng.choice(extra)], key=attrs.index), a))
+
+    rows = _make_rows(spec, rng, attrs, key, determinant)
+
+    # Эталонные ответы №6/№8 — теми же функциями, что и проверка (на канонических именах)
+    label = {canon_attr_for_compare(a): a for a in attrs}
+    F_canon = [([canon_attr_for_compare(x) for x in lhs], canon_attr_for_compare(rhs)) for lhs, rhs in fds]
+    U = set(label)
+    pk_canon = [canon_attr_for_compare(k) for k in key]
+    partial = [([label[x] for x in lhs], label[rhs]) for lhs, rhs in compute_partial_ref(U, F_canon, pk_canon)]
+    transitive = [([label[x] for x in lhs], label[rhs]) for lhs, rhs in compute_transitive_ref(U, F_canon)]
+
+    repeating = [a for a in attrs if a not in closure([key[0]], fds)]
+
+    # 2НФ: части ключа со своими атрибутами + основное отношение; 3НФ: ещё и транзитивные
+    by_lhs: dict[tuple[str, ...], list[str]] = {}
+    for a in partial_attrs:
+        by_lhs.setdefault(tuple(determinant[a]), []).append(a)
+    rel_2nf = [(f"R{i}", list(lhs) + rhs) for i, (lhs, rhs) in enumerate(by_lhs.items(), start=2)]
+    rel_2nf.insert(0, ("R1", key + full_attrs + trans_attrs))
+    by_det: dict[str, list[str]] = {}
+    for a in trans_attrs:
+        by_det.setdefault(determinant[a][0], []).append(a)
+    rel_3nf = [("R1", key + full_attrs)] + rel_2nf[1:]
+    rel_3nf += [(f"R{len(rel_3nf) + i}", [d] + rhs) for i, (d, rhs) in enumerate(by_det.items(), start=1)]
+
+    return SynthSchema(
+        attrs=attrs,
+        key=key,
+        fds=fds,
+        redundant_fds=redundant,
+        partial_fds=partial,
+        transitive_fds=transitive,
+        repeating_group=repeating,
+        rows=rows,
+        relations_2nf=rel_2nf,
+        relations_3nf=rel_3nf,
+    )
+
+
+def _make_rows(
+    spec: SynthSpec,
+    rng: random.Random,
+    attrs: list[str],
+    key: list[str],
+    determinant: dict[str, list[str]],
+) -> list[list[str]]:
+    """Строки 1НФ: уникальные значения ключа, остальные атрибуты — функции своих детерминантов."""
+    k = len(key)
+    d = 2
+    while d**k < spec.n_rows:
+        d += 1
+    codes = rng.sample(range(d**k), spec.n_rows)
+    values: dict[str, dict[tuple[str, ...], str]] = {a: {} for a in determinant}
+    rows = []
+    for code in codes:
+        row: dict[str, str] = {}
+        for j, a in enumerate(key):
+            code, digit = divmod(code, d)
+            row[a] = f"k{j + 1}-{digit}"
+        for a in attrs[k:]:  # детерминанты транзитивных уже заполнены (идут раньше)
+            det = tuple(row[x] for x in determinant[a])
+            known = values[a]
+            if det not in known:
+                known[det] = f"v{attrs.index(a) + 1}-{len(known)}"
+            row[a] = known[det]
+        rows.append([row[a] for a in attrs])
+    return rows
+
+
+class _SheetWriter:
+    """Построчная запись (write-only лист), со сдвигом колонок и шумом."""
+
+    def __init__(self, spec: SynthSpec, rng: random.Random, role: str) -> None:
+        self.rows: list[list[Any]] = []
+        self.noise = spec.noise
+        self.rng = rng
+        self.role = role
+
+    def text(self, s: str) -> str:
+        n = self.noise
+        if n.nbsp and self.rng.random() < n.nbsp:
+            s = s.replace(", ", "," + NBSP) + NBSP
+        if n.yo and self.role == "stu":
+            s = s.replace("ё", "е").replace("Ё", "Е")
+        return s
+
+    def line(self, cells: list[Any], col: int = 1) -> None:
+        self.rows.append([None] * (col - 1) + [self.text(c) if isinstance(c, str) else c for c in cells])
+
+    def task(self, num: int) -> int:
+        """Якорь задания + шум; возвращает колонку начала содержимого."""
+        n = self.noise
+        self.rows.append([f"Задание №{num}"])
+        if n.instructions:
+            self.rows.append(["ответ:"])
+            self.rows.append([_HINT])
+        for _ in range(self.rng.randint(0, n.shift_rows)):
+            self.rows.append([])
+        return 1 + self.rng.randint(0, n.shift_cols)
+
+    def fd(self, lhs: list[str], rhs: list[str]) -> str:
+        arrow = self.rng.choice(["->", "→", "=>"]) if self.noise.arrows else "->"
+        return f"{', '.join(lhs)} {arrow} {', '.join(rhs)}"
+
+
+def build_workbook(schema: SynthSchema, spec: SynthSpec, role: str = "ref") -> Workbook:
+    """Книга эталона (role='ref') или студента (role='stu', с ошибками из spec.errors)."""
+    return build_sheets_workbook([("Решение", schema, spec)], role)
+
+
+def build_sheets_workbook(sheets: list[tuple[str, SynthSchema, SynthSpec]], role: str = "ref") -> Workbook:
+    """Книга из нескольких листов (имя, схема, spec): варианты эталона или работа, разбитая по листам."""
+    wb = Workbook(write_only=True)
+    for name, schema, spec in sheets:
+        ws = wb.create_sheet(name)
+        for row in sheet_rows(schema, spec, role):
+            ws.append(row)
+    return wb
+
+
+def sheet_rows(schema: SynthSchema, spec: SynthSpec, role: str = "ref") -> list[list[Any]]:
+    """Строки листа с ответами на задания 1..13."""
+    rng = random.Random(f"{spec.seed}:{role}")
+    err = spec.errors if role == "stu" else ErrorRates()
+    w = _SheetWriter(spec, rng, role)
+    attrs = schema.attrs
+    width = len(attrs)
+
+    # №1: заголовки универсального отношения + пара строк с повторяющейся группой
+    col = w.task(1)
+    headers = [a for a in attrs if not (err.header_drop and rng.random() < err.header_drop)]
+    w.line(headers, col)
+    rep_idx = [attrs.index(a) for a in schema.repeating_group]
+    for row in schema.rows[:2]:
+        w.line([", ".join({row[i], schema.rows[-1][i]}) if i in rep_idx else row[i] for i in range(width)], col)
+    w.line([])
+
+    # №2: повторяющаяся группа
+    col = w.task(2)
+    w.line([", ".join(schema.repeating_group) or "нет"], col)
+
+    # №3: таблица 1НФ, ключ помечен *
+    col = w.task(3)
+    w.line([f"{a}*" if a in schema.key else a for a in attrs], col)
+    for row in schema.rows:
+        if err.row_drop and rng.random() < err.row_drop:
+            continue
+        row = list(row)
+        if err.cell_corrupt and rng.random() < err.cell_corrupt:
+            row[rng.randrange(width)] = f"ошибка{rng.randrange(10**6)}"
+        w.line(row, col)
+        if spec.noise.separators and rng.random() < spec.noise.separators:
+            w.line(["....."] * width, col)
+    w.line([])
+
+    # №4: ФЗ (по одной в строке), с избыточными
+    col = w.task(4)
+    for lhs, rhs in schema.fds + schema.redundant_fds:
+        if err.fd_drop and rng.random() < err.fd_drop:
+            continue
+        if err.fd_corrupt and rng.random() < err.fd_corrupt:
+            lhs = [rng.choice([a for a in attrs if a != rhs])]
+        w.line([w.fd(lhs, [rhs])], col)
+
+    # №5: первичный ключ
+    col = w.task(5)
+    pk = list(schema.key)
+    if err.pk_wrong and rng.random() < err.pk_wrong:
+        pk = pk[:-1] if len(pk) > 1 else pk + [attrs[-1]]
+    w.line([", ".join(pk)], col)
+
+    # №6–№9: частичные и транзитивные ФЗ (№7/№9 — те же, сгруппированные по правой части)
+    for num, fds in ((6, schema.partial_fds), (7, schema.partial_fds), (8, schema.transitive_fds), (9, schema.transitive_fds)):
+        col = w.task(num)
+        for lhs, rhs in sorted(fds, key=lambda x: x[1]) if num in (7, 9) else fds:
+            if num in (6, 8) and err.fd_drop and rng.random() < err.fd_drop:
+                continue
+            w.line([w.fd(lhs, [rhs])], col)
+
+    # №10: аномалии 1НФ
+    col = w.task(10)
+    rep = schema.repeating_group[0] if schema.repeating_group else "повторяющиеся группы"
+    w.line([f"Аномалия вставки: нельзя добавить запись без значения {rep}."], col)
+    w.line(["Аномалия обновления: одно и то же значение приходится изменить в нескольких строках."], col)
+    w.line(["Аномалия удаления: при удалении строки теряются данные."], col)
+
+    # №11–№13: схемы 2НФ, аномалии 2НФ, схемы 3НФ
+    _write_relations(w, 11, schema.relations_2nf, err, rng)
+    col = w.task(12)
+    w.line(["Из-за частичной зависимости остаются аномалии вставки и обновления."], col)
+    w.line(["При удалении записи теряются сведения о части ключа."], col)
+    _write_relations(w, 13, schema.relations_3nf, err, rng)
+    return w.rows
+
+
+def _write_relations(
+    w: _SheetWriter,
+    num: int,
+    relations: list[tuple[str, list[str]]],
+    err: ErrorRates,
+    rng: random.Random,
+) -> None:
+    """Отношения строками «Имя(атрибуты)»."""
+    col = w.task(num)
+    for name, rel_attrs in relations:
+        rel_attrs = list(rel_attrs)
+        if err.relation_attr_drop and len(rel_attrs) > 2 and rng.random() < err.relation_attr_drop:
+            rel_attrs.pop(rng.randrange(len(rel_attrs)))
+        w.line([f"{name}({', '.join(rel_attrs)})"], col)
+
+
+def generate_pair(
+    spec: SynthSpec,
+    out_dir: Union[str, Path],
+    name: str = "synth",
+) -> tuple[Path, Path, SynthSchema]:
+    """Записать пару книг (<name>_ref.xlsx, <name>_stu.xlsx) в out_dir."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    schema = make_schema(spec)
+    ref_path = out_dir / f"{name}_ref.xlsx"
+    stu_path = out_dir / f"{name}_stu.xlsx"
+    build_workbook(schema, spec, "ref").save(ref_path)
+    build_workbook(schema, spec, "stu").save(stu_path)
+    return ref_path, stu_path, schema
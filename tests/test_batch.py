@@ -0,0 +1,47 @@
+"""Batch grading: folder listing, one parsed reference, results for every student."""
+from pathlib import Path
+
+from openpyxl import Workbook
+
+from app.core.batch import BatchGrader, list_student_files
+
+
+def _write_solution(path: Path, headers: list[str], fds: list[str]) -> None:
+    wb = Workbook()
+    ws = wb.active
+    ws.cell(row=1, column=1, value="Задание №1")
+    for c, h in enumerate(headers, start=1):
+        ws.cell(row=2, column=c, value=h)
+    ws.cell(row=4, column=1, value="Задание №4")
+    for r, fd in enumerate(fds, start=5):
+        ws.cell(row=r, column=1, value=fd)
+    wb.save(path)
+    wb.close()
+
+
+def test_list_student_files_skips_temp(tmp_path):
+    for name in ["b.xlsx", "a.xlsx", "~$a.xlsx", ".hidden.xlsx", "notes.txt"]:
+        (tmp_path / name).write_bytes(b"")
+    assert [p.name for p in list_student_files(tmp_path)] == ["a.xlsx", "b.xlsx"]
+
+
+def test_batch_grader_grades_all(tmp_path):
+    ref = tmp_path / "reference.xlsx"
+    _write_solution(ref, ["A", "B", "C"], ["A -> B", "B -> C"])
+    students = tmp_path / "group"
+    students.mkdir()
+    _write_solution(students / "s1.xlsx", ["A", "B", "C"], ["A -> B", "B -> C"])
+    _write_solution(students / "s2.xlsx", ["A", "B", "C"], ["A -> B"])
+    (students / "broken.xlsx").write_bytes(b"not a workbook")
+    paths = list_student_files(students)
+
+    grader = BatchGrader(ref, max_workers=2)
+    results = dict(grader.grade(paths))
+
+    assert sorted(results) == [0, 1, 2]
+    by_name = {Path(r["stu_path"]).name: r for r in results.values()}
+    assert "error" in by_name["broken.xlsx"]
+    assert by_name["s1.xlsx"]["score_4"] == "++"
+    assert by_name["s2.xlsx"]["score_4"] == "+-"
+    assert by_name["s1.xlsx"]["ref_parsed"] is grader.ref
+    assert by_name["s1.xlsx"]["report_html"].startswith("<!DOCTYPE html>")
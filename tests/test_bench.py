@@ -0,0 +1,38 @@
+"""Benchmark harness: baseline comparison, calibration scaling, case registry."""
+from tests.bench.runner import CASES, case_id, compare_to_baseline, load, measure, run, BASELINE_PATH
+
+
+def _data(cal: float, host: str = "a", **times: float) -> dict:
+    return {
+        "machine": {"calibration_sec": cal, "platform": host},
+        "results": {name: {"per_call_sec": t} for name, t in times.items()},
+    }
+
+
+def test_compare_to_baseline_threshold():
+    base = _data(1.0, closure=1.0, compare=2.0, gone=1.0)
+    cur = _data(1.0, closure=1.2, compare=2.6, new=5.0)
+    regs = compare_to_baseline(cur, base, threshold=0.25)
+    assert [r.name for r in regs] == ["compare"]
+    assert round(regs[0].ratio, 2) == 1.3
+
+
+def test_compare_to_baseline_scales_by_calibration():
+    # Другая машина вдвое медленнее: вдвое большее время — не регрессия
+    assert compare_to_baseline(_data(2.0, "b", closure=2.0), _data(1.0, closure=1.0)) == []
+    assert compare_to_baseline(_data(2.0, "b", closure=3.0), _data(1.0, closure=1.0))
+    # Та же машина: калибровка не применяется
+    assert compare_to_baseline(_data(2.0, closure=2.0), _data(1.0, closure=1.0))
+
+
+def test_measure_and_run_single_case():
+    per_call, median, number = measure(lambda: sum(range(100)), repeat=2)
+    assert 0 < per_call <= median and number >= 1
+    results = run(select=["closure[50]"], repeat=1)
+    assert [r.name for r in results] == ["closure[50]"]
+
+
+def test_baseline_covers_registered_cases():
+    run(select=["__none__"])  # регистрирует кейсы
+    names = {case_id(c.name, p) for c in CASES for p in c.params}
+    assert set(load(BASELINE_PATH)["results"]) == names
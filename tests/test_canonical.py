@@ -0,0 +1,80 @@
+"""Canonical FD-set form: equivalent sets hash equally, diff matches closures, repeated answers hit the cache."""
+import random
+
+from app.core import trace
+from app.core.algos import canonical
+from app.core.algos.canonical import equivalent, fd_diff, fd_set, fd_set_hash
+from app.core.algos.fd import closure, minimal_cover
+
+
+def _random_fds(rng, attrs, n):
+    out = []
+    for _ in range(n):
+        lhs = rng.sample(attrs, rng.randint(1, 2))
+        rhs = rng.choice([a for a in attrs if a not in lhs])
+        out.append((lhs, rhs))
+    return out
+
+
+def _implies_all(F, G):
+    return all(rhs in closure(lhs, F) for lhs, rhs in G)
+
+
+def test_different_minimal_covers_same_hash():
+    # два разных минимальных покрытия одного F+
+    F = [(["A"], "B"), (["B"], "C"), (["C"], "A")]
+    G = [(["A"], "C"), (["C"], "B"), (["B"], "A")]
+    assert sorted(minimal_cover(F)) != sorted(minimal_cover(G))
+    assert fd_set_hash(F) == fd_set_hash(G)
+    assert fd_set_hash([(["B"], "C"), (["A", "A"], "B"), (["C"], "A"), (["A", "C"], "B")]) == fd_set_hash(F)
+    assert fd_set_hash([(["A"], "B")]) != fd_set_hash(F)
+    assert len(fd_set(F).canonical.fds) == 6  # A -> B, C; B -> A, C; C -> A, B
+
+
+def test_hash_equality_iff_equivalent():
+    rng = random.Random(3)
+    attrs = list("ABCDEF")
+    for _ in range(300):
+        F = _random_fds(rng, attrs, rng.randint(1, 6))
+        kind = rng.randrange(3)
+        if kind == 0:
+            G = minimal_cover(F)
+        elif kind == 1:  # F в другом порядке плюс выводимые ФЗ
+            X = rng.sample(attrs, 2)
+            G = rng.sample(F, len(F)) + [(X, a) for a in closure(X, F) - set(X)]
+        else:
+            G = _random_fds(rng, attrs, rng.randint(1, 6))
+        same = _implies_all(F, G) and _implies_all(G, F)
+        assert (fd_set_hash(F) == fd_set_hash(G)) == same
+        assert equivalent(F, G) == same
+
+
+def test_diff_matches_closures():
+    rng = random.Random(5)
+    attrs = list("ABCDEFG")
+    for _ in range(200):
+        F_ref, F_stu = _random_fds(rng, attrs, rng.randint(1, 6)), _random_fds(rng, attrs, rng.randint(0, 6))
+        missing, extra = fd_diff(F_ref, F_stu)
+        assert missing == [(l, r) for l, r in F_ref if r not in closure(l, F_stu)]
+        assert extra == [(l, r) for l, r in F_stu if r not in closure(l, F_ref)]
+
+
+def test_repeated_answer_is_cached():
+    F_ref = [(["A"], "B"), (["B"], "C")]
+    canonical._diff.cache_clear()
+    fd_diff(F_ref, [(["B"], "C"), (["A"], "B")])
+    missing, extra = fd_diff(F_ref, [(["A"], "B"), (["B"], "C"), (["A"], "C")])
+    assert (missing, extra) == ([], [])
+    info = canonical._diff.cache_info()
+    assert (info.hits, info.misses) == (0, 2)
+    fd_diff(F_ref, [(["A"], "B"), (["B"], "C")])
+    assert canonical._diff.cache_info().hits == 1
+
+
+def test_implies_all_one_closure_per_lhs():
+    S = canonical.FDSet(canonical.fd_set_key([(["A"], "B"), (["B"], "C"), (["C", "D"], "E")]))
+    queries = [(["A"], "B"), (["A"], "C"), (["A"], "E"), (["D", "C"], "E"), (["C", "D"], "A")]
+    with trace.collect("run", force=True) as tr:
+        assert S.implies_all(queries) == [True, True, False, True, False]
+        S.implies_all(queries[:2])
+    assert tr.to_dict()["totals"] == {"closure": 2, "implication_closure_hit": 1}
@@ -0,0 +1,70 @@
+"""Columnar tables: string pool, zero-copy row views, one copy from the parser to the graph and checks."""
+import pickle
+
+from app.core.algos.discovery import discover_fds
+from app.core.algos.partitions import PartitionIndex
+from app.core.checks import task1, task3
+from app.core.checks.common import canon_attr_for_compare, normalize_cell_value
+from app.core.excel.columnar import ColumnarTable, RowView, StringPool
+from app.core.excel.importer import parse_workbook
+from app.core.semantic.build_graph import build_graph
+from app.core.semantic.query import get_table_1nf
+from tests.synth import SynthSpec, generate_pair, make_schema
+
+ROWS = [["1", "x", "p"], ["1", "x", "p"], ["1", "y", " "], ["2", "y", "q"]]
+
+
+def test_pool_and_row_views_behave_like_lists():
+    t = ColumnarTable.from_rows(ROWS + [["3"]], 3)
+    assert len(t) == 5 and len(t.pool) == 9  # 1 x p y " " 2 q 3 ""
+    assert t[-1] == ["3", "", ""]
+    assert t[0] == t[1] and t[0] == ("1", "x", "p") and t[0] != t[2]
+    assert t[2][1] == "y" and t[2][1:] == ["y", " "]
+    assert [list(r) for r in t[:4]] == ROWS
+    assert t.to_lists()[:4] == ROWS
+    assert isinstance(next(iter(t)), RowView)
+    assert t.column(0) == ["1", "1", "1", "2", "3"]
+
+
+def test_take_shares_pool_and_pickles():
+    pool = StringPool()
+    t = ColumnarTable.from_rows(ROWS, 3, pool)
+    sub = t.take([0, 3])
+    assert sub.pool is pool and sub.to_lists() == [ROWS[0], ROWS[3]]
+    copy = pickle.loads(pickle.dumps(t))
+    assert copy == t and copy.pool.id_of("q") == pool.id_of("q")
+
+
+def test_partitions_and_keys_on_ids_match_lists():
+    headers = ["a", "b", "c"]
+    for rows in (ROWS, ColumnarTable.from_rows(ROWS, 3)):
+        idx = PartitionIndex(headers, rows)
+        assert idx.partition(["a", "b"]) == [[0, 1]]
+        assert idx.counterexamples(["a"], "b") == [(0, 2)]
+        assert idx.scan_key(["a", "b"]).values == ("1", "x")
+        assert idx.scan_key(["c"]).reason == "duplicate"
+        assert idx.scan_key(["b", "c"]).rows == (0, 1)
+    v = PartitionIndex(headers, ColumnarTable.from_rows(ROWS[1:], 3)).scan_key(["c"])
+    assert (v.reason, v.rows, v.values) == ("empty_cell", (1,), (" ",))
+
+
+def test_discovery_on_columnar_matches_lists():
+    schema = make_schema(SynthSpec(n_attrs=8, n_rows=200, seed=3))
+    table = ColumnarTable.from_rows(schema.rows, len(schema.attrs))
+    assert discover_fds(schema.attrs, table).fds == discover_fds(schema.attrs, schema.rows).fds
+
+
+def test_parser_table_reaches_graph_without_copy(tmp_path):
+    ref, _, schema = generate_pair(SynthSpec(n_rows=50), tmp_path)
+    parsed = parse_workbook(ref)
+    table = parsed.tasks[3].tables[0].rows
+    assert isinstance(table, ColumnarTable) and len(table) == 50
+    headers = task1.extract_headers_ref(parsed)
+    dict_ref = {canon_attr_for_compare(a): canon_attr_for_compare(a) for a in headers}
+    graph = build_graph(parsed, "ref", dict_ref, list(dict_ref))
+    assert get_table_1nf(graph, "ref")[1] is table
+    assert task3._get_table_1nf(parsed)[1].to_lists() == schema.rows
+
+
+def test_normalize_cell_value_keeps_inf_as_text():
+    assert normalize_cell_value("inf") == "inf"
@@ -0,0 +1,63 @@
+"""Batch dedup: per-task answer digests, shared TaskResults, byte-identical files graded once, clusters."""
+import shutil
+
+from app.core.batch import BatchGrader
+from app.core.compare import run_checks
+from app.core.dedup import Cluster, TaskResultCache, find_clusters
+from app.core.excel.importer import parse_workbook
+from tests.synth import ErrorRates, NoiseSpec, SynthSpec, build_workbook, make_schema
+
+SPEC = SynthSpec(seed=3)
+SCHEMA = make_schema(SPEC)
+# то же решение, переоформленное: другие стрелки, NBSP, сдвиг колонок
+REFORMATTED = SynthSpec(seed=3, noise=NoiseSpec(arrows=True, nbsp=0.3, shift_cols=2))
+# пропущены ФЗ заданий №4/№6
+DROPPED = SynthSpec(seed=3, errors=ErrorRates(fd_drop=0.3))
+
+
+def _files(tmp_path):
+    build_workbook(SCHEMA, SPEC, "ref").save(tmp_path / "ref.xlsx")
+    group = tmp_path / "group"
+    group.mkdir()
+    build_workbook(SCHEMA, SPEC, "stu").save(group / "a.xlsx")
+    shutil.copy(group / "a.xlsx", group / "a_copy.xlsx")
+    build_workbook(SCHEMA, REFORMATTED, "stu").save(group / "b.xlsx")
+    build_workbook(SCHEMA, DROPPED, "stu").save(group / "c.xlsx")
+    return tmp_path / "ref.xlsx", [group / n for n in ("a.xlsx", "a_copy.xlsx", "b.xlsx", "c.xlsx")]
+
+
+def test_digests_and_cached_results_match_uncached(tmp_path):
+    ref_path, (a, _, b, c) = _files(tmp_path)
+    ref = parse_workbook(ref_path)
+    cache = TaskResultCache()
+    da = run_checks(ref, parse_workbook(a), cache=cache)[3].task_digests
+    results_b, score_b, _, profile_b = run_checks(ref, parse_workbook(b), cache=cache)
+    db = profile_b.task_digests
+    assert db == da and all(da.values())
+    assert cache.hits == 13 and score_b == "++"
+    results_c, score_c, _, profile_c = run_checks(ref, parse_workbook(c), cache=cache)
+    assert [t for t in da if da[t] != profile_c.task_digests[t]] == [4, 6, 7]
+    plain, plain_score, _, profile = run_checks(ref, parse_workbook(c))
+    assert profile is None and plain_score == score_c
+    assert {t: r.status for t, r in plain.items()} == {t: r.status for t, r in results_c.items()}
+    assert results_c[4].missing == plain[4].missing
+
+
+def test_batch_grades_copies_once_and_reports_clusters(tmp_path):
+    ref_path, paths = _files(tmp_path)
+    grader = BatchGrader(ref_path, max_workers=1)
+    results = dict(grader.grade(paths))
+    assert sorted(results) == [0, 1, 2, 3]
+    assert results[1]["duplicate_of"] == str(paths[0]) and results[1]["stu_path"] == str(paths[1])
+    assert "Побайтная копия файла" in results[1]["report_html"]
+    assert results[2]["task_results"][4] is results[0]["task_results"][4]
+    assert results[3]["score_4"] != "++"
+    assert grader.clusters == [Cluster([0, 1, 2], same_file=False)]
+    parallel = BatchGrader(ref_path, max_workers=2)
+    assert {i: r["answer_digest"] for i, r in parallel.grade(paths)} == {i: r["answer_digest"] for i, r in results.items()}
+    assert parallel.clusters == grader.clusters
+
+
+def test_find_clusters():
+    assert find_clusters({0: "x", 1: "", 2: "x", 3: "y"}, {0: "f", 2: "f"}) == [Cluster([0, 2], same_file=True)]
+    assert find_clusters({0: "", 1: ""}) == []
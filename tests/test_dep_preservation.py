@@ -0,0 +1,60 @@
+"""Exact dependency preservation: fixpoint over projections vs brute-force projection of F+."""
+import random
+from itertools import combinations
+
+from app.core.algos.decomposition import dependency_preservation, dependency_preservation_approx, lost_dependencies
+from app.core.algos.fd import FDIndex, closure
+
+
+def _random_fds(rng, attrs, n):
+    out = []
+    for _ in range(n):
+        lhs = rng.sample(attrs, rng.randint(1, 2))
+        rhs = rng.choice([a for a in attrs if a not in lhs])
+        out.append((lhs, rhs))
+    return out
+
+
+def _projection(R, F):
+    """Все X -> A, X ⊆ R, A ∈ (X+ ∩ R) \\ X — проекция F+ на R полным перебором."""
+    out = []
+    for k in range(1, len(R) + 1):
+        for X in combinations(sorted(R), k):
+            out.extend((list(X), a) for a in (closure(X, F) & R) - set(X))
+    return out
+
+
+def test_fd_index_matches_closure():
+    rng = random.Random(1)
+    attrs = list("ABCDEFG")
+    for _ in range(200):
+        F = _random_fds(rng, attrs, rng.randint(0, 8))
+        index = FDIndex(F)
+        X = rng.sample(attrs, rng.randint(0, 3))
+        assert index.closure(X) == closure(X, F)
+    assert FDIndex([([], "A"), (["A"], "B")]).closure([]) == {"A", "B"}
+
+
+def test_preserved_through_union_of_projections():
+    F = [(["A"], "B"), (["B"], "C"), (["C"], "A")]
+    relations = [("R1", {"A", "B"}), ("R2", {"B", "C"})]
+    # C -> A не лежит ни в одном отношении, но следует из C -> B, B -> A
+    assert not dependency_preservation_approx(F, relations)
+    assert dependency_preservation(F, relations)
+
+
+def test_lost_dependency_reported():
+    F = [(["A", "B"], "C"), (["C"], "B")]
+    relations = [("R1", {"A", "C"}), ("R2", {"B", "C"})]
+    assert lost_dependencies(F, relations) == [(["A", "B"], "C")]
+
+
+def test_matches_brute_force_projection():
+    rng = random.Random(7)
+    attrs = list("ABCDEF")
+    for _ in range(150):
+        F = _random_fds(rng, attrs, rng.randint(1, 7))
+        relations = [(f"R{i}", set(rng.sample(attrs, rng.randint(2, 4)))) for i in range(rng.randint(1, 3))]
+        G = [fd for _, R in relations for fd in _projection(R, F)]
+        expected = [(lhs, rhs) for lhs, rhs in F if rhs not in closure(lhs, G)]
+        assert lost_dependencies(F, relations) == expected
@@ -38,3 +38,11 @@ def test_minimal_cover_redundant():
     for lhs, rhs in G:
         attrs.add(rhs)
     assert attrs >= {"B", "C"}
+
+
+def test_minimal_cover_keeps_one_of_equivalent_fds():
+    # AB->C сводится к A->C; оба экземпляра нельзя удалить как «избыточные» друг относительно друга
+    F = [(["A"], "C"), (["A", "B"], "C"), (["A"], "C")]
+    G = minimal_cover(F)
+    assert G == [(["A"], "C")]
+    assert closure(["A"], G) == {"A", "C"}
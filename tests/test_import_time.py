@@ -0,0 +1,65 @@
+"""Import-time budget (python -X importtime): headless core without Qt, lazy openpyxl, fast GUI start."""
+import importlib.util
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Бюджеты с запасом на медленные CI-машины (локально в 3–5 раз меньше)
+CORE_BUDGET_SEC = 0.5
+GUI_BUDGET_SEC = 1.5
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _importtime(code: str) -> dict[str, int]:
+    """Run code under -X importtime in a fresh interpreter; module -> cumulative µs."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    out: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if m:
+            out[m.group(4)] = int(m.group(2))
+    return out
+
+
+def test_core_never_imports_qt_or_openpyxl():
+    code = (
+        "import pkgutil, importlib, app.core\n"
+        "for m in pkgutil.walk_packages(app.core.__path__, 'app.core.'):\n"
+        "    importlib.import_module(m.name)\n"
+    )
+    mods = _importtime(code)
+    assert not [m for m in mods if m.startswith("PySide6")]
+    assert not [m for m in mods if m.startswith("openpyxl")], "openpyxl должен грузиться при разборе файла"
+
+
+def test_core_import_budget():
+    mods = _importtime("import app.core.compare, app.core.batch")
+    total = mods["app.core.compare"] + mods["app.core.batch"]
+    assert total / 1e6 < CORE_BUDGET_SEC
+
+
+@pytest.mark.skipif(importlib.util.find_spec("PySide6") is None, reason="PySide6 not installed")
+def test_gui_import_is_lazy_and_within_budget():
+    mods = _importtime("import app.main, app.ui.main_window")
+    assert "app.main" in mods
+    assert not [m for m in mods if m.startswith("openpyxl")]
+    assert "app.core.compare" not in mods and "app.core.checks.task1" not in mods
+    assert mods["app.ui.main_window"] / 1e6 < GUI_BUDGET_SEC
+
+
+def test_entry_module_does_not_import_qt():
+    """Процессы пула (spawn) заново импортируют app.main — без Qt."""
+    mods = _importtime("import app.main")
+    assert not [m for m in mods if m.startswith("PySide6")]
@@ -0,0 +1,111 @@
+"""Reference library: folder indexed in SQLite by task 1 fingerprint, incremental sync, nearest variant."""
+import os
+import pickle
+import sqlite3
+
+import pytest
+
+from app.core.batch import BatchGrader
+from app.core.compare import compare
+from app.core.excel.importer import parse_workbook
+from app.core.library import LIBRARY_DB_NAME, ReferenceLibrary, dump_bundle, load_bundle, main
+from app.core.variants import load_reference
+from tests.synth import SynthSpec, build_sheets_workbook, build_workbook, make_schema
+
+SPECS = [SynthSpec(n_attrs=n, n_rows=12, seed=n) for n in (6, 7, 8)]
+SCHEMAS = [make_schema(s) for s in SPECS]
+
+
+def _library(tmp_path):
+    lib = tmp_path / "refs"
+    lib.mkdir()
+    build_workbook(SCHEMAS[0], SPECS[0], "ref").save(lib / "v6.xlsx")
+    build_sheets_workbook([("A", SCHEMAS[1], SPECS[1]), ("B", SCHEMAS[2], SPECS[2])], "ref").save(lib / "v78.xlsx")
+    (lib / "broken.xlsx").write_bytes(b"not a workbook")
+    return lib
+
+
+def _student(tmp_path, i, name="stu.xlsx"):
+    path = tmp_path / name
+    build_workbook(SCHEMAS[i], SPECS[i], "stu").save(path)
+    return path
+
+
+def test_sync_is_incremental(tmp_path):
+    lib = _library(tmp_path)
+    library = ReferenceLibrary(lib)
+    assert library.sync() == (3, 0)
+    assert (lib / LIBRARY_DB_NAME).exists()
+    assert [(f, s) for f, s, _ in library.variants()] == [("v6.xlsx", "Решение"), ("v78.xlsx", "A"), ("v78.xlsx", "B")]
+    assert library.sync() == (0, 0)
+    (lib / "v6.xlsx").unlink()
+    os.utime(lib / "v78.xlsx", ns=(0, 0))
+    assert library.sync() == (1, 1)
+    assert len(library) == 2
+    library.close()
+
+
+def test_exact_and_nearest_match(tmp_path):
+    library = ReferenceLibrary(_library(tmp_path))
+    library.sync()
+    for i, sheet in enumerate(["Решение", "A", "B"]):
+        m = library.match(parse_workbook(_student(tmp_path, i)))
+        assert m.parsed.sheet_name == sheet and m.similarity == 1.0
+    assert m.path == str(tmp_path / "refs" / "v78.xlsx")
+    # 9 атрибутов: точного варианта нет, ближайший — 8 из 9 общих
+    other = make_schema(SynthSpec(n_attrs=9, seed=1))
+    path = tmp_path / "other.xlsx"
+    build_workbook(other, SynthSpec(n_attrs=9, seed=1), "stu").save(path)
+    m = library.match(parse_workbook(path))
+    assert m.parsed.sheet_name == "B" and abs(m.similarity - 8 / 9) < 1e-9
+    # в процесс пула передаётся только путь, пакеты читаются заново
+    copy = pickle.loads(pickle.dumps(library))
+    assert copy.by_name("A", "v78.xlsx").tasks[1].tables[0].headers == SCHEMAS[1].attrs
+
+
+def test_bundles_are_data_only(tmp_path):
+    lib = _library(tmp_path)
+    parsed = parse_workbook(lib / "v6.xlsx")
+    back = load_bundle(dump_bundle(parsed))
+    assert back.sheet_name == parsed.sheet_name and sorted(back.tasks) == sorted(parsed.tasks)
+    for num, t in parsed.tasks.items():
+        assert back.tasks[num].text_lines == t.text_lines
+        assert [(b.headers, b.rows.to_lists()) for b in back.tasks[num].tables] == [
+            (x.headers, x.rows.to_lists()) for x in t.tables
+        ]
+    library = ReferenceLibrary(lib)
+    library.sync()
+    db = sqlite3.connect(lib / LIBRARY_DB_NAME)  # запись в общей папке подменена
+    db.execute("UPDATE variants SET bundle = ? WHERE path = 'v6.xlsx'", (pickle.dumps(parsed),))
+    db.commit()
+    db.close()
+    with pytest.raises(ValueError):
+        ReferenceLibrary(lib).by_name("Решение", "v6.xlsx")
+    fresh = ReferenceLibrary(lib)
+    assert fresh.sync() == (1, 0)  # испорченная книга переиндексирована
+    assert fresh.by_name("Решение", "v6.xlsx").tasks[1].tables[0].headers == SCHEMAS[0].attrs
+    with pytest.raises(ValueError):
+        load_bundle('{"sheet": "x", "strings": ["a"], "tasks": [{"num": 1, "text_lines": [], '
+                    '"tables": [{"headers": ["A"], "rows": 1, "columns": [[5]]}]}]}')
+
+
+def test_compare_and_batch_with_library_folder(tmp_path):
+    lib = _library(tmp_path)
+    assert isinstance(load_reference(lib), ReferenceLibrary)
+    result = compare(lib, _student(tmp_path, 1))
+    assert result["ref_path"].endswith("v78.xlsx") and result["ref_sheet"] == "A"
+    assert result["fingerprint_match"] and result["ref_variants"] == 3
+    students = [_student(tmp_path, i, f"s{i}.xlsx") for i in (2, 0)]
+    grader = BatchGrader(lib, max_workers=2)
+    results = dict(grader.grade(students))
+    assert [results[k]["ref_sheet"] for k in (0, 1)] == ["B", "Решение"]
+    assert all(r["fingerprint_match"] for r in results.values())
+    assert results[0]["ref_parsed"].sheet_name == "B"
+
+
+def test_cli(tmp_path, capsys):
+    lib = _library(tmp_path)
+    assert main([str(lib)]) == 0
+    out = capsys.readouterr().out
+    assert "вариантов: 3" in out and "v78.xlsx / B" in out
+    assert main([]) == 2
@@ -0,0 +1,91 @@
+"""Chase lossless-join test: textbook cases, binary criterion, where key containment alone is wrong."""
+import random
+
+from app.core.algos.decomposition import lossless_join_basic, lossless_join_chase
+from app.core.algos.fd import closure
+
+
+def test_binary_decomposition():
+    U = {"A", "B", "C"}
+    F = [(["A"], "B")]
+    res = lossless_join_chase(U, F, [("R1", {"A", "B"}), ("R2", {"A", "C"})])
+    assert res.lossless and res.fired == [(["A"], "B")] and res.steps == 1
+    assert not lossless_join_chase(U, F, [("R1", {"A", "B"}), ("R2", {"B", "C"})]).lossless
+
+
+def test_lossless_without_relation_holding_a_key():
+    # Ключ U — {A, D}; ни одно отношение его не содержит, но соединение без потерь:
+    # R1 ⋈ R2 по A даёт ABC, затем ⋈ R3 по C (C -> D)
+    U = {"A", "B", "C", "D"}
+    F = [(["A"], "B"), (["B"], "C"), (["C"], "D")]
+    relations = [("R1", {"A", "B"}), ("R2", {"B", "C"}), ("R3", {"C", "D"})]
+    res = lossless_join_chase(U, F, relations)
+    assert res.lossless and res.fired == [(["B"], "C"), (["C"], "D")]
+    assert not lossless_join_chase(U, F[:2], relations).lossless
+
+
+def test_trivial_cases():
+    U = {"A", "B"}
+    assert lossless_join_chase(U, [], [("R", {"A", "B"})]).lossless
+    assert lossless_join_chase(U, [], [("R", {"A", "B"})]).steps == 0
+    assert not lossless_join_chase(U, [], [("R1", {"A"}), ("R2", {"B"})]).lossless
+
+
+def test_key_containment_is_not_enough():
+    # R1 содержит ключ AC, но R1 ∩ R2 = ∅ — декартово произведение, потери
+    U = {"A", "B", "C"}
+    F = [(["A"], "B")]
+    relations = [("R1", {"A", "C"}), ("R2", {"B"})]
+    assert lossless_join_basic(U, F, relations)
+    assert not lossless_join_chase(U, F, relations).lossless
+
+
+def test_matches_binary_criterion():
+    rng = random.Random(3)
+    attrs = list("ABCDEF")
+    U = set(attrs)
+    for _ in range(300):
+        F = []
+        for _ in range(rng.randint(0, 6)):
+            lhs = rng.sample(attrs, rng.randint(1, 2))
+            F.append((lhs, rng.choice([a for a in attrs if a not in lhs])))
+        r1 = set(rng.sample(attrs, rng.randint(1, 5)))
+        r2 = (U - r1) | set(rng.sample(sorted(r1), rng.randint(0, len(r1))))
+        common = r1 & r2
+        # Две схемы: без потерь <=> R1 ∩ R2 -> R1 или R1 ∩ R2 -> R2
+        expected = r1 <= closure(common, F) or r2 <= closure(common, F)
+        relations = [("R1", r1), ("R2", r2)]
+        assert lossless_join_chase(U, F, relations).lossless == expected
+
+
+def _naive_chase(U, F, relations):
+    """Таблица из строковых символов, все ФЗ до неподвижной точки."""
+    cols = sorted(U)
+    rows = [{a: "a" + a if a in attrs else f"b{i}{a}" for a in cols} for i, (_, attrs) in enumerate(relations)]
+    changed = True
+    while changed:
+        changed = False
+        for lhs, rhs in F:
+            for r1 in rows:
+                for r2 in rows:
+                    if all(r1[x] == r2[x] for x in lhs) and r1[rhs] != r2[rhs]:
+                        keep, drop = sorted((r1[rhs], r2[rhs]))  # "a…" < "b…"
+                        for r in rows:
+                            if r[rhs] == drop:
+                                r[rhs] = keep
+                        changed = True
+    return any(all(r[a] == "a" + a for a in cols) for r in rows)
+
+
+def test_matches_naive_chase():
+    rng = random.Random(11)
+    attrs = list("ABCDEF")
+    for _ in range(300):
+        F = []
+        for _ in range(rng.randint(0, 7)):
+            lhs = rng.sample(attrs, rng.randint(1, 2))
+            F.append((lhs, rng.choice([a for a in attrs if a not in lhs])))
+        relations = [(f"R{i}", set(rng.sample(attrs, rng.randint(1, 4)))) for i in range(rng.randint(2, 4))]
+        U = set().union(*(r for _, r in relations))
+        F = [(lhs, rhs) for lhs, rhs in F if rhs in U and set(lhs) <= U]
+        assert lossless_join_chase(U, F, relations).lossless == _naive_chase(U, F, relations)
@@ -0,0 +1,62 @@
+"""Stripped partitions and data-driven FD validation with counterexample row pairs."""
+from app.core.algos.partitions import (
+    PartitionIndex,
+    column_partition,
+    partition_product,
+    validate_fds,
+)
+from app.core.compare import compare
+from tests.synth import ErrorRates, SynthSpec, generate_pair
+
+HEADERS = ["a", "b", "c"]
+ROWS = [
+    ["1", "x", "p"],
+    ["1", "x", "p"],
+    ["1", "y", "q"],
+    ["2", "y", "q"],
+    ["3", "z", "q"],
+]
+
+
+def test_column_partition_strips_singletons():
+    assert column_partition(["1", "1", "1", "2", "3"]) == [[0, 1, 2]]
+    assert column_partition(["x", "x", "y", "y", "z"]) == [[0, 1], [2, 3]]
+
+
+def test_partition_product():
+    p = column_partition(["1", "1", "1", "2", "3"])
+    q = column_partition(["x", "x", "y", "y", "z"])
+    assert partition_product(p, q, 5) == [[0, 1]]
+    idx = PartitionIndex(HEADERS, ROWS)
+    assert idx.partition(["a", "b"]) == [[0, 1]]
+    assert idx.partition([]) == [[0, 1, 2, 3, 4]]
+
+
+def test_holds_and_counterexamples():
+    idx = PartitionIndex(HEADERS, ROWS)
+    assert idx.holds(["b"], "c")
+    assert idx.holds(["a", "b"], "c")
+    assert not idx.holds(["a"], "b")
+    assert idx.counterexamples(["a"], "b") == [(0, 2)]
+    assert idx.counterexamples(["c"], "a") == [(2, 3)]
+
+
+def test_validate_fds_skips_unknown_attributes():
+    F = [(["a"], "b"), (["b"], "c"), (["a"], "нет такого"), (["a"], "c")]
+    bad = validate_fds(HEADERS, ROWS, F)
+    assert [(v.lhs, v.rhs, v.pairs) for v in bad] == [(("a",), "b", ((0, 2),)), (("a",), "c", ((0, 2),))]
+
+
+def test_validate_fds_large_table():
+    rows = [[str(i), str(i % 100), str(i % 100 % 7)] for i in range(20000)]
+    rows[150][2] = "сбой"
+    bad = validate_fds(HEADERS, rows, [(["a"], "b"), (["b"], "c"), (["a", "b"], "c")])
+    assert [(v.lhs, v.rhs, v.pairs) for v in bad] == [(("b",), "c", ((50, 150),))]
+
+
+def test_task4_warns_when_student_fds_contradict_own_table(tmp_path):
+    ref, stu, _ = generate_pair(SynthSpec(errors=ErrorRates(cell_corrupt=0.3)), tmp_path)
+    r4 = compare(ref, stu)["task_results"][4]
+    assert r4.status == "WARN"
+    assert r4.details["data_violations"]
+    assert "противоречит таблице 1НФ" in r4.explanation
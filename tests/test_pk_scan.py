@@ -0,0 +1,75 @@
+"""Data-level key checks: one hashed pass per key over the 1NF rows (task 3 hint, task 5 PK and candidate keys)."""
+from app.core.algos.partitions import KeyViolation, PartitionIndex
+from app.core.checks import task5
+from app.core.report import _details_ru
+from app.core.semantic.triples import TripleStore
+
+HEADERS = ["студент", "курс", "оценка", "номер зачётки"]
+ROWS = [
+    ["Иванов", "БД", "5", "101"],
+    ["Иванов", "ОС", "4", "101"],
+    ["Петров", "БД", "4", "102"],
+    ["Сидоров", "БД", "3", "103"],
+]
+DICT = {a: a for a in HEADERS}
+F = [(["студент", "курс"], "оценка"), (["студент"], "номер зачётки"), (["номер зачётки"], "студент")]
+
+
+def _store(pk: list[str], rows: list[list[str]], headers: list[str] = HEADERS) -> TripleStore:
+    g = TripleStore()
+    for role in ("ref", "stu"):
+        g.add(f"sol:{role}:task:5", "primary_key_contains", list(pk))
+    g.add("sol:stu:task:3", "table_1nf_headers", list(headers))
+    g.add("sol:stu:task:3", "table_1nf_rows", [list(r) for r in rows])
+    return g
+
+
+def test_scan_key_finds_first_duplicate_and_empty_cell():
+    idx = PartitionIndex(HEADERS, ROWS)
+    assert idx.scan_key(["студент", "курс"]) is None
+    assert idx.scan_key(["студент"]) == KeyViolation(("студент",), "duplicate", (0, 1), ("Иванов",))
+    rows = [list(r) for r in ROWS]
+    rows[2][1] = "  "
+    v = PartitionIndex(HEADERS, rows).scan_key(["студент", "курс"])
+    assert (v.reason, v.rows) == ("empty_cell", (2,))
+    assert idx.scan_key(["нет такого"]) is None
+
+
+def test_scan_key_large_table():
+    rows = [[str(i), str(i % 1000), "x", str(i)] for i in range(50000)]
+    rows[40000][0] = "777"
+    v = PartitionIndex(HEADERS, rows).scan_key(["студент"])
+    assert (v.reason, v.rows) == ("duplicate", (777, 40000))
+
+
+def test_task5_passes_on_unique_key():
+    r = task5.check(_store(["студент", "курс"], ROWS), _store(["студент", "курс"], ROWS), DICT, F)
+    assert r.status == "PASS"
+
+
+def test_task5_warns_on_duplicate_pk_rows():
+    rows = ROWS + [["Петров", "БД", "5", "102"]]
+    r = task5.check(_store(["студент", "курс"], ROWS), _store(["студент", "курс"], rows), DICT, F)
+    assert r.status == "WARN"
+    assert r.details["reason"] == "pk_duplicate"
+    assert "строки 3 и 5" in r.details["pk_violation"]
+    assert "дубликат по первичному ключу" in _details_ru(r.details, 5)
+
+
+def test_task5_checks_other_candidate_keys():
+    rows = [list(r) for r in ROWS]
+    rows[3][3] = "102"  # {номер зачётки, курс} — тоже ключ, теперь с дубликатом
+    r = task5.check(_store(["студент", "курс"], ROWS), _store(["студент", "курс"], rows), DICT, F)
+    assert r.status == "WARN"
+    assert "pk_violation" not in r.details
+    assert r.details["key_violations"] == ["{курс, номер зачётки}: строки 3 и 4 совпадают по ключу (БД, 102)"]
+
+
+def test_task5_skips_data_check_when_pk_column_missing():
+    headers = ["студент", "оценка", "номер зачётки"]  # нет столбца «курс»
+    rows = [[r[0], r[2], r[3]] for r in ROWS]
+    r = task5.check(_store(["студент", "курс"], ROWS), _store(["студент", "курс"], rows, headers), DICT, F)
+    assert r.status == "PASS"  # без «курс» строки 1 и 2 не дубликаты по ключу
+    assert "pk_violation" not in r.details
+    assert r.details["pk_columns_missing"] == ["курс"]
+    assert "столбцов первичного ключа нет в таблице 1НФ" in _details_ru(r.details, 5)
@@ -0,0 +1,77 @@
+"""FD projection: minimal cover of π_R(F+) against brute force, limits, NF verdicts on non-aligned relations."""
+import random
+from itertools import combinations
+
+from app.core.algos.fd import closure
+from app.core.algos.keys import candidate_keys
+from app.core.algos.normal_forms import check_3nf
+from app.core.algos.projection import BCNFCheck, FDProjector, project_fds
+
+
+def _equivalent(F, G, R):
+    return all(rhs in closure(lhs, G) for lhs, rhs in F) and all(rhs in closure(lhs, F) for lhs, rhs in G)
+
+
+def _brute_projection(R, F):
+    return [
+        (list(X), a)
+        for k in range(len(R) + 1)
+        for X in combinations(sorted(R), k)
+        for a in (closure(X, F) & R) - set(X)
+    ]
+
+
+def test_implied_fd_through_dropped_attribute():
+    # A -> B -> C, отношение (A, C): A -> C выводится только через B
+    F = [(["A"], "B"), (["B"], "C")]
+    assert project_fds({"A", "C"}, F).fds == [(["A"], "C")]
+    # отношение (A, B, D) с D -> C, C -> B: D -> B следует из F, а не из ФЗ внутри R
+    F2 = [(["D"], "C"), (["C"], "B"), (["A"], "D")]
+    fds = project_fds({"A", "B", "D"}, F2).fds
+    assert sorted(fds) == [(["A"], "D"), (["D"], "B")]
+
+
+def test_matches_brute_force():
+    rng = random.Random(5)
+    attrs = list("ABCDEFG")
+    for _ in range(200):
+        F = []
+        for _ in range(rng.randint(0, 7)):
+            lhs = rng.sample(attrs, rng.randint(1, 2))
+            F.append((lhs, rng.choice([a for a in attrs if a not in lhs])))
+        R = set(rng.sample(attrs, rng.randint(1, 5)))
+        proj = FDProjector(F).project(R)
+        assert proj.complete
+        assert all(set(lhs) <= R and rhs in R and rhs not in lhs for lhs, rhs in proj.fds)
+        assert _equivalent(proj.fds, _brute_projection(R, F), R)
+
+
+def test_memoized_per_schema_and_limits():
+    F = [([f"A{i}"], f"A{i + 1}") for i in range(30)]
+    p = FDProjector(F, max_attrs=8)
+    assert p.project({"A0", "A5", "A9"}).fds == [(["A0"], "A5"), (["A5"], "A9")]
+    assert p.project({"A9", "A5", "A0"}) == p.project({"A0", "A5", "A9"})
+    wide = p.project({f"A{i}" for i in range(10)})
+    assert not wide.complete and len(wide.fds) == 9  # только ФЗ F внутри R
+    assert project_fds({"A0", "A2"}, F) == project_fds({"A2", "A0"}, list(F))
+
+
+def test_bcnf_violation_timeout_is_not_bcnf():
+    R = {f"A{i}" for i in range(12)}
+    F = [(["A0", "A1"], "A2")]
+    assert FDProjector(F, time_budget=None).bcnf_violation(R) == BCNFCheck((["A0", "A1"], {"A0", "A1", "A2"}))
+    timed_out = FDProjector([], time_budget=1e-9).bcnf_violation(R)
+    assert timed_out.violation is None and not timed_out.complete
+    assert FDProjector([], time_budget=None).bcnf_violation(R) == BCNFCheck()
+
+
+def test_3nf_verdict_uses_implied_fds():
+    # Отношение (A, C, D): A — ключ, C -> D выводится через B (C -> B, B -> D).
+    # Фильтр F видит только A -> C: ключ AD и «нарушение» A -> C; проекция — ключ A и C -> D
+    F = [(["A"], "C"), (["C"], "B"), (["B"], "D")]
+    R = {"A", "C", "D"}
+    filtered = [(lhs, rhs) for lhs, rhs in F if set(lhs) <= R and rhs in R]
+    assert check_3nf(R, filtered, candidate_keys(R, filtered))[1] == [(["A"], "C")]
+    fds = project_fds(R, F).fds
+    assert candidate_keys(R, fds) == [frozenset({"A"})]
+    assert check_3nf(R, fds, candidate_keys(R, fds)) == (False, [(["C"], "D")])
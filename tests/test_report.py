@@ -0,0 +1,30 @@
+"""HTML report: per-task rendering with pagination of long row lists."""
+from app.core.report import build_task_html, task_page_count
+from app.core.result import TaskResult
+
+
+def _big_task3(n: int) -> TaskResult:
+    rows = [[str(i), f"значение {i}"] for i in range(n)]
+    return TaskResult(status="WARN", expected=rows, actual=rows[:10], missing=rows[10:], explanation="строки")
+
+
+def test_task_page_count():
+    assert task_page_count(TaskResult(status="PASS")) == 1
+    assert task_page_count(_big_task3(120), page_size=50) == 3
+
+
+def test_build_task_html_pages_rows():
+    r = _big_task3(120)
+    first = build_task_html(3, r, page=0, page_size=50)
+    last = build_task_html(3, r, page=2, page_size=50)
+    assert "<td>1</td><td>0</td>" in first
+    assert "значение 59" in first and "значение 60" not in first
+    assert "<td>101</td><td>100</td>" in last
+    assert "значение 119" in last
+    assert "<th>№</th><th colspan='2'>Строка данных</th>" in first  # заголовок над всеми ячейками строки
+
+
+def test_build_task_html_fd_lists_are_not_tables():
+    r = TaskResult(status="FAIL", expected=[(["a"], "b")], actual=[], missing=[(["a"], "b")])
+    html = build_task_html(4, r)
+    assert "a → b" in html
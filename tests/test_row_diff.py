@@ -0,0 +1,73 @@
+"""Row-fingerprint multiset diff for the task 3 table: counts, collisions, one-cell near matches."""
+import random
+
+from app.core.algos import row_diff
+from app.core.algos.row_diff import NearMatch, diff_rows
+from app.core.compare import compare
+from tests.synth import ErrorRates, SynthSpec, generate_pair
+
+REF = [["1", "a", "x"], ["1", "a", "x"], ["2", "b", "y"], ["3", "c", "z"]]
+
+
+def _naive(ref, stu):
+    pool = [tuple(r) for r in stu]
+    missing = []
+    for r in ref:
+        if tuple(r) in pool:
+            pool.remove(tuple(r))
+        else:
+            missing.append(tuple(r))
+    return sorted(missing), sorted(pool)
+
+
+def test_equal_multisets_in_any_order():
+    d = diff_rows(REF, list(reversed(REF)), 3)
+    assert (d.matched, d.missing, d.extra, d.near) == (4, [], [], [])
+
+
+def test_duplicates_and_near_matches():
+    stu = [["1", "a", "x"], ["2", "b", "Y"], ["3", "c", "z"], ["9", "9", "9"]]
+    d = diff_rows(REF, stu, 3)
+    assert d.matched == 2
+    assert d.missing == [1, 2]
+    assert d.extra == [1, 3]
+    assert d.near == [NearMatch(ref_row=2, stu_row=1, column=2)]
+
+
+def test_matches_naive_diff_on_random_tables():
+    rng = random.Random(5)
+    for _ in range(50):
+        ref = [[rng.choice("ab"), rng.choice("xyz"), rng.choice("01")] for _ in range(rng.randint(0, 12))]
+        stu = [[rng.choice("ab"), rng.choice("xyz"), rng.choice("012")] for _ in range(rng.randint(0, 12))]
+        d = diff_rows(ref, stu, 3)
+        missing = sorted(tuple(ref[i]) for i in d.missing)
+        extra = sorted(tuple(stu[j]) for j in d.extra)
+        assert (missing, extra) == _naive(ref, stu)
+        for m in d.near:
+            assert sum(a != b for a, b in zip(ref[m.ref_row], stu[m.stu_row])) == 1
+
+
+def test_hash_collisions_are_verified(monkeypatch):
+    monkeypatch.setattr(row_diff, "_fingerprint", lambda cells: 0)
+    d = diff_rows(REF, [["3", "c", "z"], ["1", "a", "q"], ["1", "a", "x"]], 3)
+    assert d.matched == 2
+    assert d.missing == [1, 2]
+    assert d.extra == [1]
+
+
+def test_large_table():
+    ref = [[str(i), f"name-{i % 300}", str(i % 7)] for i in range(10000)]
+    stu = [list(r) for r in ref[::-1]]
+    stu[10][1] = "опечатка"
+    d = diff_rows(ref, stu, 3)
+    assert d.matched == 9999
+    assert d.near == [NearMatch(ref_row=9989, stu_row=10, column=1)]
+
+
+def test_task3_reports_cell_typos(tmp_path):
+    ref, stu, _ = generate_pair(SynthSpec(n_rows=30, errors=ErrorRates(cell_corrupt=0.2)), tmp_path)
+    r3 = compare(ref, stu)["task_results"][3]
+    assert r3.status == "WARN"
+    assert r3.details["near_matches"]
+    assert "ожидалось" in r3.details["near_matches"][0]
+    assert "отличаются от эталонных одной ячейкой" in r3.explanation
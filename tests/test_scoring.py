@@ -1,5 +1,6 @@
 """Unit tests for task #4 scoring ++/+-/-+/--."""
 import pytest
+from app.core.algos.canonical import fd_diff
 from app.core.scoring import score_fd_coverage
 
 
@@ -41,3 +42,11 @@ def test_score_empty_fref_no_false_plus():
     ratio, label = score_fd_coverage(F_ref, F_stu)
     assert ratio == 0.0
     assert label == "—"
+
+
+def test_score_from_precomputed_missing():
+    F_ref = [(["A"], "B"), (["B"], "C"), (["A"], "C"), (["C"], "D")]
+    F_stu = [(["A"], "B"), (["B"], "C")]
+    missing, _ = fd_diff(F_ref, F_stu)
+    assert missing == [(["C"], "D")]
+    assert score_fd_coverage(F_ref, F_stu, missing=missing) == score_fd_coverage(F_ref, F_stu) == (0.75, "+-")
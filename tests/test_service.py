@@ -0,0 +1,144 @@
+"""HTTP grading service: upload, poll result, multipart, unknown ids, 429 when the queue is full, broken pool."""
+import asyncio
+import json
+import os
+import signal
+
+import pytest
+
+from app.service import GradingService, ServiceError, _ping, main
+from tests.synth import ErrorRates, SynthSpec, build_workbook, make_schema
+
+SPEC = SynthSpec(seed=3)
+SCHEMA = make_schema(SPEC)
+
+
+async def _request(port, method, target, body=b"", headers=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = [f"{method} {target} HTTP/1.1", "Host: localhost", f"Content-Length: {len(body)}"]
+    head += [f"{k}: {v}" for k, v in (headers or {}).items()]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    status_line, _, rest = raw.partition(b"\r\n")
+    head_raw, _, payload = rest.partition(b"\r\n\r\n")
+    return int(status_line.split()[1]), head_raw.decode("latin-1"), json.loads(payload)
+
+
+async def _wait(port, job_id):
+    for _ in range(200):
+        status, _, job = await _request(port, "GET", f"/results/{job_id}")
+        assert status == 200
+        if job["status"] in ("done", "error"):
+            return job
+        await asyncio.sleep(0.05)
+    raise AssertionError("проверка не завершилась")
+
+
+def _books(tmp_path):
+    build_workbook(SCHEMA, SPEC, "ref").save(tmp_path / "lab2.xlsx")
+    build_workbook(SCHEMA, SPEC, "stu").save(tmp_path / "good.xlsx")
+    build_workbook(SCHEMA, SynthSpec(seed=3, errors=ErrorRates(fd_drop=0.5)), "stu").save(tmp_path / "bad.xlsx")
+    return (tmp_path / "good.xlsx").read_bytes(), (tmp_path / "bad.xlsx").read_bytes()
+
+
+def test_grade_and_poll_results(tmp_path):
+    good, bad = _books(tmp_path)
+
+    async def scenario():
+        service = GradingService({"lab2": tmp_path / "lab2.xlsx"}, max_workers=1)
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            status, _, sent = await _request(port, "POST", "/grade?ref=lab2&name=ivanov.xlsx", good)
+            assert status == 202 and sent["status"] in ("queued", "running")
+            job = await _wait(port, sent["id"])
+            assert job["status"] == "done" and job["name"] == "ivanov.xlsx"
+            assert job["result"]["score_4"] == "++" and job["result"]["tasks"]["1"]["status"] == "PASS"
+            assert "ivanov.xlsx" in job["result"]["report_html"]
+
+            boundary = "XyZ"
+            form = (
+                f'--{boundary}\r\nContent-Disposition: form-data; name="ref"\r\n\r\nlab2\r\n'
+                f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="petrov.xlsx"\r\n'
+                "Content-Type: application/octet-stream\r\n\r\n"
+            ).encode() + bad + f"\r\n--{boundary}--\r\n".encode()
+            ctype = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+            status, _, sent = await _request(port, "POST", "/grade", form, ctype)
+            job = await _wait(port, sent["id"])
+            assert job["name"] == "petrov.xlsx" and job["result"]["score_4"] != "++"
+
+            bogus = (
+                f'--{boundary}\r\nContent-Disposition: form-data; name="ref"\r\n'
+                f"Content-Type: text/plain; charset=bogus\r\n\r\nlab2\r\n--{boundary}--\r\n"
+            ).encode()
+            status, _, payload = await _request(port, "POST", "/grade", bogus, ctype)
+            assert status == 400 and "bogus" in payload["error"]
+
+            status, _, sent = await _request(port, "POST", "/grade?ref=lab2", b"not a workbook")
+            assert (await _wait(port, sent["id"]))["status"] == "error"
+            assert (await _request(port, "POST", "/grade?ref=lab9", good))[0] == 404
+            assert (await _request(port, "GET", "/results/nope"))[0] == 404
+            assert (await _request(port, "GET", "/grade"))[0] == 405
+            assert (await _request(port, "GET", "/references"))[2] == {"references": ["lab2"]}
+        finally:
+            await service.close()
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_rejects_with_429(tmp_path):
+    good, _ = _books(tmp_path)
+
+    async def scenario():
+        service = GradingService({"lab2": tmp_path / "lab2.xlsx"}, max_workers=1, queue_size=1)
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        for task in service._dispatchers:  # все процессы пула заняты: очередь не разбирается
+            task.cancel()
+        try:
+            first = service.submit("lab2", "a.xlsx", good)
+            with pytest.raises(ServiceError) as e:
+                service.submit("lab2", "b.xlsx", good)
+            assert e.value.status == 429
+            status, head, payload = await _request(port, "POST", "/grade?ref=lab2", good)
+            assert status == 429 and "Retry-After: 1" in head and "error" in payload
+            assert list(service.jobs) == [first.id] and first.status == "queued"
+        finally:
+            await service.close()
+
+    asyncio.run(scenario())
+
+
+def test_broken_pool_is_replaced(tmp_path):
+    good, _ = _books(tmp_path)
+
+    async def scenario():
+        service = GradingService({"lab2": tmp_path / "lab2.xlsx"}, max_workers=1)
+        await service.start(port=0)
+        try:
+            old = service._pool
+            pid = await asyncio.get_running_loop().run_in_executor(old, _ping)
+            os.kill(pid, signal.SIGKILL)  # процесс пула убит извне (OOM killer)
+            first = service.submit("lab2", "a.xlsx", good)
+            for _ in range(200):
+                if first.status == "error":
+                    break
+                await asyncio.sleep(0.05)
+            assert first.status == "error" and service._pool is not old
+            second = service.submit("lab2", "b.xlsx", good)
+            for _ in range(200):
+                if second.status in ("done", "error"):
+                    break
+                await asyncio.sleep(0.05)
+            assert second.status == "done" and second.result["score_4"] == "++"
+        finally:
+            await service.close()
+
+    asyncio.run(scenario())
+
+
+def test_main_usage():
+    assert main([]) == 2
+    assert main(["a/lab.xlsx", "b/lab.xlsx"]) == 2
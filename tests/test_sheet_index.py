@@ -0,0 +1,77 @@
+"""One-pass row summaries: masks, separators, instructions, anchors; same result for normal and read-only sheets."""
+from openpyxl import Workbook, load_workbook
+
+from app.core.excel.blocks import find_task_blocks
+from app.core.excel.sheet_index import SheetIndex, summarize_row
+from app.core.excel.table_detect import detect_tables_in_block
+
+
+def test_row_summary():
+    s = summarize_row(3, (None, " A ", "...", "", 5))
+    assert (s.mask, s.content_mask, s.count, s.first_col, s.last_col) == (0b11110 & ~0b1000, 0b10010, 3, 2, 5)
+    assert s.text == "A ... 5" and not s.is_separator and not s.is_instruction
+    assert s.has_content(2, 2) and not s.has_content(4, 4)
+    assert s.is_separator_in(3, 4) and not s.is_separator_in(3, 5)
+    assert summarize_row(1, ("…", None, ". . .")).is_separator
+    assert summarize_row(1, ()).is_instruction
+    assert summarize_row(1, ("ответ:", "x")).is_instruction
+    assert summarize_row(1, ("Подсказка: " + "очень длинный текст " * 3,)).is_instruction
+    far = summarize_row(1, (None,) * 40 + ("Задание № 7",))
+    assert far.anchor == 7 and far.text == "" and far.mask == 0
+
+
+def _sheet(path):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Задание №3"])
+    ws.append([None, "ответ:"])
+    ws.append([None, "A", "B", "C"])
+    ws.append([None, "1", "x", None])
+    ws.append([None, "...", "...", "..."])
+    ws.append([None, "2", "y", "z"])
+    ws.append([])
+    ws.append(["Задание №4"])
+    ws.append(["A -> B"])
+    wb.save(path)
+
+
+def test_read_only_and_normal_sheets_agree(tmp_path):
+    path = tmp_path / "s.xlsx"
+    _sheet(path)
+    normal = SheetIndex.from_worksheet(load_workbook(path).active)
+    wb = load_workbook(path, read_only=True)
+    streamed = SheetIndex.from_worksheet(wb.active)
+    wb.close()
+    assert normal.max_row == streamed.max_row == 9
+    for r in range(1, 11):
+        a, b = normal.row(r), streamed.row(r)
+        assert (a.mask, a.text, a.is_separator, a.is_instruction, a.anchor) == (
+            b.mask, b.text, b.is_separator, b.is_instruction, b.anchor,
+        )
+    blocks = find_task_blocks(streamed)
+    assert [(b.task_num, b.start_row, b.end_row) for b in blocks] == [(3, 1, 8), (4, 8, 10)]
+    (t,) = detect_tables_in_block(streamed, 1, 8, anchor_row=1)
+    assert (t.header_row, t.data_rows, t.min_col, t.max_col) == (3, [4, 6], 2, 4)
+
+
+def test_styled_empty_rows_are_trimmed(tmp_path):
+    from openpyxl.styles import PatternFill
+
+    path = tmp_path / "styled.xlsx"
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Задание №1"])
+    ws.append(["A", "B"])
+    ws.append(["Задание", "№", 2])  # якорь, разбитый по ячейкам
+    ws.append(["x"])
+    fill = PatternFill("solid", fgColor="FFFF00")
+    for r in range(5, 5001):
+        ws.cell(row=r, column=1).fill = fill
+        ws.cell(row=r, column=3).number_format = "0.00"
+    wb.save(path)
+    wb = load_workbook(path, read_only=True)
+    sheet = SheetIndex.from_worksheet(wb.active)
+    wb.close()
+    assert sheet.max_row == 4
+    assert sheet.anchors == [(1, 1), (3, 2)]
+    assert [(b.task_num, b.start_row, b.end_row) for b in find_task_blocks(sheet)] == [(1, 1, 3), (2, 3, 5)]
@@ -0,0 +1,87 @@
+"""Similarity screening: MinHash estimates Jaccard, LSH finds near-duplicates, own shingles exclude the reference."""
+import random
+import sqlite3
+
+from openpyxl import load_workbook
+
+from app import storage
+from app.core.batch import BatchGrader
+from app.core.similarity import SimilarityIndex, jaccard, minhash
+from tests.synth import ErrorRates, SynthSpec, build_workbook, make_schema
+
+SPEC = SynthSpec(seed=3)
+SCHEMA = make_schema(SPEC)
+ERRORS = ErrorRates(cell_corrupt=0.3, fd_corrupt=0.3, relation_attr_drop=0.3)
+
+
+def _pair(rng, n, j):
+    """Два множества по n элементов с коэффициентом Жаккара около j."""
+    common = round(2 * n * j / (1 + j))
+    shared = [rng.getrandbits(64) for _ in range(common)]
+    a = shared + [rng.getrandbits(64) for _ in range(n - common)]
+    b = shared + [rng.getrandbits(64) for _ in range(n - common)]
+    return frozenset(a), frozenset(b)
+
+
+def test_minhash_estimates_jaccard():
+    rng = random.Random(1)
+    for n in (8, 40, 400):  # малые множества — почти все ячейки заполняются densification
+        for target in (0.2, 0.5, 0.9):
+            a, b = _pair(rng, n, target)
+            sa, sb = minhash(a), minhash(b)
+            estimate = sum(x == y for x, y in zip(sa, sb)) / len(sa)
+            assert abs(estimate - jaccard(a, b)) < 0.15
+    assert minhash(frozenset()) == ()
+    assert minhash(frozenset([5])) == minhash(frozenset([5]))
+
+
+def test_lsh_finds_near_duplicates_among_noise():
+    rng = random.Random(2)
+    index = SimilarityIndex()
+    planted = []
+    for i in range(300):
+        a, b = _pair(rng, 30, 0.8)
+        index.add(("a", i), a)
+        if i % 30 == 0:
+            index.add(("b", i), b)
+            planted.append((("a", i), ("b", i)))
+    assert not index.add("tiny", frozenset([1, 2]))
+    found = index.pairs(threshold=0.6)
+    assert sorted((p.a, p.b) for p in found) == sorted(planted)
+    assert len(index.candidates()) < 100  # из ~45 000 пар точно считаются только кандидаты
+
+
+def _students(tmp_path):
+    build_workbook(SCHEMA, SPEC, "ref").save(tmp_path / "ref.xlsx")
+    paths = [tmp_path / n for n in ("a.xlsx", "b.xlsx", "c.xlsx", "ok.xlsx")]
+    build_workbook(SCHEMA, SynthSpec(seed=5, errors=ERRORS), "stu").save(paths[0])
+    wb = load_workbook(paths[0])  # b — копия a с одной исправленной строкой 1НФ
+    ws = wb.active
+    row = next(r for r in ws.iter_rows() if r[0].value == "Задание №3")[0].row + 2
+    ws.cell(row=row, column=1, value="другое значение")
+    wb.save(paths[1])
+    build_workbook(SCHEMA, SynthSpec(seed=6, errors=ERRORS), "stu").save(paths[2])
+    build_workbook(SCHEMA, SPEC, "stu").save(paths[3])
+    return tmp_path / "ref.xlsx", paths
+
+
+def test_batch_reports_similar_works(tmp_path):
+    ref, paths = _students(tmp_path)
+    grader = BatchGrader(ref, max_workers=1)
+    results = dict(grader.grade(paths))
+    assert results[3]["shingles"] == frozenset()  # верная работа целиком совпадает с эталоном
+    assert len(results[0]["shingles"]) >= 5
+    assert [(p.a, p.b) for p in grader.similar] == [(0, 1)]
+    assert 0.5 <= grader.similar[0].similarity < 1.0
+    assert grader.clusters == []
+
+
+def test_similarity_saved_in_existing_session_db(tmp_path, monkeypatch):
+    db = tmp_path / "projects.db"
+    conn = sqlite3.connect(db)  # база прежней версии: только sessions
+    conn.execute("CREATE TABLE sessions (id INTEGER PRIMARY KEY AUTOINCREMENT, ref_path TEXT)")
+    conn.close()
+    monkeypatch.setattr(storage, "_DB_PATH", db)
+    assert storage.save_similarity("ref.xlsx", [("a.xlsx", "b.xlsx", 0.75)]) == 1
+    rows = storage.list_similarity()
+    assert [(r["stu_path_a"], r["stu_path_b"], r["similarity"]) for r in rows] == [("a.xlsx", "b.xlsx", 0.75)]
@@ -0,0 +1,87 @@
+"""Reference decompositions: 3NF synthesis, BCNF and 2NF decomposition — normal form, lossless, deterministic."""
+import random
+
+from app.core.algos.decomposition import (
+    decompose_2nf,
+    decompose_bcnf,
+    lossless_join_chase,
+    lost_dependencies,
+    synthesize_3nf,
+)
+from app.core.algos.fd import closure
+from app.core.algos.keys import candidate_keys
+from app.core.algos.normal_forms import check_2nf, check_3nf
+from app.core.algos.projection import project_fds
+from tests.synth import SynthSpec, make_schema
+
+
+def _random_case(rng, n=7):
+    attrs = [chr(ord("A") + i) for i in range(n)]
+    F = []
+    for _ in range(rng.randint(1, 8)):
+        lhs = sorted(rng.sample(attrs, rng.randint(1, 2)))
+        F.append((lhs, rng.choice([a for a in attrs if a not in lhs])))
+    return set(attrs), F
+
+
+def _in_nf(check, R, F):
+    fds = project_fds(R, F).fds
+    return check(R, fds, candidate_keys(R, fds) if fds else [])[0]
+
+
+def _sets(relations):
+    return sorted(sorted(a) for _, a in relations)
+
+
+def test_textbook_3nf():
+    U = {"A", "B", "C", "D"}
+    F = [(["A"], "B"), (["B"], "C")]
+    # ключ AD ни в одном отношении по ФЗ — добавляется
+    assert synthesize_3nf(U, F) == [("R1", {"A", "B"}), ("R2", {"B", "C"}), ("R3", {"A", "D"})]
+    assert decompose_bcnf({"A", "B", "C"}, [(["A", "B"], "C"), (["C"], "B")]) == [
+        ("R1", {"B", "C"}), ("R2", {"A", "C"}),
+    ]
+
+
+def test_properties_on_random_schemas():
+    rng = random.Random(2)
+    for _ in range(150):
+        U, F = _random_case(rng)
+        s3 = synthesize_3nf(U, F)
+        assert set().union(*(a for _, a in s3)) == U
+        assert all(_in_nf(check_3nf, a, F) for _, a in s3)
+        assert lossless_join_chase(U, F, s3).lossless and not lost_dependencies(F, s3)
+
+        bc = decompose_bcnf(U, F)
+        assert set().union(*(a for _, a in bc)) == U and lossless_join_chase(U, F, bc).lossless
+        for _, R in bc:
+            assert all(closure(lhs, F) >= R for lhs, _ in project_fds(R, F).fds)
+
+        n2 = decompose_2nf(U, F)
+        assert set().union(*(a for _, a in n2)) == U and lossless_join_chase(U, F, n2).lossless
+        assert all(_in_nf(check_2nf, a, F) for _, a in n2)
+
+        shuffled = rng.sample(F, len(F))
+        assert synthesize_3nf(U, shuffled) == s3
+        assert decompose_bcnf(U, shuffled) == bc
+        assert decompose_2nf(U, shuffled) == n2
+
+
+def test_synth_references_reproduced():
+    for seed in range(20):
+        schema = make_schema(SynthSpec(n_attrs=10, key_size=3, seed=seed))
+        U = set(schema.attrs)
+        assert _sets(synthesize_3nf(U, schema.fds + schema.redundant_fds)) == sorted(
+            sorted(a) for _, a in schema.relations_3nf
+        )
+        assert _sets(decompose_2nf(U, schema.fds)) == sorted(sorted(a) for _, a in schema.relations_2nf)
+
+
+def test_cli_matches_synth_reference(tmp_path, capsys):
+    from app.core.algos.decomposition import main
+    from tests.synth import generate_pair
+
+    ref, _, _ = generate_pair(SynthSpec(n_attrs=8, seed=3), tmp_path)
+    assert main([str(ref)]) == 0
+    out = capsys.readouterr().out
+    assert "= задание №11 эталона" in out and "= задание №13 эталона" in out and "НФБК:" in out
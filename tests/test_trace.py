@@ -0,0 +1,71 @@
+"""Tracing layer: no-op when disabled, nested spans and counters, JSON/Chrome export, env hooks."""
+import json
+
+from app.core import trace
+from app.core.algos.fd import closure
+from app.core.compare import compare
+from tests.synth import SynthSpec, generate_pair
+
+
+def test_disabled_is_noop(tmp_path, monkeypatch):
+    monkeypatch.delenv(trace.TRACE_ENV, raising=False)
+    assert not trace.enabled()
+    with trace.span("x") as s, trace.collect("run") as tr:
+        trace.count("closure")
+    assert s is trace._NULL and tr is None
+    ref, stu, _ = generate_pair(SynthSpec(), tmp_path)
+    assert "trace" not in compare(ref, stu)
+
+
+def test_spans_counts_and_chrome_export():
+    with trace.collect("run", force=True, file="a.xlsx") as tr:
+        with trace.span("outer"):
+            closure(["A"], [(["A"], "B")])
+            with trace.span("inner", task=4):
+                closure(["B"], [])
+        with trace.collect("nested"):  # внутри trace — просто span
+            pass
+    assert not trace.enabled()
+    d = tr.to_dict()
+    assert d["attrs"] == {"file": "a.xlsx"}
+    assert [c["name"] for c in d["children"]] == ["outer", "nested"]
+    outer = d["children"][0]
+    assert outer["counts"] == {"closure": 1}
+    assert outer["children"][0]["counts"] == {"closure": 1}
+    assert d["totals"] == {"closure": 2}
+    events = tr.to_chrome()["traceEvents"]
+    assert [e["name"] for e in events] == ["run", "outer", "inner", "nested"]
+    assert all(e["ph"] == "X" for e in events)
+    assert events[1]["ts"] <= events[2]["ts"] and events[2]["dur"] <= events[1]["dur"]
+
+
+def test_env_trace_writes_tree_and_chrome(tmp_path, monkeypatch):
+    ref, stu, _ = generate_pair(SynthSpec(), tmp_path)
+    out = tmp_path / "traces"
+    monkeypatch.setenv(trace.TRACE_ENV, str(out))
+    monkeypatch.setenv(trace.PROFILE_ENV, "cprofile")
+    res = compare(ref, stu)
+    names = {s["name"] for s in _walk(res["trace"])}
+    assert {"parse_workbook", "load", "blocks", "tables", "text", "build_graph", "task4.check", "task13.check"} <= names
+    assert res["trace"]["totals"]["closure"] > 0
+    assert "cumulative" in res["trace"]["profile"]
+    files = sorted(p.name.split(".", 1)[1] for p in out.iterdir())
+    assert files == ["chrome.json", "json", "prof"]
+    chrome = json.loads(next(out.glob("*.chrome.json")).read_text(encoding="utf-8"))
+    assert chrome["traceEvents"][0]["name"] == "compare"
+
+
+def test_tracemalloc_records_memory(tmp_path, monkeypatch):
+    monkeypatch.setenv(trace.PROFILE_ENV, "tracemalloc")
+    with trace.collect("run", force=True) as tr:
+        with trace.span("alloc"):
+            data = [str(i) for i in range(10000)]
+    assert tr.root.children[0].mem_delta > 0
+    assert tr.profile.startswith("peak:")
+    del data
+
+
+def _walk(node):
+    yield node
+    for c in node.get("children", []):
+        yield from _walk(c)
@@ -0,0 +1,75 @@
+"""Reference variants: all sheets parsed (in processes for 3+), variant picked by the task 1 fingerprint."""
+from openpyxl import Workbook
+
+from app.core.compare import compare
+from app.core.excel.importer import parse_workbook, parse_workbook_sheets
+from app.core.report import build_html_report
+from app.core.variants import VariantIndex, load_reference, solution_fingerprint
+from tests.synth import SynthSpec, build_sheets_workbook, build_workbook, make_schema, sheet_rows
+
+SPECS = [SynthSpec(n_attrs=n, n_rows=12, seed=n) for n in (6, 7, 8)]
+SCHEMAS = [make_schema(s) for s in SPECS]
+
+
+def _reference(tmp_path, name="ref.xlsx"):
+    path = tmp_path / name
+    sheets = [(f"Вариант {i + 1}", schema, spec) for i, (schema, spec) in enumerate(zip(SCHEMAS, SPECS))]
+    build_sheets_workbook(sheets, "ref").save(path)
+    return path
+
+
+def test_all_sheets_parsed_sequential_and_parallel_agree(tmp_path):
+    path = _reference(tmp_path)
+    seq = parse_workbook_sheets(path, max_workers=1)
+    par = parse_workbook_sheets(path, max_workers=2)
+    assert [s.sheet_name for s in seq] == [s.sheet_name for s in par] == ["Вариант 1", "Вариант 2", "Вариант 3"]
+    for a, b in zip(seq, par):
+        assert sorted(a.tasks) == sorted(b.tasks) == list(range(1, 14))
+        assert a.tasks[3].tables[0].rows == b.tasks[3].tables[0].rows
+    # parse_workbook: только активный лист — другие варианты не подмешиваются
+    assert parse_workbook(path).tasks[1].tables[0].headers == seq[0].tasks[1].tables[0].headers
+
+
+def test_variant_selected_by_fingerprint(tmp_path):
+    variants = load_reference(_reference(tmp_path), max_workers=1)
+    assert len(variants) == 3 and variants.default.sheet_name == "Вариант 1"
+    for i, spec in enumerate(SPECS):
+        stu_path = tmp_path / f"stu{i}.xlsx"
+        build_workbook(SCHEMAS[i], spec, "stu").save(stu_path)
+        stu = parse_workbook(stu_path)
+        assert variants.select(stu).sheet_name == f"Вариант {i + 1}"
+        assert variants.get(solution_fingerprint(stu)) is variants.select(stu)
+    assert VariantIndex([]).select(stu).tasks == {}
+
+
+def test_compare_uses_matching_variant(tmp_path):
+    ref = _reference(tmp_path)
+    stu = tmp_path / "stu.xlsx"
+    build_workbook(SCHEMAS[2], SPECS[2], "stu").save(stu)
+    result = compare(ref, stu)
+    assert result["ref_sheet"] == "Вариант 3" and result["ref_variants"] == 3
+    assert result["fingerprint_match"]
+    assert "лист «Вариант 3»" in build_html_report(result)
+    other = make_schema(SynthSpec(n_attrs=9, seed=1))
+    build_workbook(other, SynthSpec(n_attrs=9, seed=1), "stu").save(stu)
+    result = compare(ref, stu)  # точного варианта нет: ближайший — 8 атрибутов из 9
+    assert result["ref_sheet"] == "Вариант 3" and not result["fingerprint_match"]
+    assert abs(result["ref_similarity"] - 8 / 9) < 1e-9
+    assert "ближайший: совпадает 89%" in build_html_report(result)
+
+
+def test_student_work_split_across_sheets_is_merged(tmp_path):
+    rows = sheet_rows(SCHEMAS[0], SPECS[0], "stu")
+    cut = next(i for i, r in enumerate(rows) if r and r[0] == "Задание №7")
+    wb = Workbook(write_only=True)
+    for title, part in (("Задания 1-6", rows[:cut]), ("Задания 7-13", rows[cut:])):
+        ws = wb.create_sheet(title)
+        for r in part:
+            ws.append(r)
+    path = tmp_path / "split.xlsx"
+    wb.save(path)
+    parsed = parse_workbook(path)
+    assert sorted(parsed.tasks) == list(range(1, 14))
+    whole = tmp_path / "whole.xlsx"
+    build_workbook(SCHEMAS[0], SPECS[0], "stu").save(whole)
+    assert parsed.tasks[13].text_lines == parse_workbook(whole).tasks[13].text_lines
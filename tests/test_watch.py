@@ -0,0 +1,129 @@
+"""Watch-folder daemon: new and changed files graded once, settled writes only, stored results not re-graded."""
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+from app import storage
+from app.watch import FolderWatcher, main
+from tests.synth import ErrorRates, SynthSpec, build_workbook, make_schema
+
+SPEC = SynthSpec(seed=3)
+SCHEMA = make_schema(SPEC)
+
+
+def _setup(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "_DB_PATH", tmp_path / "projects.db")
+    build_workbook(SCHEMA, SPEC, "ref").save(tmp_path / "ref.xlsx")
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    logs = []
+    watcher = FolderWatcher(inbox, tmp_path / "ref.xlsx", settle=5.0, max_workers=1, log=logs.append)
+    return watcher, inbox, logs
+
+
+def _sessions(tmp_path):
+    conn = sqlite3.connect(tmp_path / "projects.db")
+    try:
+        return conn.execute("SELECT stu_path, score_4, ref_sha256, stu_sha256 FROM sessions ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def test_new_and_changed_files_graded_once(tmp_path, monkeypatch):
+    watcher, inbox, logs = _setup(tmp_path, monkeypatch)
+    now = time.time()
+    build_workbook(SCHEMA, SPEC, "stu").save(inbox / "a.xlsx")
+    assert watcher.process(now) == []  # только что записан — ждём, не допишется ли
+    assert [r["score_4"] for r in watcher.process(now + 5)] == ["++"]
+    assert watcher.process(now + 10) == []
+    rows = _sessions(tmp_path)
+    assert [(r[0], r[1]) for r in rows] == [(str(inbox / "a.xlsx"), "++")] and all(rows[0][2:])
+
+    build_workbook(SCHEMA, SynthSpec(seed=3, errors=ErrorRates(fd_drop=0.5)), "stu").save(inbox / "a.xlsx")
+    later = time.time()
+    assert watcher.process(later) == []
+    assert [r["score_4"] for r in watcher.process(later + 5)] != ["++"]
+    assert len(_sessions(tmp_path)) == 2
+    assert logs[0] == "a.xlsx: проверен, №4 ++"
+
+
+def test_stored_content_is_not_regraded(tmp_path, monkeypatch):
+    watcher, inbox, logs = _setup(tmp_path, monkeypatch)
+    build_workbook(SCHEMA, SPEC, "stu").save(inbox / "a.xlsx")
+    old = time.time() - 60  # файл записан давно — готов с первого опроса
+    os.utime(inbox / "a.xlsx", (old, old))
+    assert len(watcher.process()) == 1
+    shutil.copy(inbox / "a.xlsx", inbox / "b.xlsx")
+    os.utime(inbox / "b.xlsx", (old, old))
+    restarted = FolderWatcher(inbox, tmp_path / "ref.xlsx", settle=5.0, max_workers=1, log=logs.append)
+    assert restarted.process() == []  # после перезапуска: a не перепроверяется, копия b — тоже
+    assert logs[-2:] == ["a.xlsx: уже проверен (результат в базе)", "b.xlsx: копия a.xlsx, №4 ++"]
+    rows = _sessions(tmp_path)
+    assert [(r[0], r[1]) for r in rows] == [(str(inbox / "a.xlsx"), "++"), (str(inbox / "b.xlsx"), "++")]
+    assert rows[0][3] == rows[1][3]
+    copy = storage.get_session(2)
+    assert copy["duplicate_of"] == str(inbox / "a.xlsx")
+    assert f"<b>Файл студента:</b> {inbox / 'b.xlsx'}" in copy["report_html"]
+    assert f"<b>Побайтная копия файла:</b> {inbox / 'a.xlsx'}" in copy["report_html"]
+    assert FolderWatcher(inbox, tmp_path / "ref.xlsx", settle=5.0, max_workers=1, log=logs.append).process() == []
+    assert len(_sessions(tmp_path)) == 2 and logs[-1] == "b.xlsx: уже проверен (результат в базе)"
+
+
+def test_partial_write_waits_until_settled(tmp_path, monkeypatch):
+    watcher, inbox, _ = _setup(tmp_path, monkeypatch)
+    build_workbook(SCHEMA, SPEC, "stu").save(tmp_path / "full.xlsx")
+    data = (tmp_path / "full.xlsx").read_bytes()
+    target = inbox / "a.xlsx"
+    now = time.time()
+    target.write_bytes(data[: len(data) // 2])
+    assert watcher.poll(now) == []
+    assert watcher.poll(now + 3) == []
+    target.write_bytes(data)  # дописан через 6 с: отсчёт начинается заново
+    os.utime(target, (now + 6, now + 6))
+    assert watcher.poll(now + 6) == []
+    assert watcher.poll(now + 11) == [target]
+
+
+def test_main_once(tmp_path, monkeypatch, capsys):
+    watcher, inbox, _ = _setup(tmp_path, monkeypatch)
+    build_workbook(SCHEMA, SPEC, "stu").save(inbox / "a.xlsx")
+    (inbox / "broken.xlsx").write_bytes(b"not a workbook")
+    assert main([str(inbox), str(tmp_path / "ref.xlsx"), "--once"]) == 0
+    out = capsys.readouterr().out
+    assert "a.xlsx: проверен, №4 ++" in out and "broken.xlsx: ошибка" in out
+    assert len(_sessions(tmp_path)) == 1
+    assert main([str(inbox)]) == 2
+
+
+def test_reference_rewrite_waits_and_poll_errors_do_not_stop_run(tmp_path, monkeypatch):
+    watcher, inbox, logs = _setup(tmp_path, monkeypatch)
+    ref = tmp_path / "ref.xlsx"
+    data = ref.read_bytes()
+    build_workbook(SCHEMA, SPEC, "stu").save(inbox / "a.xlsx")
+    now = time.time()
+    assert len(watcher.process(now + 5)) == 1
+    old_sha = watcher.ref_sha256
+
+    ref.write_bytes(data[: len(data) // 2])  # эталон переписывается, пока демон работает
+    assert watcher.process(now + 6) == []  # ещё не устоялся: прежний разбор, без ошибки
+    assert watcher.ref_sha256 == old_sha
+    stop = threading.Event()
+
+    def log(line):
+        logs.append(line)
+        stop.set()
+
+    watcher.log = log
+    watcher._ref_pending = (watcher._ref_pending[0], now - 60)  # устоялся, но не читается
+    watcher.run(interval=0, stop=stop)
+    assert logs[-1].startswith("Ошибка опроса:") and watcher.ref_sha256 == old_sha
+
+    ref.write_bytes(data)
+    later = time.time()
+    os.utime(ref, (later + 1, later + 1))  # новое состояние эталона
+    assert watcher.process(later + 2) == []
+    assert watcher.process(later + 8) == []  # разобран заново; то же содержимое — результат из базы
+    assert watcher.ref_sha256 == old_sha
+    assert logs[-2:] == ["Эталон ref.xlsx изменён: проверка по новой версии", "a.xlsx: уже проверен (результат в базе)"]